@@ -0,0 +1,110 @@
+"""
+content addressed writing of the ancillary files of SCC raw data files (sonde files, overlap files).
+
+Several SCC raw data files can refer to the same ancillary file. The content hash of an ancillary file is stored in
+its global attribute CONTENT_HASH_ATTRIBUTE and is part of its name (see ancillary_filename). A file that already
+exists with the same hash is not written again.
+Files are written to a temporary file which then replaces the target, so a reader never sees a partly written file.
+"""
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+from scipy.io import netcdf
+
+CONTENT_HASH_ATTRIBUTE = 'Content_Hash'
+
+# hashes of the files written or checked by this process: filename -> (content hash, (mtime, size))
+_known_hashes = {}
+
+
+def content_hash(attributes, arrays):
+    """
+    hex digest of the attributes (dict of scalars and strings) and the arrays (dict of numpy arrays)
+
+    >>> first = content_hash({'Location': 'hpb'}, {'Pressure': np.array([1000., 900.])})
+    >>> first == content_hash({'Location': 'hpb'}, {'Pressure': np.array([1000., 900.])})
+    True
+    >>> first == content_hash({'Location': 'hpb'}, {'Pressure': np.array([1000., 901.])})
+    False
+    """
+    digest = hashlib.sha1()
+    for name in sorted(attributes):
+        digest.update(('%s=%r;' % (name, attributes[name])).encode('utf-8'))
+    for name in sorted(arrays):
+        values = np.ascontiguousarray(arrays[name])
+        digest.update(('%s:%s:%s;' % (name, values.dtype.str, values.shape)).encode('utf-8'))
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def ancillary_filename(prefix, station, launch, digest):
+    """
+    name of an ancillary file from its station, launch time (datetime) and content hash
+
+    >>> import datetime
+    >>> ancillary_filename('rs', '10868', datetime.datetime(2017, 12, 28, 0, 0), '0123456789abcdef')
+    'rs_10868_201712280000_01234567.nc'
+    """
+    return '%s_%s_%s_%s.nc' % (prefix, station, launch.strftime('%Y%m%d%H%M'), digest[:8])
+
+
+def stored_hash(filename):
+    """
+    content hash stored in the NetCDF file filename, None if the file does not exist or has no hash
+    """
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    key = (stat.st_mtime, stat.st_size)
+    if filename in _known_hashes and _known_hashes[filename][1] == key:
+        return _known_hashes[filename][0]
+
+    try:
+        nc_file = netcdf.netcdf_file(filename, 'r', False, 1)
+        try:
+            value = nc_file._attributes.get(CONTENT_HASH_ATTRIBUTE)
+        finally:
+            nc_file.close()
+    except (IOError, ValueError, TypeError):
+        return None
+    if isinstance(value, bytes):
+        value = value.decode('utf-8')
+    _known_hashes[filename] = (value, key)
+    return value
+
+
+def write_ancillary_file(filename, attributes, arrays, write, digest=None):
+    """
+    writes the ancillary file filename with the content attributes and arrays (see content_hash), unless it exists
+    with the same content. write(nc_file) fills the open scipy netcdf_file; the hash attribute is added afterwards.
+    digest: content hash, if it has been computed already.
+    Returns True if the file has been written.
+    """
+    if digest is None:
+        digest = content_hash(attributes, arrays)
+    if stored_hash(filename) == digest:
+        return False
+
+    temp_file, temp_filename = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(filename) or None)
+    os.close(temp_file)
+    try:
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temp_filename, 0o644)
+        nc_file = netcdf.netcdf_file(temp_filename, 'w', False, 1)
+        try:
+            write(nc_file)
+            setattr(nc_file, CONTENT_HASH_ATTRIBUTE, digest)
+        finally:
+            nc_file.close()
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+
+    stat = os.stat(filename)
+    _known_hashes[filename] = (digest, (stat.st_mtime, stat.st_size))
+    return True
@@ -0,0 +1,83 @@
+"""
+estimators of the signal background.
+
+An estimator gets the raw signal of the background window of all profiles and channels at once as array
+(..., bins) and the index of the first bin of the window. It returns offset and slope of the background, so the
+background of bin i is offset + slope * i. Constant estimators return None as slope.
+Estimators are selected per channel by BG_ESTIMATOR.
+"""
+import numpy as np
+
+from inqbus.lidar.scc_gui.configs import main_config as mc
+
+BACKGROUND_ESTIMATORS = {}
+
+
+def register_estimator(name):
+    """
+    decorator to register a background estimator under name
+    """
+    def register(estimator):
+        BACKGROUND_ESTIMATORS[name] = estimator
+        return estimator
+    return register
+
+
+def estimate_background(window, first, estimator='mean'):
+    """
+    >>> window = np.array([[[1, 2, 3, 10]]])
+    >>> offset, slope = estimate_background(window, 0, 'mean')
+    >>> np.array_equal(offset, [[4.]]), slope
+    (True, None)
+    >>> offset, slope = estimate_background(window, 0, 'median')
+    >>> np.array_equal(offset, [[2.5]]), slope
+    (True, None)
+    """
+    if estimator not in BACKGROUND_ESTIMATORS:
+        raise ValueError('unknown background estimator %s' % estimator)
+    return BACKGROUND_ESTIMATORS[estimator](window, first)
+
+
+@register_estimator('mean')
+def mean_background(window, first):
+    return np.mean(window, axis=-1, dtype=np.float64), None
+
+
+@register_estimator('median')
+def median_background(window, first):
+    return np.median(window, axis=-1), None
+
+
+@register_estimator('trimmed_mean')
+def trimmed_mean_background(window, first):
+    """
+    mean without the BG_TRIM_FRACTION smallest and largest values of each profile
+
+    >>> offset, slope = trimmed_mean_background(np.array([[0, 1, 2, 3, 4, 5, 6, 7, 8, 100]]), 0)
+    >>> np.array_equal(offset, [4.5]), slope
+    (True, None)
+    """
+    bins = window.shape[-1]
+    cut = int(bins * mc.BG_TRIM_FRACTION)
+    if cut == 0:
+        return mean_background(window, first)
+    # only the cut smallest and largest values have to be moved to the ends
+    ordered = np.partition(window, (cut - 1, bins - cut), axis=-1)
+    return np.mean(ordered[..., cut: bins - cut], axis=-1, dtype=np.float64), None
+
+
+@register_estimator('linear_fit')
+def linear_fit_background(window, first):
+    """
+    least squares fit of a straight line to each profile
+
+    >>> offset, slope = linear_fit_background(np.array([[5., 7., 9., 11.]]), 2)
+    >>> np.allclose(offset, [1.]), np.allclose(slope, [2.])
+    (True, True)
+    """
+    x = np.arange(first, first + window.shape[-1], dtype=np.float64)
+    x_mean = x.mean()
+    x_dev = x - x_mean
+    y_mean = np.mean(window, axis=-1, dtype=np.float64)
+    slope = np.dot(window, x_dev) / np.dot(x_dev, x_dev)
+    return y_mean - slope * x_mean, slope
@@ -0,0 +1,305 @@
+"""
+micro benchmarks of the numerical kernels.
+
+usage: python -m inqbus.lidar.components.benchmark [name ...]
+Without a name, all benchmarks are run.
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+
+from inqbus.lidar.components.background import BACKGROUND_ESTIMATORS, estimate_background
+from inqbus.lidar.components.container import BaseContainer, Sonde, SignalBlock, Signal, PreProcessedSignal, ZAxis, \
+    channel_layout, block_pre_processing_settings, create_channel_info, pre_process_block, pre_processing_settings
+from inqbus.lidar.components.nameddict import NamedDict
+from inqbus.lidar.components.corrections import Corrections, dead_time_factors, apply_dead_time
+from inqbus.lidar.components.pyramid import SignalPyramid
+from inqbus.lidar.components.scc_writer import gather_signals
+from inqbus.lidar.scc_gui.configs import main_config as mc
+
+# a full day with 30 s profiles
+BENCH_PROFILES = 2880
+BENCH_POINTS = 4000
+
+
+def synthetic_raw_signal(profiles=BENCH_PROFILES, points=BENCH_POINTS, channels=None):
+    """
+    (time, height, channel) raw signal like in a polly file
+    """
+    if channels is None:
+        channels = mc.NUM_CHANNELS - mc.NUM_DOUBLE_CHANNELS
+    random = np.random.RandomState(0)
+    return random.randint(0, 10000, size=(profiles, points, channels)).astype(np.int32)
+
+
+def synthetic_z_axis(points=BENCH_POINTS):
+    return ZAxis.from_polly_file({'points': points, 'bin_res': 50., 'zenith_angle': 0., 'altitude': 0.})
+
+
+def best_of(func, repeat=3):
+    """shortest run time of func in s"""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def report(name, results):
+    print(name)
+    reference = results[0][1]
+    for label, seconds in results:
+        print('  %-40s %8.3f s  (x%.1f)' % (label, seconds, reference / seconds))
+
+
+def bench_preprocessing():
+    """
+    background subtraction and range correction: per channel (PreProcessedSignal.from_rawsig) against the batched
+    kernel on the signal block (SignalBlock.from_raw_block)
+    """
+    raw_signal = synthetic_raw_signal()
+    z_axis = synthetic_z_axis()
+    chs = list(range(mc.NUM_CHANNELS))
+    positions, block_idx = channel_layout(chs)
+    bg_first, bg_last, bg_estimator = list(zip(*block_pre_processing_settings(block_idx)))[:3]
+    raw_block = SignalBlock.from_polly_file(raw_signal, positions)
+
+    def per_channel():
+        for ch in chs:
+            signal = Signal.from_polly_file(raw_signal[:, :, mc.CHAN_NC_POS[ch]],
+                                            create_channel_info(ch, z_axis.header.first_valid_bin))
+            PreProcessedSignal.from_rawsig(signal, z_axis.range_axis)
+
+    def batched():
+        SignalBlock.from_raw_block(raw_block, bg_first, bg_last, z_axis, bg_estimator)
+
+    report('preprocessing of %s profiles x %s bins x %s channels' % (BENCH_PROFILES, BENCH_POINTS, len(chs)),
+           [('per channel (from_rawsig)', best_of(per_channel)),
+            ('batched (SignalBlock.from_raw_block)', best_of(batched))])
+
+
+def bench_background():
+    """
+    background estimators on the background window of all profiles and channels at once
+    """
+    first, last = 0, 250
+    raw_block = SignalBlock.from_polly_file(synthetic_raw_signal(points=last), list(range(mc.NUM_CHANNELS -
+                                                                                          mc.NUM_DOUBLE_CHANNELS)))
+    window = raw_block.data[:, :, first: last]
+
+    report('background estimators on %s profiles x %s bins x %s channels' % (
+        window.shape[0], window.shape[2], window.shape[1]),
+        [(estimator, best_of(lambda: estimate_background(window, first, estimator)))
+         for estimator in sorted(BACKGROUND_ESTIMATORS, key=lambda name: name != 'mean')])
+
+
+def bench_corrections():
+    """
+    cost of the corrections in the preprocessing pass (pre_process_block) against the plain preprocessing and
+    against applying all corrections as separate passes over the whole block
+    """
+    raw_signal = synthetic_raw_signal()
+    z_axis = synthetic_z_axis()
+    positions, block_idx = channel_layout(list(range(mc.NUM_CHANNELS)))
+    bg_first, bg_last, bg_estimator = list(zip(*block_pre_processing_settings(block_idx)))[:3]
+    raw_data = SignalBlock.from_polly_file(raw_signal, positions).data
+    channels = raw_data.shape[1]
+
+    dead_time = dead_time_factors([3.] * channels, np.full(BENCH_PROFILES, 600), 50.)
+    dark = np.full((channels, BENCH_POINTS), 2.)
+    overlap = np.tile(np.minimum(np.linspace(0.01, 2., BENCH_POINTS), 1.), (channels, 1))
+
+    out = np.empty(raw_data.shape, dtype=mc.SIGNAL_DTYPE)
+    background = np.empty(raw_data.shape[:2], dtype=mc.SIGNAL_DTYPE)
+
+    def fused(corrections):
+        return lambda: pre_process_block(raw_data, bg_first, bg_last, z_axis.range_square, out, background,
+                                         bg_estimator, corrections)
+
+    def separate():
+        counts = raw_data.astype(mc.SIGNAL_DTYPE)
+        apply_dead_time(counts, dead_time, np.empty_like(counts))
+        pre_process_block(counts, bg_first, bg_last, z_axis.range_square, out, background, bg_estimator)
+        out[...] -= dark[np.newaxis] * z_axis.range_square
+        out[...] /= overlap[np.newaxis]
+
+    report('corrections of %s profiles x %s bins x %s channels' % (BENCH_PROFILES, BENCH_POINTS, channels),
+           [('no corrections', best_of(fused(None))),
+            ('dead time', best_of(fused(Corrections(dead_time=dead_time)))),
+            ('dark', best_of(fused(Corrections(dark=dark)))),
+            ('overlap', best_of(fused(Corrections(overlap=overlap)))),
+            ('all, fused', best_of(fused(Corrections(dead_time, dark, overlap)))),
+            ('all, separate passes', best_of(separate))])
+
+
+def bench_pyramid():
+    """
+    a zoomed out view (16 x 16 bins per pixel) of a channel: averaged from the full resolution signal at every
+    repaint against building the pyramid once and using its level
+    """
+    signal = synthetic_raw_signal(channels=1)[:, :, 0].astype(mc.SIGNAL_DTYPE)
+    shots = np.full(BENCH_PROFILES, 600)
+    factor = 16
+    pyramid = SignalPyramid(signal, shots)
+
+    def full_resolution():
+        time_len = BENCH_PROFILES // factor * factor
+        height_len = BENCH_POINTS // factor * factor
+        signal[:time_len, :height_len].reshape(
+            time_len // factor, factor, height_len // factor, factor).mean(axis=3).mean(axis=1)
+
+    report('zoomed out view of %s profiles x %s bins' % (BENCH_PROFILES, BENCH_POINTS),
+           [('average the full resolution', best_of(full_resolution)),
+            ('build the pyramid', best_of(lambda: SignalPyramid(signal, shots))),
+            ('select the pyramid level', best_of(lambda: pyramid.select(factor, factor)))])
+
+
+def bench_append():
+    """
+    appending the profiles of a day file by file (2 min files): np.vstack of the whole data against
+    BaseContainer.append_data with its growable buffer
+    """
+    files = 720
+    new_data = np.ones((BENCH_PROFILES // files, BENCH_POINTS), dtype=mc.SIGNAL_DTYPE)
+
+    def stacked():
+        data = new_data
+        for _ in range(files - 1):
+            data = np.vstack((data, new_data))
+
+    def growable():
+        container = BaseContainer.create_with_data(new_data, {})
+        for _ in range(files - 1):
+            container.append_data(new_data, orient='v')
+
+    report('appending %s files of %s profiles x %s bins' % (files, len(new_data), BENCH_POINTS),
+           [('np.vstack', best_of(stacked, repeat=1)),
+            ('growable buffer (append_data)', best_of(growable))])
+
+
+def bench_headers():
+    """
+    channel header access like in the preprocessing cache lookups (pre_processing_settings) and the export loops
+    (a few fields per channel): NamedDict against the slotted ChannelInfo record
+    """
+    repeat = 10000
+    records = [create_channel_info(ch, mc.FIRST_VALID_BIN) for ch in range(mc.NUM_CHANNELS)]
+    named_dicts = []
+    for record in records:
+        named_dict = NamedDict()
+        named_dict.attrs = record.attrs
+        named_dicts.append(named_dict)
+
+    def settings(headers):
+        def run():
+            for _ in range(repeat):
+                for header in headers:
+                    pre_processing_settings(header)
+        return run
+
+    def export(headers):
+        def run():
+            for _ in range(repeat):
+                for header in headers:
+                    (header.channel_id, header.channel_name, header.range_id, header.bg_first, header.bg_last)
+        return run
+
+    def copy_named_dicts():
+        # as the containers did: copy of the attrs dict
+        for _ in range(repeat):
+            for header in named_dicts:
+                header.attrs.copy()
+
+    def copy_records():
+        for _ in range(repeat):
+            for header in records:
+                header.copy()
+
+    report('%s x header access of %s channels' % (repeat, len(records)),
+           [('pre_processing_settings, NamedDict', best_of(settings(named_dicts))),
+            ('pre_processing_settings, ChannelInfo', best_of(settings(records))),
+            ('export fields, NamedDict', best_of(export(named_dicts))),
+            ('export fields, ChannelInfo', best_of(export(records))),
+            ('copy, NamedDict', best_of(copy_named_dicts)),
+            ('copy, ChannelInfo', best_of(copy_records))])
+
+
+def bench_sonde():
+    """
+    parsing the sonde files in SONDE_PATH by format
+    """
+    repeat = 100
+    by_format = {}
+    for sonde_name in sorted(os.listdir(mc.SONDE_PATH)):
+        if sonde_name.count('gdas'):
+            by_format.setdefault('GDAS', []).append(sonde_name)
+        elif sonde_name.endswith('.txt'):
+            by_format.setdefault('Wyoming', []).append(sonde_name)
+        elif sonde_name.endswith('.csv'):
+            by_format.setdefault('Ninjo CSV', []).append(sonde_name)
+
+    def parse(sonde_names):
+        def run():
+            for _ in range(repeat):
+                for sonde_name in sonde_names:
+                    Sonde.from_sonde_file(os.path.join(mc.SONDE_PATH, sonde_name), 'benchmark')
+        return run
+
+    def read_cached():
+        for _ in range(repeat):
+            for sonde_names in by_format.values():
+                for sonde_name in sonde_names:
+                    Sonde.from_cache(os.path.join(mc.SONDE_PATH, sonde_name), 'benchmark')
+
+    report('%s x parsing the sonde files in %s' % (repeat, mc.SONDE_PATH),
+           [('%s (%s files)' % (name, len(sonde_names)), best_of(parse(sonde_names)))
+            for name, sonde_names in sorted(by_format.items())] +
+           [('all files from the sonde cache', best_of(read_cached))])
+
+
+def bench_scc_gather():
+    """
+    collecting the (time, channel, height) data of an SCC raw data file from the signals of all channels: masking
+    each channel signal against one fancy index into the signal block
+    """
+    raw_signal = synthetic_raw_signal()
+    chs = list(range(mc.NUM_CHANNELS))
+    positions, block_idx = channel_layout(chs)
+    raw_block = SignalBlock.from_polly_file(raw_signal, positions)
+    signals = [Signal.from_block(raw_block, block_idx[ch], {}) for ch in chs]
+    mask = np.ones(BENCH_PROFILES, dtype=bool)
+    mask[::10] = False
+    profiles = np.flatnonzero(mask)
+    channel_profiles = np.broadcast_to(profiles[:, np.newaxis], (len(profiles), len(signals)))
+
+    def per_channel():
+        data = np.empty((len(profiles), len(signals), BENCH_POINTS))
+        for ch, signal in enumerate(signals):
+            data[:, ch, :] = signal.data[mask][:, :]
+
+    def gathered():
+        gather_signals(signals, channel_profiles)
+
+    report('gathering %s of %s profiles x %s bins x %s channels' % (len(profiles), BENCH_PROFILES, BENCH_POINTS,
+                                                                    len(chs)),
+           [('per channel (data[mask])', best_of(per_channel)),
+            ('one gather (gather_signals)', best_of(gathered))])
+
+
+BENCHMARKS = {
+    'append': bench_append,
+    'background': bench_background,
+    'corrections': bench_corrections,
+    'headers': bench_headers,
+    'preprocessing': bench_preprocessing,
+    'pyramid': bench_pyramid,
+    'scc_gather': bench_scc_gather,
+    'sonde': bench_sonde,
+}
+
+
+def main(names):
+    for name in names or sorted(BENCHMARKS):
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,68 @@
+"""
+growable arrays for data that is appended profile by profile or file by file.
+
+np.hstack / np.vstack copy the whole array on every append, so appending n files costs O(n**2). A GrowableArray
+keeps spare capacity along the growing axis and doubles it when it is exhausted, so an append copies only the new
+data in amortised O(1) per element. The array itself is a view of the filled part of the buffer.
+"""
+import numpy as np
+
+
+class GrowableArray(object):
+    """
+    array that grows along axis. data is the filled part of the buffer. The buffer starts as the initial array
+    itself, so an array that is never appended to is not copied.
+
+    >>> growable = GrowableArray(np.array([[1, 2], [3, 4]]), axis=1)
+    >>> growable.append(np.array([[5], [6]]))
+    >>> growable.append(np.array([[7], [8]]))
+    >>> growable.data.tolist(), growable.capacity
+    ([[1, 2, 5, 7], [3, 4, 6, 8]], 4)
+    """
+
+    def __init__(self, data, axis=0):
+        self.axis = axis
+        self._buffer = data
+        self._length = data.shape[axis]
+        self.data = data
+
+    @property
+    def capacity(self):
+        return self._buffer.shape[self.axis]
+
+    def _part(self, first, last):
+        """index of the elements first ... last - 1 along the axis"""
+        return (slice(None),) * self.axis + (slice(first, last),)
+
+    def append(self, new_data):
+        new_length = self._length + new_data.shape[self.axis]
+        dtype = np.result_type(self._buffer, new_data)
+
+        if new_length > self.capacity or dtype != self._buffer.dtype:
+            shape = list(self._buffer.shape)
+            shape[self.axis] = max(new_length, 2 * self.capacity)
+            buffer = np.empty(shape, dtype=dtype)
+            buffer[self._part(0, self._length)] = self.data
+            self._buffer = buffer
+
+        self._buffer[self._part(self._length, new_length)] = new_data
+        self._length = new_length
+        self.data = self._buffer[self._part(0, new_length)]
+
+
+def grow(growable, data, new_data, axis=0):
+    """
+    appends new_data to the array data along axis. growable is the GrowableArray returned by the previous call for
+    data or None. If data has been replaced since, a new GrowableArray is started.
+    Returns the GrowableArray, its data is the combined array.
+
+    >>> data = np.arange(3)
+    >>> growable = grow(None, data, np.arange(3, 5))
+    >>> growable = grow(growable, growable.data, np.arange(5, 6))
+    >>> growable.data.tolist()
+    [0, 1, 2, 3, 4, 5]
+    """
+    if growable is None or growable.data is not data or growable.axis != axis:
+        growable = GrowableArray(data, axis)
+    growable.append(new_data)
+    return growable
@@ -0,0 +1,362 @@
+"""
+catalogs of the raw data files and the sonde files, stored in a SQLite database (CATALOG_FILE).
+
+The entries are keyed by path, modification time and size, so a rescan only reads files that are new or have changed.
+Files that can not be read are recorded too, they are read again only after they have changed.
+"""
+import datetime
+import os
+import re
+import sqlite3
+import traceback as tb
+
+import numpy as np
+
+from inqbus.lidar.components.error import LidarError
+from inqbus.lidar.components.raw_file import open_raw_file, read_raw_header
+from inqbus.lidar.scc_gui.configs import main_config as mc
+from inqbus.lidar.scc_gui.log import logger
+
+RAW_FILE_EXTENSIONS = ('.nc', '.zip')
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS raw_files (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    start REAL NOT NULL,
+    stop REAL NOT NULL,
+    profiles INTEGER NOT NULL,
+    points INTEGER NOT NULL,
+    num_channels INTEGER NOT NULL,
+    zenith_angle REAL NOT NULL,
+    bin_res REAL NOT NULL,
+    has_depol_cal INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS raw_files_time ON raw_files (start, stop);
+CREATE TABLE IF NOT EXISTS raw_file_failures (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+SONDE_FILE_EXTENSIONS = ('.txt', '.csv')
+
+# station of the GDAS profiles, which are interpolated to the lidar site
+GDAS_STATION = 'gdas'
+
+# yymmdd_<station>_<hh>z.*
+SONDE_NAME_PATTERN = re.compile(r'^(\d{6})_([^_]+)_(\d{2})z', re.IGNORECASE)
+
+SONDE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sonde_files (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    station TEXT NOT NULL,
+    launch REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sonde_files_station ON sonde_files (station, launch);
+CREATE TABLE IF NOT EXISTS sonde_failures (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+SONDE_FIELDS = ['path', 'mtime', 'size', 'station', 'launch']
+
+CATALOG_FIELDS = ['path', 'mtime', 'size', 'start', 'stop', 'profiles', 'points', 'num_channels', 'zenith_angle',
+                  'bin_res', 'has_depol_cal']
+
+
+def to_timestamp(value):
+    """
+    >>> to_timestamp(datetime.datetime(1970, 1, 2))
+    86400.0
+    """
+    return (value - EPOCH).total_seconds()
+
+
+def from_timestamp(value):
+    """
+    >>> from_timestamp(86400.0)
+    datetime.datetime(1970, 1, 2, 0, 0)
+    """
+    return EPOCH + datetime.timedelta(seconds=value)
+
+
+def polly_time(measurement_time):
+    """
+    datetime of a polly time stamp (date, seconds of day)
+    """
+    date = datetime.datetime.strptime(str(measurement_time[0]), '%Y%m%d')
+    return date + datetime.timedelta(seconds=int(measurement_time[1]))
+
+
+class RawFileCatalog(object):
+    """
+    index of the raw data files below data_path, stored in a SQLite database.
+
+    Only the header and the time stamps of the files are read. The entries are keyed by path, modification time and
+    size, so a rescan only reads files that are new or have changed.
+    """
+
+    def __init__(self, db_filename=None, data_path=None):
+        if db_filename is None:
+            db_filename = mc.CATALOG_FILE
+        if data_path is None:
+            data_path = mc.DATA_PATH
+        self.data_path = data_path
+        self.connection = sqlite3.connect(db_filename)
+        self.connection.executescript(CATALOG_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def scan(self):
+        """
+        updates the catalog. Returns the number of files that have been read. Files that can not be read are
+        recorded with their mtime and size, they are tried again only after they have changed.
+        """
+        known = {}
+        for path, mtime, size in self.connection.execute('SELECT path, mtime, size FROM raw_files'):
+            known[path] = (mtime, size)
+        failed = {}
+        for path, mtime, size in self.connection.execute('SELECT path, mtime, size FROM raw_file_failures'):
+            failed[path] = (mtime, size)
+
+        found = set()
+        entries = []
+        failures = []
+        for root, dirs, files in os.walk(self.data_path):
+            for name in files:
+                if not name.endswith(RAW_FILE_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                found.add(path)
+                if (stat.st_mtime, stat.st_size) in (known.get(path), failed.get(path)):
+                    continue
+                try:
+                    entries.append(self.read_entry(path, stat))
+                except (LidarError, IOError, KeyError, ValueError, TypeError, IndexError):
+                    logger.warning('%s can not be added to the raw file catalog' % path)
+                    logger.warning("Traceback: %s" % tb.format_exc())
+                    failures.append((path, stat.st_mtime, stat.st_size))
+
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO raw_files (%s) VALUES (%s)' % (
+                    ', '.join(CATALOG_FIELDS), ', '.join(['?'] * len(CATALOG_FIELDS))),
+                [[entry[field] for field in CATALOG_FIELDS] for entry in entries])
+            self.connection.executemany('DELETE FROM raw_files WHERE path = ?',
+                                        [(path,) for path in set(known) - found])
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO raw_file_failures (path, mtime, size) VALUES (?, ?, ?)', failures)
+            self.connection.executemany('DELETE FROM raw_file_failures WHERE path = ?',
+                                        [(path,) for path in set(failed) - found] +
+                                        [(entry['path'],) for entry in entries if entry['path'] in failed])
+
+        return len(entries)
+
+    @staticmethod
+    def read_entry(path, stat=None):
+        """
+        catalog entry of a raw data file
+        """
+        if stat is None:
+            stat = os.stat(path)
+
+        nc_file = open_raw_file(path, mmap=mc.READ_MMAP and path.endswith('.nc'), use_cache=False)
+        try:
+            header = read_raw_header(nc_file)
+            measurement_time = nc_file.variables['measurement_time'].data
+            first_stop = polly_time(measurement_time[0])
+            if len(measurement_time) > 1:
+                # the start of the first profile is extrapolated like in TimeAxis
+                start = first_stop - (polly_time(measurement_time[1]) - first_stop)
+            else:
+                start = first_stop
+            stop = polly_time(measurement_time[-1])
+            has_depol_cal = bool(np.any(
+                nc_file.variables['depol_cal_angle'].data.round() != mc.CAL_ANGLE_MEASUREMENT))
+            # release the view into the mapped file before it is closed
+            measurement_time = None
+        finally:
+            nc_file.close()
+
+        return {'path': path,
+                'mtime': stat.st_mtime,
+                'size': stat.st_size,
+                'start': to_timestamp(start),
+                'stop': to_timestamp(stop),
+                'profiles': int(header['time_len']),
+                'points': int(header['points']),
+                'num_channels': int(header['num_channels']),
+                'zenith_angle': float(header['zenith_angle']),
+                'bin_res': float(header['bin_res']),
+                'has_depol_cal': int(has_depol_cal)}
+
+    def overlapping(self, start, stop):
+        """
+        paths of the files that contain profiles between the datetimes start and stop, ordered by time
+        """
+        cursor = self.connection.execute(
+            'SELECT path FROM raw_files WHERE start < ? AND stop > ? ORDER BY start',
+            (to_timestamp(stop), to_timestamp(start)))
+        return [row[0] for row in cursor]
+
+    def entries(self):
+        """
+        all catalog entries ordered by time. start and stop are datetimes.
+        """
+        cursor = self.connection.execute('SELECT %s FROM raw_files ORDER BY start' % ', '.join(CATALOG_FIELDS))
+        result = []
+        for row in cursor:
+            entry = dict(zip(CATALOG_FIELDS, row))
+            entry['start'] = from_timestamp(entry['start'])
+            entry['stop'] = from_timestamp(entry['stop'])
+            entry['has_depol_cal'] = bool(entry['has_depol_cal'])
+            result.append(entry)
+        return result
+
+
+def sonde_file_info(path):
+    """
+    station (WMO id or GDAS_STATION) and launch time of a sonde file. They are taken from the file name
+    yymmdd_<station>_<hh>z.*, else from the header of a Wyoming or GDAS file.
+
+    >>> sonde_file_info('sondes/171228_10868_00z.txt')
+    ('10868', datetime.datetime(2017, 12, 28, 0, 0))
+    >>> sonde_file_info('170817_GDAS_03Z.txt')
+    ('gdas', datetime.datetime(2017, 8, 17, 3, 0))
+    """
+    match = SONDE_NAME_PATTERN.match(os.path.basename(path))
+    if match:
+        date_str, station, hour_str = match.groups()
+        if station.lower() == GDAS_STATION:
+            station = GDAS_STATION
+        return station, datetime.datetime.strptime(date_str + hour_str, '%y%m%d%H')
+
+    with open(path, 'r') as sonde_file:
+        header_data = next(line.split() for line in sonde_file if line.split())
+    if header_data[0] == 'YR:':
+        # GDAS: YR: yyyy MON: mm DAY: dd HOUR: hh ...
+        return GDAS_STATION, datetime.datetime(
+            int(header_data[1]), int(header_data[3]), int(header_data[5]), int(header_data[7]))
+    # Wyoming: <WMO id> <location> Observations at hhZ dd Mon yyyy
+    return header_data[0], datetime.datetime.strptime(' '.join(header_data[-4:]), '%HZ %d %b %Y')
+
+
+class SondeCatalog(object):
+    """
+    index of the sonde files below sonde_path by station and launch time, stored in the SQLite database of the raw
+    file catalog. Like the raw file catalog, a rescan only reads files that are new or have changed.
+    """
+
+    def __init__(self, db_filename=None, sonde_path=None):
+        if db_filename is None:
+            db_filename = mc.CATALOG_FILE
+        if sonde_path is None:
+            sonde_path = mc.SONDE_PATH
+        self.sonde_path = sonde_path
+        self.connection = sqlite3.connect(db_filename)
+        self.connection.executescript(SONDE_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def scan(self):
+        """
+        updates the catalog. Returns the number of files that have been read. Files that can not be read are
+        recorded with their mtime and size, they are tried again only after they have changed.
+        """
+        known = {}
+        for path, mtime, size in self.connection.execute('SELECT path, mtime, size FROM sonde_files'):
+            known[path] = (mtime, size)
+        failed = {}
+        for path, mtime, size in self.connection.execute('SELECT path, mtime, size FROM sonde_failures'):
+            failed[path] = (mtime, size)
+
+        found = set()
+        entries = []
+        failures = []
+        for root, dirs, files in os.walk(self.sonde_path):
+            for name in files:
+                if not name.endswith(SONDE_FILE_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                found.add(path)
+                if (stat.st_mtime, stat.st_size) in (known.get(path), failed.get(path)):
+                    continue
+                try:
+                    station, launch = sonde_file_info(path)
+                except (IOError, ValueError, IndexError, StopIteration):
+                    logger.warning('%s can not be added to the sonde catalog' % path)
+                    logger.warning("Traceback: %s" % tb.format_exc())
+                    failures.append((path, stat.st_mtime, stat.st_size))
+                    continue
+                entries.append((path, stat.st_mtime, stat.st_size, station, to_timestamp(launch)))
+
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO sonde_files (%s) VALUES (%s)' % (
+                    ', '.join(SONDE_FIELDS), ', '.join(['?'] * len(SONDE_FIELDS))),
+                entries)
+            self.connection.executemany('DELETE FROM sonde_files WHERE path = ?',
+                                        [(path,) for path in set(known) - found])
+            self.connection.executemany('INSERT OR REPLACE INTO sonde_failures (path, mtime, size) VALUES (?, ?, ?)',
+                                        failures)
+            self.connection.executemany('DELETE FROM sonde_failures WHERE path = ?',
+                                        [(path,) for path in set(failed) - found] +
+                                        [(entry[0],) for entry in entries if entry[0] in failed])
+
+        return len(entries)
+
+    def nearest(self, station, launch, max_difference=None):
+        """
+        path of the sounding of station that was launched nearest to the datetime launch, or None if there is none
+        within max_difference (timedelta, default: SONDE_MAX_TIME_DIFFERENCE hours)
+        """
+        if max_difference is None:
+            max_difference = datetime.timedelta(hours=mc.SONDE_MAX_TIME_DIFFERENCE)
+        timestamp = to_timestamp(launch)
+        row = self.connection.execute(
+            'SELECT path FROM sonde_files WHERE station = ? AND launch BETWEEN ? AND ? '
+            'ORDER BY ABS(launch - ?), launch LIMIT 1',
+            (station, timestamp - max_difference.total_seconds(), timestamp + max_difference.total_seconds(),
+             timestamp)).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def entries(self):
+        """
+        all catalog entries ordered by station and launch time. launch is a datetime.
+        """
+        cursor = self.connection.execute(
+            'SELECT %s FROM sonde_files ORDER BY station, launch' % ', '.join(SONDE_FIELDS))
+        result = []
+        for row in cursor:
+            entry = dict(zip(SONDE_FIELDS, row))
+            entry['launch'] = from_timestamp(entry['launch'])
+            result.append(entry)
+        return result
+
+
+def nearest_sonde(station, launch):
+    """
+    path of the sonde file of station in SONDE_PATH that is nearest in time to the datetime launch, or None.
+    The sonde catalog is updated first.
+    """
+    catalog = SondeCatalog()
+    try:
+        catalog.scan()
+        return catalog.nearest(station, launch)
+    finally:
+        catalog.close()
@@ -1,24 +1,42 @@
 import datetime
+import itertools
+import multiprocessing
 import os
 import string
-import zipfile
 import sys
 import traceback as tb
-from collections import Counter
+import zipfile
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
 
 import numpy as np
 import matplotlib.pyplot as plt
 from inqbus.lidar.scc_gui.log import logger
 from netCDF4 import Dataset
-from scipy.io import netcdf
 
 from inqbus.lidar.components import nameddict, error
-from inqbus.lidar.components.error import NoCalIdxFound, PathDoesNotExist, FilesAreDifferent
+from inqbus.lidar.components.ancillary import ancillary_filename, content_hash, write_ancillary_file
+from inqbus.lidar.components.background import estimate_background
+from inqbus.lidar.components.buffer import grow
+from inqbus.lidar.components.catalog import GDAS_STATION, nearest_sonde
+from inqbus.lidar.components.corrections import Corrections, create_corrections, apply_dead_time
+from inqbus.lidar.components.pyramid import SignalPyramid
+from inqbus.lidar.components.scc_writer import SCC_RAW_SCHEMA, SCC_CLOUD_MASK_SCHEMA, SCC_DEPOLCAL_SCHEMA, \
+    write_scc_file, gather_signals
+from inqbus.lidar.components.records import ChannelInfo, MeasurementInfo, ZAxisInfo
+from inqbus.lidar.components.lidar_log import read_lidar_log
+from inqbus.lidar.components.error import NoCalIdxFound, NoProfilesFound
 from inqbus.lidar.components.constants import NO_CLOUD, UNKNOWN_CLOUD, CIRRUS, WATER_CLOUD, NO_CLOUD_MASK, MANUAL_CLOUD_MASK
-from inqbus.lidar.components.util import get_file_from_path
+from inqbus.lidar.components.raw_file import open_raw_file, read_raw_header, check_compatible, time_keys, \
+    datetime_key
+from inqbus.lidar.components.util import get_file_from_path, to_datetime
 from inqbus.lidar.scc_gui.configs import main_config as mc
 
 
+# every change of the data of a signal gets a new version number, see PreProcessedSignals
+DATA_VERSIONS = itertools.count()
+
+
 class BaseContainer(object):
     """
     container of time axis data (start and stop)
@@ -27,6 +45,8 @@ class BaseContainer(object):
     def __init__(self):
         self.header = nameddict.NamedDict()
         self._data = None
+        # GrowableArray of the appended data
+        self._growable = None
 
     @classmethod
     def create_with_data(cls, in_data, header_info):
@@ -42,16 +62,30 @@ class BaseContainer(object):
 
     def append_data(self, new_data, orient='h'):
         """
-        append data of another BaseContainer object
+        append data of another BaseContainer object like np.hstack (orient 'h') or np.vstack (orient 'v').
+        The data grows in a buffer with spare capacity, so repeated appends do not copy the whole data each time.
         :param new_data:
         :return:
+
+        >>> container = BaseContainer.create_with_data(np.array([[1, 2], [3, 4]]), {})
+        >>> container.append_data(np.array([[5], [6]]))
+        >>> container.append_data(np.array([[7, 8]]).T)
+        >>> container.data.tolist()
+        [[1, 2, 5, 7], [3, 4, 6, 8]]
         """
+        data = self.data
         if orient == 'h':
-            self._data = np.hstack((self.data, new_data))
+            axis = 1 if data.ndim > 1 else 0
         elif orient == 'v':
-            self._data = np.vstack((self.data, new_data))
+            if data.ndim < 2:
+                self._data = np.vstack((data, new_data))
+                return
+            axis = 0
         else:
             logger.error('incorrect orientation parameter for BaseContainer.append_data')
+            return
+        self._growable = grow(self._growable, data, new_data, axis)
+        self._data = self._growable.data
 
     @property
     def data(self):
@@ -60,35 +94,49 @@ class BaseContainer(object):
 
 class TimeAxis(BaseContainer):
     """
-    container of time axis data as datetetime.datetime s (start and stop)
+    container of time axis data as numpy datetime64 (start and stop). Use util.to_datetime to get datetime.datetime
+    objects for display and formatting.
 
     >>> a=[[20150501, 60],[20150501, 90], [20150501, 120]]
     >>> stop_times = np.array( a )
     >>> ta = TimeAxis.from_polly_file(stop_times)
-    >>> np.array_equal(ta.data,np.array([[datetime.datetime(2015, 5, 1, 0, 0, 30), datetime.datetime(2015, 5, 1, 0, 1), datetime.datetime(2015, 5, 1, 0, 1, 30)], \
-                        [datetime.datetime(2015, 5, 1, 0, 1), datetime.datetime(2015, 5, 1, 0, 1, 30), datetime.datetime(2015, 5, 1, 0, 2)]]) )
+    >>> np.array_equal(ta.data,np.array([['2015-05-01T00:00:30', '2015-05-01T00:01:00', '2015-05-01T00:01:30'], \
+                        ['2015-05-01T00:01:00', '2015-05-01T00:01:30', '2015-05-01T00:02:00']], dtype='datetime64[s]') )
     True
 
     """
 
+    def __init__(self):
+        super(TimeAxis, self).__init__()
+        self._secs_of_meas_start = None
+        self._secs_of_meas_stop = None
+
     def __str__(self):
         return str(self.data)
 
+    def __len__(self):
+        return self.data.shape[1]
+
     @classmethod
     # stop times in polly format (tuple (int: date, int: seconds of day) )
     def from_polly_file(cls, stop_times):
+        """
+        >>> ta = TimeAxis.from_polly_file(np.array([[20150531, 86370], [20150601, 0], [20150601, 30]]))
+        >>> np.array_equal(ta.stop, np.array(['2015-05-31T23:59:30', '2015-06-01T00:00:00', '2015-06-01T00:00:30'],
+        ...                                  dtype='datetime64[s]'))
+        True
+        """
         result = cls()
 
-        stop = []
-        for t in stop_times:
-            date = datetime.datetime.strptime(str(t[0]), '%Y%m%d')
-            stop.append(date + datetime.timedelta(seconds=int(t[1])))
+        stop_times = np.asarray(stop_times)
+        # the few different dates are converted once, the seconds of day are added to all profiles at once
+        dates, date_idx = np.unique(stop_times[:, 0], return_inverse=True)
+        months = (dates // 10000 - 1970) * 12 + dates // 100 % 100 - 1
+        days = months.astype('datetime64[M]').astype('datetime64[D]') + (dates % 100 - 1)
+        stop_array = days.astype('datetime64[s]')[date_idx] + stop_times[:, 1].astype('timedelta64[s]')
 
-        stop_array = np.array(stop)
         # todo calc mean of time diffs
-        start_array = np.ndarray(
-            shape=stop_array.shape,
-            dtype=stop_array.dtype)
+        start_array = np.empty_like(stop_array)
         start_array[1:] = stop_array[:-1]
         # todo stop_array[0] -duration
         start_array[0] = stop_array[0] - (stop_array[1] - stop_array[0])
@@ -97,13 +145,19 @@ class TimeAxis(BaseContainer):
 
         return result
 
+    def append_data(self, new_data, orient='h'):
+        super(TimeAxis, self).append_data(new_data, orient)
+        self._secs_of_meas_start = None
+        self._secs_of_meas_stop = None
+
     @property
     def start(self):
         """
         >>> a=[[20150501, 60],[20150501, 90], [20150501, 120]]
         >>> stop_times = np.array( a )
         >>> ta = TimeAxis.from_polly_file(stop_times)
-        >>> np.array_equal(ta.start,np.array([datetime.datetime(2015, 5, 1, 0, 0, 30), datetime.datetime(2015, 5, 1, 0, 1), datetime.datetime(2015, 5, 1, 0, 1, 30)]) )
+        >>> np.array_equal(ta.start,np.array(['2015-05-01T00:00:30', '2015-05-01T00:01:00', '2015-05-01T00:01:30'],
+        ...                                  dtype='datetime64[s]') )
         True
         """
         return self.data[0, :]
@@ -114,7 +168,8 @@ class TimeAxis(BaseContainer):
         >>> a=[[20150501, 60],[20150501, 90], [20150501, 120]]
         >>> stop_times = np.array( a )
         >>> ta = TimeAxis.from_polly_file(stop_times)
-        >>> np.array_equal(ta.stop,np.array([datetime.datetime(2015, 5, 1, 0, 1), datetime.datetime(2015, 5, 1, 0, 1, 30), datetime.datetime(2015, 5, 1, 0, 2)]) )
+        >>> np.array_equal(ta.stop,np.array(['2015-05-01T00:01:00', '2015-05-01T00:01:30', '2015-05-01T00:02:00'],
+        ...                                 dtype='datetime64[s]') )
         True
         """
         return self.data[1, :]
@@ -125,25 +180,262 @@ class TimeAxis(BaseContainer):
         >>> a=[[20150501, 60],[20150501, 90], [20150501, 120]]
         >>> stop_times = np.array( a )
         >>> ta = TimeAxis.from_polly_file(stop_times)
-        >>> np.array_equal(ta.time, np.array([[datetime.datetime(2015, 5, 1, 0, 0, 30), datetime.datetime(2015, 5, 1, 0, 1)], \
-                                              [datetime.datetime(2015, 5, 1, 0, 1),     datetime.datetime(2015, 5, 1, 0, 1, 30)],\
-                                              [datetime.datetime(2015, 5, 1, 0, 1, 30), datetime.datetime(2015, 5, 1, 0, 2)]]) )
+        >>> np.array_equal(ta.time, np.array([['2015-05-01T00:00:30', '2015-05-01T00:01:00'], \
+                                              ['2015-05-01T00:01:00', '2015-05-01T00:01:30'],\
+                                              ['2015-05-01T00:01:30', '2015-05-01T00:02:00']], dtype='datetime64[s]') )
         True
         """
         return self.data.transpose()
 
     @property
     def secs_of_meas_start(self):
-        # start time in seconds since start of measurement
-        return self.start - self.start[0]
+        """
+        start time in seconds since start of measurement (int64 array, cached until append_data)
+
+        >>> ta = TimeAxis.from_polly_file(np.array([[20150501, 60],[20150501, 90], [20150501, 120]]))
+        >>> ta.secs_of_meas_start.tolist(), ta.secs_of_meas_stop.tolist()
+        ([0, 30, 60], [30, 60, 90])
+        """
+        if self._secs_of_meas_start is None:
+            self._secs_of_meas_start = (self.start - self.start[0]).astype('timedelta64[s]').astype(np.int64)
+        return self._secs_of_meas_start
 
     @property
     def secs_of_meas_stop(self):
-        # stop time in seconds since start of measurement
-        return self.stop - self.start[0]
+        """stop time in seconds since start of measurement (int64 array, cached until append_data)"""
+        if self._secs_of_meas_stop is None:
+            self._secs_of_meas_stop = (self.stop - self.start[0]).astype('timedelta64[s]').astype(np.int64)
+        return self._secs_of_meas_stop
+
+    def _as_times(self, t):
+        """
+        t (datetime, datetime64 or array of them) as datetime64 in the unit of the axis. Truncating a finer unit does
+        not change the result of the searches, because the profile limits are whole units.
+        """
+        return np.asarray(t, dtype=self.stop.dtype)
+
+    def index_of(self, t):
+        """
+        index of the profile that contains the time t (start <= t < stop), -1 if t is outside of all profiles.
+        t can be a datetime, a datetime64 or an array of them. The profiles are found by binary search.
+
+        >>> ta = TimeAxis.from_polly_file(np.array([[20150501, 60],[20150501, 90], [20150501, 120]]))
+        >>> ta.index_of(datetime.datetime(2015, 5, 1, 0, 1, 10))
+        1
+        >>> ta.index_of(np.array(['2015-05-01T00:00:10', '2015-05-01T00:00:30', '2015-05-01T00:02:00'],
+        ...                      dtype='datetime64[s]')).tolist()
+        [-1, 0, -1]
+        """
+        times = self._as_times(t)
+        idx = np.searchsorted(self.stop, times, side='right')
+        # profiles of different files may have gaps between them
+        inside = self.start[np.minimum(idx, len(self) - 1)] <= times
+        result = np.where((idx < len(self)) & inside, idx, -1)
+        if result.ndim == 0:
+            return int(result)
+        return result
+
+    def slice_between(self, t0, t1):
+        """
+        slice of the profiles that overlap the period t0 ... t1 (datetimes or datetime64)
+
+        >>> ta = TimeAxis.from_polly_file(np.array([[20150501, 60],[20150501, 90], [20150501, 120]]))
+        >>> ta.slice_between(datetime.datetime(2015, 5, 1, 0, 0, 40), datetime.datetime(2015, 5, 1, 0, 1, 30))
+        slice(0, 2, None)
+        >>> ta.slice_between(datetime.datetime(2015, 5, 1, 0, 3), datetime.datetime(2015, 5, 1, 0, 4))
+        slice(3, 3, None)
+        """
+        first = int(np.searchsorted(self.stop, self._as_times(t0), side='right'))
+        last = int(np.searchsorted(self.start, self._as_times(t1), side='left'))
+        return slice(first, max(first, last))
+
+    def profile_sums(self, times, values):
+        """
+        sums and numbers of the values at the sorted times within each profile (start <= time < stop).
+        The intervals are found by binary search and summed by the differences of the cumulative sum.
+
+        >>> ta = TimeAxis.from_polly_file(np.array([[20150501, 60],[20150501, 90], [20150501, 120]]))
+        >>> times = np.array(['2015-05-01T00:00:10', '2015-05-01T00:00:40', '2015-05-01T00:00:50',
+        ...                   '2015-05-01T00:01:40'], dtype='datetime64[s]')
+        >>> sums, counts = ta.profile_sums(times, np.array([1., 2., 3., 4.]))
+        >>> sums.tolist(), counts.tolist()
+        ([5.0, 0.0, 4.0], [2, 0, 1])
+        """
+        times = self._as_times(times)
+        first = np.searchsorted(times, self.start, side='left')
+        last = np.searchsorted(times, self.stop, side='left')
+        cumulative = np.concatenate(([0.], np.cumsum(values, dtype=np.float64)))
+        return cumulative[last] - cumulative[first], last - first
+
+    def period_of_day_times(self, start, end):
+        """
+        datetime64 start and end of the period between the times of day start and end (datetime.time). The period
+        ends on the next day if end is before start. It is placed on the first day of the time axis on which it starts
+        within the time axis, else on the first day on which it overlaps the time axis, else on the first day.
+
+        >>> ta = TimeAxis.from_polly_file(np.array([[20150501, 86340], [20150502, 0], [20150502, 60]]))
+        >>> [str(t) for t in ta.period_of_day_times(datetime.time(0, 0, 30), datetime.time(0, 1))]
+        ['2015-05-02T00:00:30', '2015-05-02T00:01:00']
+        >>> [str(t) for t in ta.period_of_day_times(datetime.time(23, 59, 30), datetime.time(0, 0, 30))]
+        ['2015-05-01T23:59:30', '2015-05-02T00:00:30']
+        """
+        start_offset = np.timedelta64(start.hour * 3600 + start.minute * 60 + start.second, 's')
+        end_offset = np.timedelta64(end.hour * 3600 + end.minute * 60 + end.second, 's')
+        if end < start:
+            end_offset += np.timedelta64(1, 'D')
+
+        days = np.arange(self.start[0].astype('datetime64[D]'), self.stop[-1].astype('datetime64[D]') + 1)
+        t0 = days.astype(self.stop.dtype) + start_offset
+        t1 = days.astype(self.stop.dtype) + end_offset
+
+        day = 0
+        for candidates in [(t0 >= self.start[0]) & (t0 < self.stop[-1]), (t0 < self.stop[-1]) & (t1 > self.start[0])]:
+            if candidates.any():
+                day = int(np.argmax(candidates))
+                break
+        return t0[day], t1[day]
+
+
+class SignalBlock(BaseContainer):
+    """
+    container for the signals of several channels as one 3-dim (time, channel, height) array.
+    The Signal and PreProcessedSignal objects of a Measurement are views into such blocks.
+
+    >>> raw_signal = np.arange(24).reshape((2, 4, 3))  # (time, height, channel) as in polly files
+    >>> block = SignalBlock.from_polly_file(raw_signal, [0, 2])
+    >>> block.data.shape
+    (2, 2, 4)
+    >>> np.array_equal(block.data[:, 1, :], raw_signal[:, :, 2])
+    True
+    """
+
+    def __init__(self):
+        super(SignalBlock, self).__init__()
+        self.version = next(DATA_VERSIONS)
+        # True as long as the data is only a view into a memory mapped file
+        self.lazy = False
+        # background (time, channel) of preprocessed signals
+        self.background = None
+        self._background_growable = None
+
+    def __str__(self):
+        return str(self.header) + str(self.data)
+
+    @classmethod
+    def from_polly_file(cls, raw_signal, positions, lazy=False):
+        """
+        raw_signal: (time, height, channel) signal array of the raw data file
+        positions: channels of the raw data file which are stored in the block
+        """
+        result = cls()
+        dtype = raw_signal_dtype(raw_signal.dtype)
+
+        if lazy and dtype == raw_signal.dtype.newbyteorder('=') and list(positions) == list(range(raw_signal.shape[2])):
+            result._data = raw_signal.transpose((0, 2, 1))
+            result.lazy = True
+        else:
+            result._data = np.empty((raw_signal.shape[0], len(positions), raw_signal.shape[1]), dtype=dtype)
+            copy_raw_signal(result._data, raw_signal, positions)
+
+        return result
+
+    @classmethod
+    def from_raw_block(cls, raw_block, bg_first, bg_last, z_axis, bg_estimator=None, corrections=None):
+        """
+        background subtraction and range correction of all channels of a raw signal block in one pass.
+        bg_first, bg_last: background bins of each block channel
+        bg_estimator: background estimator of each block channel (default: mean)
+        corrections: Corrections of the block channels (default: none)
+        The output is allocated once, subtraction and range correction work in place on it.
+        """
+        result = cls()
 
+        raw_data = raw_block.data
+        result.background = np.empty(raw_data.shape[:2], dtype=mc.SIGNAL_DTYPE)
+        result._data = np.empty(raw_data.shape, dtype=mc.SIGNAL_DTYPE)
+        pre_process_block(raw_data, bg_first, bg_last, z_axis.range_square, result._data, result.background,
+                          bg_estimator, corrections)
 
-class Signal(BaseContainer):
+        return result
+
+    def materialize(self):
+        """
+        copy the data of a lazy block (view into a memory mapped file) into one contiguous array
+        """
+        if self.lazy:
+            # netcdf data is big endian
+            self._data = np.ascontiguousarray(self._data, dtype=self._data.dtype.newbyteorder('='))
+            self.lazy = False
+        return self._data
+
+    def append_data(self, new_data, orient='v'):
+        super(SignalBlock, self).append_data(new_data, orient)
+        self.version = next(DATA_VERSIONS)
+        # stacking has copied the data into memory
+        self.lazy = False
+
+    def append_block(self, other):
+        self.append_data(other.data)
+        if self.background is not None:
+            self._background_growable = grow(self._background_growable, self.background, other.background)
+            self.background = self._background_growable.data
+
+
+class ChannelSignal(BaseContainer):
+    """
+    base for containers of a 2-dim (time, height) signal (1 channel only).
+    The data is either an own array or a view into one channel of a SignalBlock. Channels that refer to the same
+    block channel share their data.
+    """
+
+    def __init__(self):
+        super(ChannelSignal, self).__init__()
+        self.header = ChannelInfo()
+        self._block = None
+        self._block_idx = None
+        self._version = next(DATA_VERSIONS)
+
+    def __str__(self):
+        return str(self.header) + str(self.data)
+
+    @classmethod
+    def from_block(cls, block, block_idx, header_info):
+        result = cls()
+
+        result.header = ChannelInfo(header_info)
+        result._block = block
+        result._block_idx = block_idx
+
+        return result
+
+    @property
+    def data(self):
+        if self._block is not None:
+            return self._block.data[:, self._block_idx, :]
+        return self._data
+
+    @property
+    def data_version(self):
+        """changes whenever the data are changed"""
+        if self._block is not None:
+            return self._block.version
+        return self._version
+
+    def move_to_block(self, block, block_idx):
+        """refers to the channel block_idx of another block that holds the same data"""
+        self._block = block
+        self._block_idx = block_idx
+
+    def append_data(self, new_data, orient='h'):
+        if self._block is not None:
+            # the signal does not refer to the block any more
+            self._data = self.data
+            self._block = None
+        super(ChannelSignal, self).append_data(new_data, orient)
+        self._version = next(DATA_VERSIONS)
+
+
+class Signal(ChannelSignal):
     """
     container for a 2-dim (time, height) signal (1 channel only)
     >>> in_data = np.array([[1,2,3,4],[11,22,33,44],[111,222,333,444]])
@@ -153,21 +445,46 @@ class Signal(BaseContainer):
     True
     """
 
-    def __str__(self):
-        return str(self.header) + str(self.data)
+    def __init__(self):
+        super(Signal, self).__init__()
+        self._lazy = False
 
     @classmethod
     # raw data from nc file and header info
-    def from_polly_file(cls, raw_data, header_info):
+    def from_polly_file(cls, raw_data, header_info, lazy=False):
         result = cls()
 
-        result.header.attrs = header_info.copy()
+        result.header = ChannelInfo(header_info)
         result._data = raw_data
+        result._lazy = lazy
 
         return result
 
+    @property
+    def lazy(self):
+        """True as long as the data is only a view into a memory mapped file"""
+        if self._block is not None:
+            return self._block.lazy
+        return self._lazy
+
+    def materialize(self):
+        """
+        copy the data of a lazy signal (view into a memory mapped file) into memory
+        """
+        if self._block is not None:
+            self._block.materialize()
+        elif self._lazy:
+            self._data = np.array(self._data)
+            self._lazy = False
+        return self.data
+
+    def append_data(self, new_data, orient='h'):
+        super(Signal, self).append_data(new_data, orient)
+        # stacking has copied the data into memory
+        self._lazy = False
+
 
-class PreProcessedSignal(BaseContainer):
+class PreProcessedSignal(ChannelSignal):
     """
     container for a 2-dim (time, height) signal (1 channel only)
     >>> in_data = np.array([[1,2,3,4],[11,22,33,44],[111,222,333,444]])
@@ -176,36 +493,196 @@ class PreProcessedSignal(BaseContainer):
 
     def __init__(self):
         super(PreProcessedSignal, self).__init__()
-        self.bg = None
+        self._bg = None
 
-    def __str__(self):
-        return str(self.header) + str(self.data)
+    @property
+    def bg(self):
+        if self._block is not None:
+            return TimeSeries.with_data(self._block.background[:, self._block_idx], {'dummy': 0})
+        return self._bg
+
+    @bg.setter
+    def bg(self, value):
+        self._bg = value
 
     @classmethod
-    def from_rawsig(cls, raw_sig, range_axis):
+    def from_rawsig(cls, raw_sig, range_axis, corrections=None):
         """
         raw data from nc file and header info
+        corrections: Corrections of the channel (default: none)
         """
         result = cls()
 
-        result.header.attrs = raw_sig.header.attrs.copy()
-
-        result.bg = TimeSeries.with_data(np.average(
-            raw_sig.data[:, result.header.bg_first: result.header.bg_last], axis=1), {'dummy': 0})
+        result.header = raw_sig.header.copy()
 
-        bg_cor_data = np.subtract(
-            raw_sig.data, result.bg.data.reshape(len(result.bg.data), 1))
-        range_square = (
-            np.square(
-                range_axis.data).reshape(
-                1, len(
-                    range_axis.data)))
+        bg_first, bg_last, bg_estimator = pre_processing_settings(result.header)[:3]
+        # the channel is preprocessed as a block with one channel
+        raw_data = raw_sig.data[:, np.newaxis, :]
+        data = np.empty(raw_data.shape, dtype=mc.SIGNAL_DTYPE)
+        background = np.empty(raw_data.shape[:2], dtype=mc.SIGNAL_DTYPE)
+        pre_process_block(raw_data, [bg_first], [bg_last], np.square(range_axis.data), data, background,
+                          [bg_estimator], corrections)
 
-        result._data = np.multiply(bg_cor_data, range_square)
+        result.bg = TimeSeries.with_data(background[:, 0], {'dummy': 0})
+        result._data = data[:, 0]
 
         return result
 
 
+class PreProcessedSignals(Mapping):
+    """
+    lazy mapping channel name -> PreProcessedSignal of a measurement.
+
+    The background and range corrected signal of a channel is computed on first access and cached. The first
+    channel of each raw block channel stores its result in the preprocessed signal block; duplicate channels share it
+    if they use the same background window. A cached signal is computed again if the raw data, the background window
+    or the first valid bin of its channel have changed.
+    """
+
+    def __init__(self, measurement):
+        self.measurement = measurement
+        # (time, channel, height) block of the preprocessed signals and the raw block it belongs to
+        self.block = None
+        self._raw_block = None
+        self._signals = {}
+        # channel name -> cache key of the cached signal
+        self._keys = {}
+
+    def __iter__(self):
+        return iter(self.measurement.signals.attrs)
+
+    def __len__(self):
+        return len(self.measurement.signals.attrs)
+
+    def __contains__(self, ch_name):
+        return ch_name in self.measurement.signals.attrs
+
+    def __getitem__(self, ch_name):
+        if self._keys.get(ch_name) != self.cache_key(ch_name):
+            self.compute([ch_name])
+        return self._signals[ch_name]
+
+    def cache_key(self, ch_name):
+        signal = self.measurement.signals[ch_name]
+        return (signal.data_version, pre_processing_settings(signal.header),
+                self.measurement.z_axis.header.first_valid_bin, self.measurement.dark_region)
+
+    def cache_state(self):
+        """
+        channel name -> True if the preprocessed signal of the channel is computed and up to date
+        """
+        return {ch_name: self._keys.get(ch_name) == self.cache_key(ch_name) for ch_name in self}
+
+    def invalidate(self, ch_names=None):
+        if ch_names is None:
+            self._keys = {}
+        else:
+            for ch_name in ch_names:
+                self._keys.pop(ch_name, None)
+
+    def revalidate(self, ch_names):
+        """
+        keeps the cached signals of the channels ch_names after their unchanged raw data has been moved to a new raw
+        block
+        """
+        for ch_name in ch_names:
+            self._keys[ch_name] = self.cache_key(ch_name)
+
+    def _block_owners(self):
+        """block channel -> name of the first channel that refers to it"""
+        owners = {}
+        for ch_name in self:
+            signal = self.measurement.signals[ch_name]
+            if signal._block is self.measurement.raw_block:
+                owners.setdefault(signal._block_idx, ch_name)
+        return owners
+
+    def set_block(self, block):
+        """
+        uses a preprocessed signal block that has already been computed (by the workers of parallel reading)
+        """
+        signals = self.measurement.signals
+        self.block = block
+        self._raw_block = self.measurement.raw_block
+        self._keys = {}
+        owners = self._block_owners()
+        for ch_name in self:
+            signal = signals[ch_name]
+            owner = owners.get(signal._block_idx) if signal._block is self.measurement.raw_block else None
+            if owner is not None and pre_processing_settings(signals[owner].header) == \
+                    pre_processing_settings(signal.header):
+                self._signals[ch_name] = PreProcessedSignal.from_block(self.block, signal._block_idx,
+                                                                       signal.header)
+                self._keys[ch_name] = self.cache_key(ch_name)
+
+    def corrections(self, raw_data, settings):
+        """
+        Corrections of the channels of the (time, channel, height) raw signal array raw_data.
+        settings: pre_processing_settings of each channel
+        """
+        measurement = self.measurement
+        bg_first, bg_last, bg_estimator, dead_time, overlap_file = zip(*settings)
+        corrections = create_corrections(dead_time, overlap_file, measurement.shots.data, measurement.header.bin_res,
+                                         measurement.z_axis.range_axis.data)
+        if measurement.dark_region is not None:
+            corrections.dark = dark_signal(raw_data, bg_first, bg_last, bg_estimator, corrections.dead_time,
+                                           measurement.dark_region)
+        return corrections
+
+    def compute(self, ch_names=None):
+        """
+        computes the preprocessed signals of the channels ch_names (default: all) that are not cached.
+        Block channels are computed in batched passes over runs of consecutive block channels.
+        """
+        signals = self.measurement.signals
+        raw_block = self.measurement.raw_block
+        z_axis = self.measurement.z_axis
+
+        if ch_names is None:
+            ch_names = list(self)
+        if self._raw_block is not raw_block or self.block.data.shape != raw_block.data.shape:
+            # signals cached before refer to the previous block
+            self.block = SignalBlock.create_with_data(np.empty(raw_block.data.shape, dtype=mc.SIGNAL_DTYPE), {})
+            self.block.background = np.empty(raw_block.data.shape[:2], dtype=mc.SIGNAL_DTYPE)
+            self._raw_block = raw_block
+        stale = [ch_name for ch_name in ch_names if self._keys.get(ch_name) != self.cache_key(ch_name)]
+
+        owners = self._block_owners()
+        # channels stored in the block -> block channel
+        shared = {}
+        # block channels to compute -> channel that owns the block channel
+        block_chs = {}
+        for ch_name in stale:
+            signal = signals[ch_name]
+            owner = owners.get(signal._block_idx) if signal._block is raw_block else None
+            if owner is None or pre_processing_settings(signals[owner].header) != \
+                    pre_processing_settings(signal.header):
+                # own background window or corrections
+                self._signals[ch_name] = PreProcessedSignal.from_rawsig(
+                    signal, z_axis.range_axis,
+                    self.corrections(signal.data[:, np.newaxis, :], [pre_processing_settings(signal.header)]))
+                self._keys[ch_name] = self.cache_key(ch_name)
+            else:
+                shared[ch_name] = signal._block_idx
+                if self._keys.get(owner) != self.cache_key(owner) or self._signals[owner]._block is not self.block:
+                    block_chs[signal._block_idx] = owner
+
+        for run in consecutive_runs(sorted(block_chs)):
+            chs = slice(run[0], run[-1] + 1)
+            settings = [pre_processing_settings(signals[block_chs[idx]].header) for idx in run]
+            bg_first, bg_last, bg_estimator = list(zip(*settings))[:3]
+            pre_process_block(raw_block.data[:, chs], bg_first, bg_last, z_axis.range_square,
+                              self.block.data[:, chs], self.block.background[:, chs], bg_estimator,
+                              self.corrections(raw_block.data[:, chs], settings))
+            for idx in run:
+                shared[block_chs[idx]] = idx
+
+        for ch_name, block_idx in shared.items():
+            self._signals[ch_name] = PreProcessedSignal.from_block(self.block, block_idx,
+                                                                   signals[ch_name].header)
+            self._keys[ch_name] = self.cache_key(ch_name)
+
+
 class TimeSeries(BaseContainer):
     """
     container for a 1-dim variable (along time axis)
@@ -225,125 +702,192 @@ class TimeSeries(BaseContainer):
         return result
 
 
+# parsed sonde files by path -> ((mtime, size), Sonde), the least recently used first
+_sonde_cache = OrderedDict()
+
+
 class Sonde(object):
     def __init__(self):
         self.header = nameddict.NamedDict()
         self._data = nameddict.NamedDict()
 
+    @classmethod
+    def from_sonde_file(cls, sonde_filename, measurementID):
+        """
+        sounding of a GDAS (name contains gdas), University of Wyoming (.txt) or Ninjo (.csv) file
+        """
+        sonde_name = os.path.basename(sonde_filename)
+        if sonde_name.count('gdas'):
+            return cls.from_gdas_file(sonde_filename, measurementID)
+        if sonde_name.endswith('.txt'):
+            return cls.from_file(sonde_filename, measurementID)
+        if sonde_name.endswith('.csv'):
+            return cls.from_csv_file(sonde_filename, measurementID)
+        raise error.WrongFileFormat
+
+    @classmethod
+    def from_cache(cls, sonde_filename, measurementID):
+        """
+        sounding of a sonde file like from_sonde_file. A file is parsed only once and again if it has been modified:
+        the soundings are kept in memory (the SONDE_CACHE_ENTRIES least recently used) and as arrays in
+        SONDE_CACHE_PATH. The data arrays are shared and read-only.
+        """
+        path = os.path.abspath(sonde_filename)
+        stat = os.stat(path)
+        key = (stat.st_mtime, stat.st_size)
+
+        if path in _sonde_cache and _sonde_cache[path][0] == key:
+            _sonde_cache.move_to_end(path)
+            cached = _sonde_cache[path][1]
+        else:
+            cached = cls.read_cache_file(path, key)
+            if cached is None:
+                cached = cls.from_sonde_file(path, '')
+                cached.write_cache_file(path, key)
+            for values in cached.data.values():
+                values.flags.writeable = False
+            _sonde_cache[path] = (key, cached)
+            while len(_sonde_cache) > mc.SONDE_CACHE_ENTRIES:
+                _sonde_cache.popitem(last=False)
+
+        result = cls()
+        result.header.update(cached.header.attrs)
+        result.header.filename = 'rs_' + measurementID + '.nc'
+        result.data.update(cached.data.attrs)
+        return result
+
+    @staticmethod
+    def cache_filename(path):
+        return os.path.join(mc.SONDE_CACHE_PATH, os.path.basename(path) + '.npz')
+
+    @classmethod
+    def read_cache_file(cls, path, key):
+        """
+        sounding of the sonde file path from SONDE_CACHE_PATH, None if it is not cached for this version (key) of the
+        file
+        """
+        cache_filename = cls.cache_filename(path)
+        if not os.path.exists(cache_filename):
+            return None
+        try:
+            with np.load(cache_filename) as cache_file:
+                if cache_file['path'].item() != path or tuple(cache_file['key'].tolist()) != key:
+                    return None
+                result = cls()
+                for name in cache_file.files:
+                    if name.startswith('header_'):
+                        result.header[name[len('header_'):]] = cache_file[name].item()
+                    elif name.startswith('data_'):
+                        result.data[name[len('data_'):]] = cache_file[name]
+        except (IOError, ValueError, KeyError, zipfile.BadZipFile):
+            logger.warning('sonde cache file %s can not be read' % cache_filename)
+            return None
+        return result
+
+    def write_cache_file(self, path, key):
+        """
+        stores the sounding of the sonde file path in SONDE_CACHE_PATH for this version (key) of the file
+        """
+        cache_filename = self.cache_filename(path)
+        arrays = {'path': np.array(path), 'key': np.array(key)}
+        for name, value in self.header.items():
+            if name == 'filename':
+                continue
+            if isinstance(value, datetime.datetime):
+                value = np.datetime64(value, 's')
+            arrays['header_' + name] = np.array(value)
+        for name, values in self.data.items():
+            arrays['data_' + name] = values
+        try:
+            if not os.path.isdir(mc.SONDE_CACHE_PATH):
+                os.makedirs(mc.SONDE_CACHE_PATH)
+            # a partly written cache file is never read
+            with open(cache_filename + '.tmp', 'wb') as cache_file:
+                np.savez(cache_file, **arrays)
+            os.replace(cache_filename + '.tmp', cache_filename)
+        except (IOError, OSError):
+            logger.warning('sonde cache file %s can not be written' % cache_filename)
+
     @classmethod
     def from_file(cls, sonde_filename, measurementID):
+        """
+        sounding in the text format of the University of Wyoming. The table between the column header
+        (SONDE_HEADER_STR) and the station information (SONDE_BOTTOM_STR) has fixed width columns.
+        """
         result = cls()
 
-        dummy = {
-            'alt': [],
-            'pp': [],
-            'tt': [],
-            'td': [],
-            'rh': []}
-
-        sf = open(sonde_filename, 'r')
-        lines = sf.readlines()
-        l = 0
-        while len(str.split(lines[l])) == 0:
-            l = + 1
-        header_data = str.split(lines[l])
+        with open(sonde_filename, 'r') as sf:
+            lines = sf.readlines()
+
+        header_data = next(line.split() for line in lines if line.split())
         result.header.location = header_data[1]
         result.header.WMO_id = header_data[0]
         result.header.time = datetime.datetime.strptime(
             ' '.join(header_data[-4:]), '%HZ %d %b %Y')
         result.header.filename = 'rs_' + measurementID + '.nc'
 
-        first_l = 0
-        last_l = 0
-        for l in range(len(lines)):
-            if lines[l].count(mc.SONDE_HEADER_STR) and first_l == 0:
-                first_l = l + 2
-            if lines[l].count(mc.SONDE_BOTTOM_STR) and last_l == 0:
-                last_l = l - 1
-            if lines[l].count('latitude'):
-                result.header.latitude = float(
-                    str.split(lines[l], ':')[1])
-            if lines[l].count('longitude'):
-                result.header.longitude = float(
-                    str.split(lines[l], ':')[1])
-            if lines[l].count('elevation'):
-                result.header.altitude = float(
-                    str.split(lines[l], ':')[1])
-
-        for line in lines[first_l: last_l]:
-            try:
-                pp = float(line[0:7])
-                alt = float(line[7:14])
-                tt = float(line[14:21])
-                rh = float(line[28:35])
-                dummy['pp'].append(pp)
-                dummy['alt'].append(alt)
-                dummy['tt'].append(tt)
-                dummy['rh'].append(rh)
-            except BaseException:
-                Error = 1
-        sf.close()
-
-        for k in dummy.keys():
-            result._data.attrs[k] = np.array(dummy[k])
+        first_l = next(l for l, line in enumerate(lines) if mc.SONDE_HEADER_STR in line) + 2
+        last_l = next(l for l, line in enumerate(lines) if mc.SONDE_BOTTOM_STR in line) - 1
+        for line in lines[last_l:]:
+            for key, name in (('latitude', 'latitude'), ('longitude', 'longitude'), ('elevation', 'altitude')):
+                if key in line:
+                    result.header[name] = float(line.split(':')[1])
+
+        # PRES, HGHT, TEMP, DWPT, RELH. Levels without pressure, height, temperature or humidity are skipped
+        table = sonde_values(sonde_fields(''.join(lines[first_l: last_l]), 5, widths=[7] * 5))
+        table = table[~np.isnan(table[:, [0, 1, 2, 4]]).any(axis=1)]
+
+        result._data.attrs.update(
+            {'pp': table[:, 0], 'alt': table[:, 1], 'tt': table[:, 2], 'td': table[:, 3], 'rh': table[:, 4]})
 
         return result
 
     @classmethod
     def from_gdas_file(cls, sonde_filename, measurementID):
+        """
+        GDAS profile interpolated to the lidar site (profile.exe of the ARL READY tools). The heights are marked with
+        E (estimated).
+        """
         result = cls()
 
-        dummy = {'alt': [], 'pp': [], 'tt': [], 'td': []}  # , 'rh':[]}
-
-        sf = open(sonde_filename, 'r')
-        lines = sf.readlines()
-        sf.close()
+        with open(sonde_filename, 'r') as sf:
+            lines = sf.readlines()
 
         result.header.WMO_id = '_____'
 
-        y = int(lines[0].split()[1])
-        m = int(lines[0].split()[3])
-        d = int(lines[0].split()[5])
-        h = int(lines[0].split()[7])
-        result.header.time = datetime.datetime(y, m, d, h)
+        header_data = lines[0].split()
+        result.header.time = datetime.datetime(
+            int(header_data[1]), int(header_data[3]), int(header_data[5]), int(header_data[7]))
         result.header.location = 'GDAS_interpolated_to_lidar_site'
         result.header.filename = 'rs_' + measurementID + '.nc'
 
-        result.header.latitude = float(lines[0].split()[-3])
-        result.header.longitude = float(lines[0].split()[-1])
-        result.header.altitude = mc.NC_FILL_FOAT
-
-        # search for first empty line
-        first_line = 0
-        while len(lines[first_line].split()) > 0:
-            first_line = first_line + 1
-        # first data line is 5 lines below
-        first_line = first_line + 5
+        result.header.latitude = float(header_data[-3])
+        result.header.longitude = float(header_data[-1])
 
+        # the first data line is 5 lines below the first empty line
+        first_line = next(l for l, line in enumerate(lines) if not line.split()) + 5
         result.header.altitude = float(
             lines[first_line].split()[1].split('.')[0])
-        for l in lines[first_line:]:
-            line_data = l.split()
-            if len(line_data) >= 4:
-                dummy['pp'].append(float(line_data[0]))
-                dummy['alt'].append(float(line_data[1].split('.')[0]))
-                dummy['tt'].append(float(line_data[2]))
-                dummy['td'].append(float(line_data[3]))
 
-        for k in dummy.keys():
-            result._data.attrs[k] = np.array(dummy[k])
+        # PRESS, HGT(MSL), TEMP, DEW PT. Lines with less columns (the surface) are skipped
+        table = sonde_values(sonde_fields(''.join(lines[first_line:]).replace('E', ''), 4))
+        table = table[~np.isnan(table).any(axis=1)]
+
+        result._data.attrs.update(
+            {'pp': table[:, 0], 'alt': np.trunc(table[:, 1]), 'tt': table[:, 2], 'td': table[:, 3]})
 
         return result
 
     @classmethod
     def from_csv_file(cls, sonde_filename, measurementID):
+        """
+        sounding exported by Ninjo: yymmdd_<WMO id>_<hh>z.csv with the columns pressure (hPa); altitude (km with a
+        decimal point, or m); temperature; dew point (with decimal commas); relative humidity, from the top to the
+        ground. The first line is skipped. Levels that do not increase in altitude and decrease in pressure are
+        skipped, as are repeated levels.
+        """
         result = cls()
 
-        dummy = {'alt': [], 'pp': [], 'tt': [], 'td': [], 'rh': []}
-
-        sf = open(sonde_filename, 'r')
-        lines = sf.readlines()
-
         result.header.WMO_id = os.path.split(sonde_filename)[1].split('_')[1]
         date_str = os.path.split(sonde_filename)[1].split('_')[0]
         time_str = os.path.split(sonde_filename)[1].split('_')[2].split('z')[0]
@@ -356,87 +900,74 @@ class Sonde(object):
         result.header.longitude = mc.SONDE_STATIONS[result.header.WMO_id]['lon']
         result.header.altitude = mc.SONDE_STATIONS[result.header.WMO_id]['alt']
 
-        for l in range(len(lines) - 1, 0, -1):
-            line_data = lines[l].split(';')
-            try:
-                pp = float(line_data[0])
-                alt = float(
-                    line_data[1].ljust(
-                        line_data[1].rfind('.') + 4,
-                        '0').replace(
-                        '.',
-                        ''))
-                tt = float(line_data[2].replace(',', '.'))
-                rh = float(line_data[4])
-
-                if len(dummy['pp']) == 0:
-                    dummy['pp'].append(pp)
-                    dummy['alt'].append(alt)
-                    dummy['tt'].append(tt)
-                    dummy['rh'].append(rh)
-                else:
-                    if (pp != dummy['pp'][-1]) and (alt != dummy['alt'][-1]):
-                        dummy['pp'].append(pp)
-                        dummy['alt'].append(alt)
-                        dummy['tt'].append(tt)
-                        dummy['rh'].append(rh)
+        with open(sonde_filename, 'r') as sf:
+            sf.readline()
+            text = sf.read()
+
+        # from the ground to the top
+        fields = sonde_fields(text.replace(',', '.'), 5, separator=';')[::-1]
+        table = sonde_values(fields)
+        # altitudes with a decimal point are in km
+        table[:, 1] = np.where(np.char.find(fields[:, 1], b'.') >= 0, np.round(table[:, 1] * 1000.), table[:, 1])
 
-            except BaseException:
-                Error = 1
-        sf.close()
+        table = table[~np.isnan(table[:, [0, 1, 2, 4]]).any(axis=1)]
+        pp, alt = table[:, 0], table[:, 1]
+        rising = np.ones(len(table), dtype=bool)
+        rising[1:] = (alt[1:] > np.maximum.accumulate(alt)[:-1]) & (pp[1:] < np.minimum.accumulate(pp)[:-1])
+        table = table[rising]
 
-        for k in dummy.keys():
-            result._data.attrs[k] = np.array(dummy[k])
+        result._data.attrs.update(
+            {'pp': table[:, 0], 'alt': table[:, 1], 'tt': table[:, 2], 'td': table[:, 3], 'rh': table[:, 4]})
 
         return result
 
     def write_scc_sonde_file(self):
+        """
+        writes the SCC sonde file to OUT_PATH, unless it already exists with the same content. header.filename is set
+        to its name rs_<station>_<launch>_<hash>.nc, so the SCC raw data files of all measurements that use this
+        sounding refer to the same file. Returns True if the file has been written.
+        """
         dt = datetime.timedelta(hours=2)
 
-        outfile = netcdf.netcdf_file(
-            os.path.join(
-                mc.OUT_PATH,
-                self.header.filename),
-            'w',
-            False,
-            1)
-
-        outfile.Sounding_Start_Date = (
-            self.header.time - dt).strftime('%Y%m%d')
-        outfile.Sounding_Date_Format = "YYYYMMDD"
-
-        outfile.Sounding_Start_Time_UT = (
-            self.header.time - dt).strftime('%H%M%S')
-        outfile.Sounding_Stop_Time_UT = self.header.time.strftime('%H%M%S')
-        outfile.Sounding_Time_Format = "HHMMSS"
-
-        outfile.Latitude_degrees_north = np.float64(self.header.latitude)
-        outfile.Longitude_degrees_east = np.float64(self.header.longitude)
-        outfile.Altitude_meter_asl = np.float64(self.header.altitude)
-        outfile.Location = self.header.location
-
-        dim = outfile.createDimension('points', len(self.data['pp']))
-
-        pres_var = outfile.createVariable('Pressure', np.float64, ('points',))
-        pres_var.Units = 'hPa'
-        temp_var = outfile.createVariable(
-            'Temperature', np.float64, ('points',))
-        temp_var.Units = 'C'
-        alt_var = outfile.createVariable('Altitude', np.float64, ('points',))
-#        alt_var.Comments = 'Height above lidar station'
-        alt_var.Units = 'm'
-
-        pres_var[:] = self.data['pp'][:]
-        temp_var[:] = self.data['tt'][:]
-        alt_var[:] = self.data['alt'][:] - outfile.Altitude_meter_asl
-
+        attributes = {
+            'Sounding_Start_Date': (self.header.time - dt).strftime('%Y%m%d'),
+            'Sounding_Date_Format': "YYYYMMDD",
+            'Sounding_Start_Time_UT': (self.header.time - dt).strftime('%H%M%S'),
+            'Sounding_Stop_Time_UT': self.header.time.strftime('%H%M%S'),
+            'Sounding_Time_Format': "HHMMSS",
+            'Latitude_degrees_north': np.float64(self.header.latitude),
+            'Longitude_degrees_east': np.float64(self.header.longitude),
+            'Altitude_meter_asl': np.float64(self.header.altitude),
+            'Location': self.header.location,
+        }
+
+        # variable name -> (values, units)
+        variables = {
+            'Pressure': (self.data['pp'], 'hPa'),
+            'Temperature': (self.data['tt'], 'C'),
+            # height above lidar station
+            'Altitude': (self.data['alt'] - attributes['Altitude_meter_asl'], 'm'),
+        }
         if 'mr' in self.data.keys():
-            mr_var = outfile.createVariable(
-                'MixingRatio', np.float64, ('points',))
-            mr_var.Units = 'g/kg'
-            mr_var[:] = self.data['mr'][:]
+            variables['MixingRatio'] = (self.data['mr'], 'g/kg')
+
+        def write(outfile):
+            for name, value in attributes.items():
+                setattr(outfile, name, value)
 
-        outfile.close()
+            outfile.createDimension('points', len(self.data['pp']))
+            for name, (values, units) in variables.items():
+                var = outfile.createVariable(name, np.float64, ('points',))
+                var.Units = units
+                var[:] = values
+
+        content = dict(attributes, **{name + ':Units': units for name, (values, units) in variables.items()})
+        arrays = {name: np.asarray(values, dtype=np.float64) for name, (values, units) in variables.items()}
+        digest = content_hash(content, arrays)
+        self.header.filename = ancillary_filename('rs', self.header.WMO_id.strip('_') or GDAS_STATION,
+                                                  self.header.time, digest)
+
+        return write_ancillary_file(os.path.join(mc.OUT_PATH, self.header.filename), content, arrays, write, digest)
 
     @property
     def data(self):
@@ -452,14 +983,26 @@ class ZAxis(object):
     """
 
     def __init__(self):
-        self.header = nameddict.NamedDict()
+        self.header = ZAxisInfo()
         self._range_axis = None
+        self._range_square = None
         self._height_axis = None
         self._altitude_axis = None
+        self._cache_key = None
 
     def __str__(self):
         return str(self.header) + str(self.data)
 
+    def _check_cache(self):
+        """drops the cached axes if the number of points or the first valid bin have been changed"""
+        key = (self.header.points, self.header.first_valid_bin)
+        if key != self._cache_key:
+            self._range_axis = None
+            self._range_square = None
+            self._height_axis = None
+            self._altitude_axis = None
+            self._cache_key = key
+
     @classmethod
     def from_polly_file(cls, header_info):
         """
@@ -467,7 +1010,7 @@ class ZAxis(object):
         """
         result = cls()
 
-        result.header.attrs = header_info.copy()
+        result.header = ZAxisInfo(header_info)
         result.header.range_res = result.header.bin_res * \
             1E-9 * mc.LIGHT_SPEED / 2  # bin resolution in ns
         result.header.vert_res = result.header.range_res * \
@@ -479,6 +1022,7 @@ class ZAxis(object):
 
     @property
     def range_axis(self):
+        self._check_cache()
         if not self._range_axis:
             axis_data = (np.array(range(self.header.points)) + 0.5 -
                          self.header.first_valid_bin) * self.header.range_res
@@ -486,9 +1030,18 @@ class ZAxis(object):
                 axis_data, self.header)
         return self._range_axis
 
+    @property
+    def range_square(self):
+        """square of the range axis for the range correction"""
+        self._check_cache()
+        if self._range_square is None:
+            self._range_square = np.square(self.range_axis.data)
+        return self._range_square
+
     @property
     def height_axis(self):
         """height above lidar, vertically pointing"""
+        self._check_cache()
         if not self._height_axis:
             axis_data = (np.array(range(self.header.points)) + 0.5 -
                          self.header.first_valid_bin) * self.header.vert_res
@@ -499,6 +1052,7 @@ class ZAxis(object):
     @property
     def alt_axis(self):
         """height above sea level, vertically pointing"""
+        self._check_cache()
         if not self._altitude_axis:
             axis_data = (np.array(range(self.header.points)) + 0.5 - \
                          self.header.first_valid_bin) * self.header.vert_res + self.header.altitude
@@ -506,16 +1060,50 @@ class ZAxis(object):
                 axis_data, self.header)
         return self._altitude_axis
 
-    def m_2_bin(self, altitude_m):
-        """height above lidar to bin"""
-        res =  np.where(self._height_axis.data > altitude_m)
-        res = res[0][0]
-        return res
+    def _axis(self, axis):
+        """cached data, resolution and offset of the range, height or altitude axis"""
+        if axis == 'range':
+            return self.range_axis.data, self.header.range_res, 0.
+        if axis == 'height':
+            return self.height_axis.data, self.header.vert_res, 0.
+        if axis == 'altitude':
+            return self.alt_axis.data, self.header.vert_res, self.header.altitude
+        raise ValueError('unknown z axis %s' % axis)
+
+    def m_2_bin(self, altitude_m, axis='height'):
+        """
+        first bin above altitude_m on the range, height (above lidar, default) or altitude (above sea level) axis.
+        altitude_m can be a scalar or an array. Altitudes beyond the axis give the number of points.
+
+        >>> z_axis = ZAxis.from_polly_file({'points': 8, 'bin_res': 50., 'zenith_angle': 0., 'altitude': 100.})
+        >>> z_axis.header.first_valid_bin = 2
+        >>> z_axis.m_2_bin(10.), z_axis.m_2_bin(np.array([-100., 7.5, 20., 1000.])).tolist()
+        (3, [0, 3, 5, 8])
+        >>> z_axis.m_2_bin(110., axis='altitude')
+        3
+        """
+        data = self._axis(axis)[0]
+        result = np.searchsorted(data, altitude_m, side='right')
+        if np.ndim(result) == 0:
+            return int(result)
+        return result
+
+    def bin_2_height(self, bin, axis='height'):
+        """
+        range, height (above lidar, default) or altitude (above sea level) of the center of a bin.
+        bin can be a scalar or an array, also of fractional bins.
 
-    def bin_2_height(self, bin):
-        """bin to height above lidar"""
-        res = self.height_axis[bin - self.header.first_valid_bin]
-        return res
+        >>> z_axis = ZAxis.from_polly_file({'points': 8, 'bin_res': 50., 'zenith_angle': 0., 'altitude': 100.})
+        >>> z_axis.header.first_valid_bin = 2
+        >>> np.allclose(z_axis.bin_2_height(np.arange(8)), z_axis.height_axis.data)
+        True
+        >>> np.allclose(z_axis.bin_2_height(np.arange(8), axis='altitude'), z_axis.alt_axis.data)
+        True
+        >>> np.array_equal(z_axis.m_2_bin(z_axis.bin_2_height(np.arange(8) - 0.5)), np.arange(8))
+        True
+        """
+        resolution, offset = self._axis(axis)[1:]
+        return (np.asarray(bin, dtype=np.float64) + 0.5 - self.header.first_valid_bin) * resolution + offset
 
 
 class Measurement(object):
@@ -524,12 +1112,16 @@ class Measurement(object):
     """
 
     def __init__(self):
-        self.header = nameddict.NamedDict()
+        self.header = MeasurementInfo()
         self.time_axis = None
 
         self.z_axis = None
         self.signals = nameddict.NamedDict()
-        self.pre_processed_signals = nameddict.NamedDict()
+        self.pre_processed_signals = PreProcessedSignals(self)
+        # channel name -> (cache key of the preprocessed signal, SignalPyramid), see signal_pyramid
+        self._pyramids = {}
+        # (time, channel, height) array of all channels. self.signals are views into it
+        self.raw_block = None
         self.sounding = None
         self.shots = None
         self.depol_cal_angle = None
@@ -540,6 +1132,15 @@ class Measurement(object):
         # will be set by read_signal
         self.header.cloud_mask_type = NO_CLOUD_MASK
         self.title = None
+        # memory mapped nc files the signals refer to. will be closed by close()
+        self._nc_files = []
+        # raw data files of the measurement and the indices of the channels that are not read yet (see load_channels)
+        self._sources = []
+        self._pending_channels = []
+        # profiles (first, last) of a dark measurement, which is subtracted by the preprocessing
+        self.dark_region = None
+        # attribute name -> GrowableArray of the per profile arrays that grow in append_nc_file
+        self._growables = {}
         self.telecover_data = {'profiles':{},
                                'used_sectors':[],
                                'used_tc_sectors': [],
@@ -556,6 +1157,13 @@ class Measurement(object):
         self.cloud_mask[:, :] = NO_CLOUD
         self.header.cloud_mask_type = NO_CLOUD_MASK
 
+    def set_dark_region(self, a_region):
+        """
+        uses the mean of the profiles a_region (first, last), recorded with closed shutter, as dark signal.
+        The preprocessed signals are computed again on the next access.
+        """
+        self.dark_region = (int(a_region[0]), int(a_region[1]))
+
     def set_telecover_region(self, a_region, sector_name):
         if not sector_name in self.telecover_data['used_sectors']:
             self.telecover_data['used_sectors'].append(sector_name)
@@ -713,8 +1321,8 @@ class Measurement(object):
 
     def export_telecover_to_ASCII(self):
         r_axis = self.z_axis.range_axis.data
-        max_output_bin = np.where(r_axis > mc.TC_MAX_OUTPUT_HEIGHT)[0][0]
-        first_output_bin = np.where(r_axis > 0)[0][0]
+        max_output_bin = self.z_axis.m_2_bin(mc.TC_MAX_OUTPUT_HEIGHT, axis='range')
+        first_output_bin = self.z_axis.m_2_bin(0., axis='range')
 
         out_dir = os.path.join(mc.TELECOVER_PATH, '{}_telecover'.format(self.telecover_data['tc_date'].strftime('%Y%m%d')))
         if not os.path.exists(out_dir):
@@ -744,11 +1352,12 @@ class Measurement(object):
             outfile.close()
 
     def analyse_telecover(self):
-        norm_bin_first = np.where(self.z_axis.height_axis.data > mc.TC_NORMALIZATION_RANGE[0])[0][0]
-        norm_bin_last  = np.where(self.z_axis.height_axis.data > mc.TC_NORMALIZATION_RANGE[1])[0][0]
+        self.load_full_resolution()
+        self.pre_processed_signals.compute()
+        norm_bin_first, norm_bin_last = self.z_axis.m_2_bin(np.array(mc.TC_NORMALIZATION_RANGE))
         points_smooth = int(self.z_axis.height_axis.data.size / mc.TC_SMOOTH_BINS)
         self.telecover_data['range_smooth'] = np.average(self.z_axis.range_axis.data.reshape((points_smooth, mc.TC_SMOOTH_BINS)), axis=1)
-        self.telecover_data['tc_date'] = self.time_axis.start[0]
+        self.telecover_data['tc_date'] = to_datetime(self.time_axis.start[0])
 
         # for each channel and each sector: calculate range-corrected signals
         # for each channel and each sector: calculate normalized signals
@@ -764,8 +1373,8 @@ class Measurement(object):
 
             first = self.telecover_data['profiles'][sector]['start_idx']
             last  = self.telecover_data['profiles'][sector]['stop_idx']
-            if self.time_axis.start[first] > self.telecover_data['tc_date']:
-                self.telecover_data['tc_date'] = self.time_axis.start[first]
+            if to_datetime(self.time_axis.start[first]) > self.telecover_data['tc_date']:
+                self.telecover_data['tc_date'] = to_datetime(self.time_axis.start[first])
 
             for ch in mc.TC_CHANNELS:
                 rc_signal = np.average(self.pre_processed_signals[ch].data[first:last], axis = 0)
@@ -851,100 +1460,307 @@ class Measurement(object):
         self.plot_tc_output_per_ratio()
         self.export_telecover_to_ASCII()
 
-    def read_signal(self, sig_filename):
-        if sig_filename.endswith('.zip'):
-            if os.path.exists(mc.TEMP_PATH):
-                zfile = zipfile.ZipFile(sig_filename)
-                nc_filename = zfile.extract(zfile.namelist()[0], mc.TEMP_PATH)
-                zfile.close()
-            else:
-                logger.error('%s does not exist' % mc.TEMP_PATH)
-                raise PathDoesNotExist
-        elif sig_filename.endswith('.nc'):
-            nc_filename = sig_filename
-
-        nc_file = netcdf.netcdf_file(nc_filename, 'r', False, 1)
-
-        self.title = get_file_from_path(sig_filename)
+    def read_signal(self, sig_filename, channels=None, crop=False, start=None, stop=None):
+        self.read_signals([sig_filename], channels=channels, crop=crop, start=start, stop=stop)
 
-        self.header.latitude = nc_file.variables['location_coordinates'].data[0]
-        self.header.longitude = nc_file.variables['location_coordinates'].data[1]
-        self.header.altitude = nc_file.variables['location_height'].getValue()
-        self.header.points = nc_file.dimensions['height']
-        self.header.time_len = len(nc_file.variables['measurement_time'].data)
+    def read_signals(self, sig_filenames, workers=None, channels=None, crop=False, start=None, stop=None):
+        """
+        reads one or more raw data files.
+        All file headers are scanned and checked first. Profiles that are contained in more than one file are used
+        only once. The signal arrays are allocated once and filled in a single pass over the files.
+        With more than one worker (default: READ_WORKERS), the files are read and preprocessed in parallel processes.
+        channels: names of the channels (CHANNEL_NAMES) that are read and preprocessed now (default: all).
+        The other channels are read by load_channels().
+        crop: if True, only the height bins up to READ_MAX_ALTITUDE (and the background windows) are read.
+        load_full_resolution() reads the remaining bins.
+        start, stop: datetimes (UTC) of the time window. Only the profiles that end within the window are read.
+        """
+        if workers is None:
+            workers = mc.READ_WORKERS
+
+        parts = None
+        if workers > 1 and len(sig_filenames) > 1:
+            parts = read_raw_parts_parallel(sig_filenames, workers)
+        if parts is None:
+            # zip files are decompressed in memory -> they cannot be mapped
+            parts = [read_raw_part(sig_filename, mc.READ_MMAP and sig_filename.endswith('.nc'))
+                     for sig_filename in sig_filenames]
+
+        parts.sort(key=lambda part: part['time_keys'][0])
+        for part in parts[1:]:
+            check_compatible(parts[0]['header'], part['header'])
+
+        # skip profiles that are not later than the last profile of the previous file and profiles outside of the
+        # time window. The profiles of a part are [first: last]
+        if start is None:
+            start_key = -1
+        else:
+            start_key = datetime_key(start)
+        last_key = -1
+        for part in parts:
+            part['first'] = max(np.searchsorted(part['time_keys'], last_key, side='right'),
+                                np.searchsorted(part['time_keys'], start_key, side='left'))
+            if stop is None:
+                part['last'] = len(part['time_keys'])
+            else:
+                part['last'] = np.searchsorted(part['time_keys'], datetime_key(stop), side='right')
+            last_key = max(last_key, part['time_keys'][-1])
+        for part in parts:
+            if part['first'] >= part['last']:
+                logger.info('%s contains no new profiles' % part['filename'])
+                close_raw_part(part)
+        parts = [part for part in parts if part['first'] < part['last']]
+        if not parts:
+            raise NoProfilesFound
+
+        header = parts[0]['header']
+
+        self.title = get_file_from_path(parts[0]['filename'])
+
+        self.header.latitude = header['latitude']
+        self.header.longitude = header['longitude']
+        self.header.altitude = header['altitude']
+        # number of height bins in the files. self.header.points is smaller if the signals are cropped
+        self.header.raw_points = header['points']
+        self.header.points = header['points']
+        self.header.time_len = sum([part['last'] - part['first'] for part in parts])
         self.header.nb_of_time_scales = mc.NB_OF_TIME_SCALES
         self.header.nb_of_scan_angles = mc.NB_OF_SCAN_ANGLES
-        self.header.num_channels = nc_file.dimensions['channel'] + \
-            mc.NUM_DOUBLE_CHANNELS
+        self.header.num_channels = header['num_channels']
         # in ns
-        self.header.bin_res = nc_file.variables['measurement_height_resolution'].getValue(
-        )
-        self.header.zenith_angle = nc_file.variables['zenithangle'].getValue()
+        self.header.bin_res = header['bin_res']
+        self.header.zenith_angle = header['zenith_angle']
 
         self.header.measurement_id = None
         self.header.comment = None
         self.header.pressure = mc.GROUND_PRES
         self.header.temperature = mc.GROUND_TEMP
 
-        self.time_axis = TimeAxis.from_polly_file(
-            nc_file.variables['measurement_time'].data)
-        self.z_axis = ZAxis.from_polly_file(
+        # the start of the first profile of each file is extrapolated within that file
+        self.time_axis = TimeAxis.create_with_data(
+            np.hstack([TimeAxis.from_polly_file(part['measurement_time']).data[:, part['first']: part['last']]
+                       for part in parts]),
+            {})
+        self.z_axis = self.create_z_axis()
+        if crop:
+            self.header.points = cropped_points(self.z_axis, mc.READ_MAX_ALTITUDE)
+            self.z_axis = self.create_z_axis()
+        self.shots = TimeSeries.with_data(
+            np.hstack([part['shots'][part['first']: part['last']] for part in parts]), {'dummy': 0})
+        self.depol_cal_angle = TimeSeries.with_data(
+            np.hstack([part['depol_cal_angle'][part['first']: part['last']] for part in parts]), {'dummy': 0})
+        self.mask = np.ones((self.header.time_len,), dtype=bool)
+        self.cloud_mask = np.full((self.header.time_len, self.header.points), NO_CLOUD, dtype=mc.CLOUD_MASK_DTYPE)
+
+        if channels is None or any(['raw_block' in part for part in parts]):
+            # the workers have read all channels anyway
+            chs = list(range(self.header.num_channels))
+        else:
+            chs = [ch for ch in range(self.header.num_channels) if mc.CHANNEL_NAMES[ch] in channels]
+        self._pending_channels = [ch for ch in range(self.header.num_channels) if ch not in chs]
+        self._sources = [{'filename': part['filename'], 'first': part['first'], 'last': part['last']} for part in parts]
+
+        self._read_channels(parts, chs)
+
+    def create_z_axis(self):
+        return ZAxis.from_polly_file(
             {
                 'points': self.header.points,
                 'bin_res': self.header.bin_res,
                 'zenith_angle': self.header.zenith_angle,
                 'altitude': self.header.altitude})
-        self.shots = TimeSeries.with_data(
-            nc_file.variables['measurement_shots'].data[:, 0], {'dummy': 0})
-        self.depol_cal_angle = TimeSeries.with_data(
-            nc_file.variables['depol_cal_angle'].data, {'dummy': 0})
-        self.mask = np.ones((self.header.time_len,), dtype=bool)
-        self.cloud_mask = np.ones((self.header.time_len, self.header.points), dtype=int) * NO_CLOUD
-
-        for ch in range(
-                nc_file.dimensions['channel'] +
-                mc.NUM_DOUBLE_CHANNELS):
-            channel_info = {}
-            # todo: user defined parameter  via GUI?
-            channel_info['bg_first'] = mc.BG_FIRST[ch]
-            channel_info['bg_last'] = mc.BG_LAST[ch]
-            channel_info['channel_id'] = mc.CHANNEL_ID[ch]
-            channel_info['channel_name'] = mc.CHANNEL_ID_STR[ch]
-            channel_info['range_id'] = mc.RANGE_ID[ch]
-            channel_info['first_valid_bin'] = self.z_axis.header.first_valid_bin
-            self.signals[mc.CHANNEL_NAMES[ch]] = Signal.from_polly_file(
-                nc_file.variables['raw_signal'].data[:, :, mc.CHAN_NC_POS[ch]], channel_info)
-            self.pre_processed_signals[mc.CHANNEL_NAMES[ch]] = PreProcessedSignal.from_rawsig(
-                self.signals[mc.CHANNEL_NAMES[ch]], self.z_axis.range_axis)
 
-        nc_file.close()
+    def _read_channels(self, parts, chs):
+        """
+        fills the signal blocks with the channels chs (indices in CHANNEL_NAMES) of the parts of read_signals and
+        creates the signals of these channels. The mapped files of the replaced signal blocks are closed.
+        """
+        replaced_nc_files, self._nc_files = self._nc_files, []
+        positions, block_idx = channel_layout(chs)
 
+        points = self.header.points
 
-    def append_nc_file(self, sig_filename):
-        if sig_filename.endswith('.zip'):
-            if os.path.exists(mc.TEMP_PATH):
-                zfile = zipfile.ZipFile(sig_filename)
-                nc_filename = zfile.extract(zfile.namelist()[0], mc.TEMP_PATH)
-                zfile.close()
+        if len(parts) == 1 and 'raw_block' not in parts[0]:
+            # a single file with all channels is used without copy (lazy, if mapped)
+            self.raw_block = SignalBlock.from_polly_file(
+                parts[0]['raw_signal'][parts[0]['first']: parts[0]['last'], :points], positions, lazy=parts[0]['mmap'])
+        else:
+            if 'raw_block' in parts[0]:
+                dtype = parts[0]['raw_block'].dtype
+            else:
+                dtype = raw_signal_dtype(parts[0]['raw_signal'].dtype)
+            data = np.empty((self.header.time_len, len(positions), self.header.points), dtype=dtype)
+            t = 0
+            for part in parts:
+                part_len = part['last'] - part['first']
+                if 'raw_block' in part:
+                    data[t: t + part_len] = part['raw_block'][part['first']: part['last'], :, :points]
+                else:
+                    copy_raw_signal(data[t: t + part_len], part['raw_signal'][part['first']: part['last'], :points],
+                                    positions)
+                t += part_len
+            self.raw_block = SignalBlock.create_with_data(data, {})
+
+        self.signals = nameddict.NamedDict()
+        for ch in chs:
+            self.signals[mc.CHANNEL_NAMES[ch]] = Signal.from_block(
+                self.raw_block, block_idx[ch], create_channel_info(ch, self.z_axis.header.first_valid_bin))
+
+        # the preprocessed signals are computed on first access
+        self.pre_processed_signals = PreProcessedSignals(self)
+        if all(['pre_processed' in part for part in parts]):
+            # already done by the workers
+            pre_processed_block = SignalBlock.create_with_data(
+                np.concatenate([part['pre_processed'][part['first']: part['last'], :, :points] for part in parts]), {})
+            pre_processed_block.background = np.concatenate(
+                [part['background'][part['first']: part['last']] for part in parts])
+            self.pre_processed_signals.set_block(pre_processed_block)
+
+        if self.raw_block.lazy:
+            # the signals are views into the mapped file. It must stay open until close() is called.
+            self._nc_files.append(parts[0]['nc_file'])
+        else:
+            for part in parts:
+                close_raw_part(part)
+        for nc_file in replaced_nc_files:
+            nc_file.close()
+
+    @property
+    def pending_channels(self):
+        """names of the channels that are not read yet"""
+        return [mc.CHANNEL_NAMES[ch] for ch in self._pending_channels]
+
+    def load_channels(self):
+        """
+        reads the channels that were skipped by read_signals. Only these channels are read from the files again. The
+        raw block is rebuilt with all channels; the channels read before are copied into it and keep their signals and
+        cached preprocessed signals.
+        """
+        if not self._pending_channels:
+            return
+
+        chs = list(range(self.header.num_channels))
+        positions, block_idx = channel_layout(chs)
+        loaded = [ch for ch in chs if ch not in self._pending_channels]
+        loaded_idxs = set([block_idx[ch] for ch in loaded])
+
+        data = np.empty((self.header.time_len, len(positions), self.header.points), dtype=self.raw_block.data.dtype)
+        for ch in loaded:
+            data[:, block_idx[ch]] = self.signals[mc.CHANNEL_NAMES[ch]].data
+        t = 0
+        for part in self._reopen_sources():
+            part_len = part['last'] - part['first']
+            for idx, pos in enumerate(positions):
+                if idx not in loaded_idxs:
+                    data[t: t + part_len, idx] = \
+                        part['raw_signal'][part['first']: part['last'], :self.header.points, pos]
+            t += part_len
+            close_raw_part(part)
+
+        cache_state = self.pre_processed_signals.cache_state()
+        old_keys = dict([(ch_name, self.pre_processed_signals.cache_key(ch_name)) for ch_name in cache_state])
+
+        replaced_nc_files, self._nc_files = self._nc_files, []
+        self.raw_block = SignalBlock.create_with_data(data, {})
+        signals = nameddict.NamedDict()
+        for ch in chs:
+            ch_name = mc.CHANNEL_NAMES[ch]
+            if ch in loaded:
+                signals[ch_name] = self.signals[ch_name]
+                signals[ch_name].move_to_block(self.raw_block, block_idx[ch])
             else:
-                logger.error('%s does not exist' % mc.TEMP_PATH)
-                raise PathDoesNotExist
-        elif sig_filename.endswith('.nc'):
-            nc_filename = sig_filename
+                signals[ch_name] = Signal.from_block(
+                    self.raw_block, block_idx[ch], create_channel_info(ch, self.z_axis.header.first_valid_bin))
+        self.signals = signals
+        self._pending_channels = []
+
+        kept = [ch_name for ch_name in cache_state if cache_state[ch_name]]
+        self.pre_processed_signals.revalidate(kept)
+        for ch_name in kept:
+            if ch_name in self._pyramids and self._pyramids[ch_name][0] == old_keys[ch_name]:
+                self._pyramids[ch_name] = (self.pre_processed_signals.cache_key(ch_name), self._pyramids[ch_name][1])
+
+        for nc_file in replaced_nc_files:
+            nc_file.close()
+
+    def load_full_resolution(self):
+        """
+        reads all channels and all height bins of the raw data files, as needed for the SCC export.
+        """
+        if self.header.points == self.header.raw_points:
+            self.load_channels()
+            return
+
+        cropped_points = self.header.points
+        self.header.points = self.header.raw_points
+        self.z_axis = self.create_z_axis()
+        self.cloud_mask = np.hstack((self.cloud_mask, np.full(
+            (self.header.time_len, self.header.points - cropped_points), NO_CLOUD, dtype=mc.CLOUD_MASK_DTYPE)))
+
+        self._pending_channels = []
+        self._read_channels(self._reopen_sources(), list(range(self.header.num_channels)))
+
+    def _reopen_sources(self):
+        parts = []
+        for source in self._sources:
+            part = read_raw_part(source['filename'], mc.READ_MMAP and source['filename'].endswith('.nc'))
+            part['first'] = source['first']
+            part['last'] = source['last']
+            parts.append(part)
+        return parts
+
+    def signal_pyramid(self, ch_name):
+        """
+        SignalPyramid of the preprocessed signal ch_name for the display at reduced resolution. It is built on first
+        access and again after the preprocessed signal has changed.
+        """
+        key = self.pre_processed_signals.cache_key(ch_name)
+        if ch_name not in self._pyramids or self._pyramids[ch_name][0] != key:
+            self._pyramids[ch_name] = (key, SignalPyramid(self.pre_processed_signals[ch_name].data, self.shots.data))
+        return self._pyramids[ch_name][1]
+
+    @property
+    def pre_processed_block(self):
+        """(time, channel, height) block of the preprocessed signals (filled on demand)"""
+        return self.pre_processed_signals.block
+
+    def materialize(self):
+        """
+        load all lazy signals into memory
+        """
+        if self.raw_block is not None:
+            self.raw_block.materialize()
+        for ch in self.signals:
+            self.signals[ch].materialize()
+
+    def close(self):
+        """
+        release the memory mapped raw data files. The signals are loaded into memory before, so the measurement
+        remains usable.
+        """
+        self.materialize()
+        for nc_file in self._nc_files:
+            nc_file.close()
+        self._nc_files = []
+
+    def _append_array(self, name, new_data, axis=0):
+        """appends new_data to the array attribute name along axis in amortised O(1), see buffer.GrowableArray"""
+        self._growables[name] = grow(self._growables.get(name), getattr(self, name), new_data, axis)
+        setattr(self, name, self._growables[name].data)
+
+    def append_nc_file(self, sig_filename):
+        """
+        appends the profiles of another raw data file. The arrays grow in buffers with spare capacity, so repeated
+        appends copy only the new profiles most of the time. read_signals / from_nc_files read several files at once.
+        """
+        self.load_full_resolution()
+
+        nc_file = open_raw_file(sig_filename)
+        check_compatible(self.header, read_raw_header(nc_file))
 
-        nc_file = netcdf.netcdf_file(nc_filename, 'r', False, 1)
         new_time_len = len(nc_file.variables['measurement_time'].data)
         self.header.time_len = self.header.time_len + new_time_len
 
-        if self.header.latitude != nc_file.variables['location_coordinates'].data[0] or \
-            self.header.longitude != nc_file.variables['location_coordinates'].data[1] or \
-            self.header.altitude != nc_file.variables['location_height'].getValue() or \
-            self.header.points != nc_file.dimensions['height'] or \
-            self.header.num_channels != nc_file.dimensions['channel'] + mc.NUM_DOUBLE_CHANNELS or \
-            self.header.bin_res != nc_file.variables['measurement_height_resolution'].getValue() or \
-            self.header.zenith_angle != nc_file.variables['zenithangle'].getValue():
-            raise FilesAreDifferent
-
         new_time_axis = TimeAxis.from_polly_file(nc_file.variables['measurement_time'].data)
         self.time_axis.append_data(new_time_axis.data)
         new_shots = TimeSeries.with_data(nc_file.variables['measurement_shots'].data[:, 0], {'dummy': 0})
@@ -952,234 +1768,174 @@ class Measurement(object):
         new_depol_cal_angle = TimeSeries.with_data(nc_file.variables['depol_cal_angle'].data, {'dummy': 0})
         self.depol_cal_angle.append_data(new_depol_cal_angle.data)
 
-        self.mask = np.hstack((self.mask, np.ones((new_time_len,), dtype=bool)))
-        self.cloud_mask = np.vstack((self.cloud_mask, np.ones((new_time_len, self.header.points), dtype=int) * NO_CLOUD))
+        self._append_array('mask', np.ones((new_time_len,), dtype=bool))
+        self._append_array('cloud_mask',
+                           np.full((new_time_len, self.header.points), NO_CLOUD, dtype=mc.CLOUD_MASK_DTYPE))
 
-        for ch in range(self.header.num_channels):
-            old_sig = self.signals[mc.CHANNEL_NAMES[ch]]
-            new_signal = Signal.from_polly_file(
-                 nc_file.variables['raw_signal'].data[:, :, mc.CHAN_NC_POS[ch]], old_sig.header.attrs)
-            old_sig.append_data(new_signal.data, orient='v')
+        positions, block_idx = channel_layout(range(self.header.num_channels))
 
-            old_pp_sig = self.pre_processed_signals[mc.CHANNEL_NAMES[ch]]
-            new_pp_sig = PreProcessedSignal.from_rawsig(new_signal, self.z_axis.range_axis)
-            old_pp_sig.append_data(new_pp_sig.data, orient='v')
+        # the preprocessed signals are invalidated by the new version of the raw block
+        new_block = SignalBlock.from_polly_file(nc_file.variables['raw_signal'].data, positions)
+        self.raw_block.append_block(new_block)
 
         nc_file.close()
 
     def read_log(self, lidarlog_filename):
         if lidarlog_filename:
             try:
-                log_file = open(lidarlog_filename, 'r')
+                data = read_lidar_log(lidarlog_filename)
             except IOError:
                 logger.warning("Lidar Log %s does not exist." % lidarlog_filename)
                 raise error.LidarFileNotFound
 
-            data = {
-                'time': [],
-                'T1064': [],
-                'T1': [],
-                'T2': [],
-                'pyro': [],
-                'Tout': [],
-                'RHout': [],
-                'status': [],
-                'roof_closed': [],
-                'rain': [],
-                'radar_shutter_close': []}
-
-            lines = log_file.readlines()
-            for l in lines[3:]:
-                line_data = l.split()
-                if len(line_data) >=8:
-                    data_ok = True
-                else:
-                    data_ok = False
-                for ld in line_data[2:]:
-                    if float(ld) < -100:
-                        data_ok = False
-                if data_ok:
-                    time = datetime.datetime.strptime(
-                        line_data[0] + line_data[1], '%d.%m.%Y%H:%M:%S')
-                    status = int(line_data[8])
-                    roof_closed = status & 1 == 1
-                    rain = not(status & 2 == 2)
-                    radar_shutter_closed = status & 4 == 4
-                    data['time'].append(time)
-                    data['T1064'].append(line_data[2])
-                    data['T1'].append(line_data[3])
-                    data['T2'].append(line_data[4])
-                    data['pyro'].append(line_data[5])
-                    data['Tout'].append(line_data[6])
-                    data['RHout'].append(line_data[7])
-                    data['status'].append(line_data[8])
-                    data['roof_closed'].append(roof_closed)
-                    data['rain'].append(rain)
-                    data['radar_shutter_close'].append(radar_shutter_closed)
-            log_file.close()
-
-            time_array = np.array(data['time'])
-            shutter_array = np.array(data['radar_shutter_close'])
-            sum_shutter = []
-            for t in range(self.header.time_len):
-                f_idx = np.where(time_array >= self.time_axis.start[t])[0]
-                l_idx = np.where(time_array < self.time_axis.stop[t])[0]
-                if (len(f_idx) > 0) and (len(l_idx) > 0):
-                    sum_shutter.append(np.count_nonzero(
-                        shutter_array[f_idx[0]: l_idx[-1] + 1]))
-                else:
-                    sum_shutter.append(np.nan)
+            time_array = data['time']
+            # number of log entries with closed shutter within each profile
+            sum_shutter, _ = self.time_axis.profile_sums(time_array, data['radar_shutter_close'])
+            # profiles that are not covered by the log
+            if len(time_array):
+                sum_shutter[(self.time_axis.start > time_array[-1]) | (self.time_axis.stop <= time_array[0])] = np.nan
+            else:
+                sum_shutter[:] = np.nan
 
-            self.shutter = TimeAxis.create_with_data(
-                np.array(sum_shutter), {'dummy': 0})
+            self.shutter = TimeAxis.create_with_data(sum_shutter, {'dummy': 0})
 
     def read_sonde(self, sonde_name):
         if sonde_name == '':
             self.sounding = None
         else:
-            if sonde_name.count('gdas'):
-                self.sounding = Sonde.from_gdas_file(os.path.join(
-                    mc.SONDE_PATH, sonde_name), self.header.measurement_id)
-            else:
-                if sonde_name.endswith('.txt'):
-                    self.sounding = Sonde.from_file(
-                        os.path.join(
-                            mc.SONDE_PATH,
-                            sonde_name),
-                        self.header.measurement_id)
-                elif sonde_name.endswith('.csv'):
-                    self.sounding = Sonde.from_csv_file(os.path.join(
-                        mc.SONDE_PATH, sonde_name), self.header.measurement_id)
-                else:
-                    raise error.WrongFileFormat
+            self.sounding = Sonde.from_cache(os.path.join(mc.SONDE_PATH, sonde_name), self.header.measurement_id)
+
+    def find_sonde(self, launch=None, station=None):
+        """
+        name (relative to SONDE_PATH) of the sonde file of station (default: SONDE_STATION) that was launched nearest
+        to the datetime launch (default: the start of the measurement). '' if there is none.
+        """
+        if station is None:
+            station = mc.SONDE_STATION
+        if launch is None and self.time_axis is not None:
+            launch = to_datetime(self.time_axis.start[0])
+        if station is None or launch is None:
+            return ''
+        path = nearest_sonde(station, launch)
+        if path is None:
+            return ''
+        return os.path.relpath(path, mc.SONDE_PATH)
 
     def write_scc_raw_signal(self, filename):
+        self.load_full_resolution()
 
-        nc_file = Dataset(filename, "w", format="NETCDF4")
         self.mask[np.where(self.shots.data <= 0)] = 0
         self.mask[np.where(self.depol_cal_angle.data.round()
                            != mc.CAL_ANGLE_MEASUREMENT)] = 0
 
-        # create dimensions
-        dim = nc_file.createDimension('points', self.header.points)
-        dim = nc_file.createDimension('channels', self.header.num_channels)
-        dim = nc_file.createDimension('time', self.mask.sum())
-        dim = nc_file.createDimension(
-            'nb_of_time_scales',
-            self.header.nb_of_time_scales)
-        dim = nc_file.createDimension(
-            'scan_angles', self.header.nb_of_scan_angles)
-
-        # 'write_attributes'
-        nc_file.Measurement_ID = self.header.measurement_id
-        nc_file.RawData_Start_Date = self.time_axis.start[self.mask][0].strftime(
-            '%Y%m%d')
-        nc_file.RawData_Start_Time_UT = self.time_axis.start[self.mask][0].strftime(
-            '%H%M%S')
-        nc_file.RawData_Stop_Time_UT = self.time_axis.stop[self.mask][-1].strftime(
-            '%H%M%S')
-        if self.sounding:
-            nc_file.Sounding_File_Name = self.sounding.header.filename
-            self.sounding.write_scc_sonde_file()
-        if 'comment' in self.header.attrs:
-            nc_file.Comment = self.header.comment
-
-        # 'create variables'
-
-        bg_height_last_var = nc_file.createVariable(
-            'Background_High', 'f8', ('channels',))  # 'f8' = np.float64
-        bg_height_first_var = nc_file.createVariable('Background_Low',
-                                                     'f8', ('channels',))
-        bg_mode_var = nc_file.createVariable(
-            'Background_Mode', 'i4', ('channels',))  # 'i4' = np.int32
-        lr_input_var = nc_file.createVariable('LR_Input',
-                                              'i4', ('channels',))
-        angle_var = nc_file.createVariable('Laser_Pointing_Angle',
-                                           'f8', ('scan_angles',))
-        angle_id_var = nc_file.createVariable(
-            'Laser_Pointing_Angle_of_Profiles', 'i4', ('time', 'nb_of_time_scales'))
-        shots_var = nc_file.createVariable('Laser_Shots',
-                                           'i4', ('time', 'channels'))
-        mol_calc_var = nc_file.createVariable('Molecular_Calc',
-                                              'i4', ())
-        pres_var = nc_file.createVariable('Pressure_at_Lidar_Station',
-                                          'f8', ())
-        temp_var = nc_file.createVariable('Temperature_at_Lidar_Station',
-                                          'f8', ())
-        range_res_var = nc_file.createVariable('Raw_Data_Range_Resolution',
-                                               'f8', ('channels',))
-        start_var = nc_file.createVariable('Raw_Data_Start_Time',
-                                           'i4', ('time', 'nb_of_time_scales'))
-        stop_var = nc_file.createVariable('Raw_Data_Stop_Time',
-                                          'i4', ('time', 'nb_of_time_scales'))
-        data_var = nc_file.createVariable('Raw_Lidar_Data',
-                                          'f8', ('time', 'channels', 'points'))
-        range_id_var = nc_file.createVariable('ID_Range',
-                                              'i4', ('channels',))
-        ch_id_var = nc_file.createVariable('channel_ID',
-                                           'i4', ('channels',))
-        ch_name_var = nc_file.createVariable('channel_string_ID',
-                                             str, ('channels',))
-        time_scale_id_var = nc_file.createVariable('id_timescale',
-                                                   'i4', ('channels',))
+        profiles = np.flatnonzero(self.mask)
+        signals = [self.signals[mc.CHANNEL_NAMES[ch]] for ch in range(self.header.num_channels)]
+        # the same profiles for all channels
+        channel_profiles = np.broadcast_to(profiles[:, np.newaxis], (len(profiles), len(signals)))
 
+        schema = SCC_RAW_SCHEMA
+        values = self.scc_values(signals, channel_profiles, profiles, profiles)
+        values['channel_string_ID'] = [signal.header.channel_name for signal in signals]
         if self.header.cloud_mask_type == MANUAL_CLOUD_MASK:
-            cloud_mask_var = nc_file.createVariable('cloud_mask',
-                                                    'i1', ('time', 'points'))
-            cloud_mask_channel_var = nc_file.createVariable('cloud_mask_channel_idx',
-                                                    'i4', ())
-
-        # write data
-        for ch in range(self.header.num_channels):
-            range_res_var[ch] = self.z_axis.header.range_res
-            bg_height_first_var[ch] = self.signals[mc.CHANNEL_NAMES[ch]
-                                                   ].header.bg_first
-            bg_height_last_var[ch] = self.signals[mc.CHANNEL_NAMES[ch]
-                                                  ].header.bg_last
-            time_scale_id_var[ch] = 0
-            ch_id_var[ch] = mc.NC_FILL_INT
-            ch_name_var[ch] = self.signals[mc.CHANNEL_NAMES[ch]
-                                           ].header.channel_name
-            lr_input_var[ch] = 1
-            bg_mode_var[ch] = 0
-            range_id_var[ch] = self.signals[mc.CHANNEL_NAMES[ch]
-                                            ].header.range_id
-
-            # todo: check what is really written into the ncfile
-            shots_var[:, ch] = self.shots.data[self.mask][:]
-            data_var[:, ch, :] = self.signals[mc.CHANNEL_NAMES[ch]
-                                              ].data[self.mask][:, :]
-
-        angle_var[0] = self.z_axis.header.zenith_angle
+            schema = schema + SCC_CLOUD_MASK_SCHEMA
+            values['cloud_mask'] = self.cloud_mask[profiles]
+            values['cloud_mask_channel_idx'] = mc.CLOUD_MASK_CHANNEL_IDX
 
-        if self.header.cloud_mask_type == MANUAL_CLOUD_MASK:
-            cloud_mask_var[:, :] = self.cloud_mask[self.mask][:, :]
-            cloud_mask_channel_var.assignValue(mc.CLOUD_MASK_CHANNEL_IDX)
+        nc_file = Dataset(filename, "w", format="NETCDF4")
+        try:
+            write_scc_file(nc_file, self.scc_dimensions(len(signals), len(profiles)),
+                           self.scc_attributes(profiles[0], profiles[-1]), schema, values, compress=True)
+        finally:
+            nc_file.close()
 
+    def scc_dimensions(self, num_channels, length):
+        return [('points', self.header.points),
+                ('channels', num_channels),
+                ('time', length),
+                ('nb_of_time_scales', self.header.nb_of_time_scales),
+                ('scan_angles', self.header.nb_of_scan_angles)]
 
-        #value = 0 -> automatic (try model - if available, next use standard atmosphere), 1 -> sounding, 2 -> temp from model (by SCC)
+    def scc_attributes(self, first, last):
+        """
+        global attributes of an SCC raw data file from the start of profile first to the stop of profile last.
+        The sonde file is written too.
+        """
         if self.sounding:
-            mol_calc_var.assignValue(1)
-        else:
-            mol_calc_var.assignValue(0)
+            self.sounding.write_scc_sonde_file()
+        start = to_datetime(self.time_axis.start[first])
 
-        pres_var.assignValue(self.header.pressure)
-        temp_var.assignValue(self.header.temperature)
+        return [('Measurement_ID', self.header.measurement_id),
+                ('RawData_Start_Date', start.strftime('%Y%m%d')),
+                ('RawData_Start_Time_UT', start.strftime('%H%M%S')),
+                ('RawData_Stop_Time_UT', to_datetime(self.time_axis.stop[last]).strftime('%H%M%S')),
+                ('Sounding_File_Name', self.sounding.header.filename if self.sounding else None),
+                ('Comment', self.header.comment if 'comment' in self.header else None)]
 
-        for t in range(self.mask.sum()):
-            angle_id_var[t, 0] = 0
-            start_var[t, 0] = self.time_axis.secs_of_meas_start[self.mask][t].seconds - \
-                self.time_axis.secs_of_meas_start[self.mask][0].seconds
-            stop_var[t, 0] = self.time_axis.secs_of_meas_stop[self.mask][t].seconds - \
-                self.time_axis.secs_of_meas_start[self.mask][0].seconds
+    def scc_values(self, signals, profiles, start_profiles, stop_profiles):
+        """
+        values of the variables of SCC_RAW_SCHEMA (except channel_string_ID) for the signals of the channels of an
+        SCC raw data file. profiles: (time, channel) array of the profiles of each channel.
+        The times are those of the start of start_profiles and the stop of stop_profiles.
+        """
+        secs_of_meas_start = self.time_axis.secs_of_meas_start[start_profiles]
+        secs_of_meas_stop = self.time_axis.secs_of_meas_stop[stop_profiles]
+
+        return {
+            'Background_High': [signal.header.bg_last for signal in signals],
+            'Background_Low': [signal.header.bg_first for signal in signals],
+            'Background_Mode': 0,
+            'LR_Input': 1,
+            'Laser_Pointing_Angle': self.z_axis.header.zenith_angle,
+            'Laser_Pointing_Angle_of_Profiles': 0,
+            'Laser_Shots': self.shots.data[profiles],
+            # 0 -> automatic (try model - if available, next use standard atmosphere), 1 -> sounding,
+            # 2 -> temp from model (by SCC)
+            'Molecular_Calc': 1 if self.sounding else 0,
+            'Pressure_at_Lidar_Station': self.header.pressure,
+            'Temperature_at_Lidar_Station': self.header.temperature,
+            'Raw_Data_Range_Resolution': self.z_axis.header.range_res,
+            'Raw_Data_Start_Time': (secs_of_meas_start - secs_of_meas_start[0])[:, np.newaxis],
+            'Raw_Data_Stop_Time': (secs_of_meas_stop - secs_of_meas_start[0])[:, np.newaxis],
+            'Raw_Lidar_Data': gather_signals(signals, profiles),
+            'ID_Range': [signal.header.range_id for signal in signals],
+            'channel_ID': mc.NC_FILL_INT,
+            'id_timescale': 0,
+        }
 
-        nc_file.close()
+    @classmethod
+    def from_nc_file(cls, sig_filename, syslog_filename, channels=None, crop=False, start=None, stop=None):
+        result = cls()
+        try:
+            Measurement.read_signal(result, sig_filename, channels=channels, crop=crop, start=start, stop=stop)
+        except NoProfilesFound:
+            # the period start - stop has no profiles, there is nothing to return
+            raise
+        except error.LidarError:
+            logger.error("Exception: %s" % sys.exc_info()[0])
+            logger.error("Traceback: %s" % tb.format_exc())
+
+        try:
+            Measurement.read_log(result, syslog_filename)
+        except error.LidarFileNotFound:
+            pass
+        except error.LidarError:
+            logger.error("Exception: %s" % sys.exc_info()[0])
+            logger.error("Traceback: %s" % tb.format_exc())
+
+        return result
 
     @classmethod
-    def from_nc_file(cls, sig_filename, syslog_filename):
+    def from_nc_files(cls, sig_filenames, syslog_filename, channels=None, crop=False, start=None, stop=None):
+        """
+        combines several raw data files into one measurement.
+        Raises NoProfilesFound if none of the profiles lies within start - stop.
+        """
         result = cls()
         try:
-            Measurement.read_signal(result, sig_filename)
+            Measurement.read_signals(result, sig_filenames, channels=channels, crop=crop, start=start, stop=stop)
+        except NoProfilesFound:
+            # the period start - stop has no profiles, there is nothing to return
+            raise
         except error.LidarError:
             logger.error("Exception: %s" % sys.exc_info()[0])
             logger.error("Traceback: %s" % tb.format_exc())
@@ -1205,6 +1961,7 @@ class Measurement(object):
         return idxs
 
     def write_scc_depolcal_signal(self):
+        self.load_full_resolution()
         cal_idxs = self.find_depol_cal_idxs()
         if not cal_idxs:
             raise NoCalIdxFound()
@@ -1214,155 +1971,397 @@ class Measurement(object):
             filename = os.path.join(
                 mc.OUT_PATH, self.scc_depolcal_filename(cal_idxs))
 
+            self.mask[np.where(self.shots.data <= 0)] = 0
+
+            signals = [self.signals[mc.CHANNEL_NAMES[ch_idx]] for ch_idx in mc.CAL_CHANNEL[:mc.NUM_CAL_CHANNELS]]
+            # each channel is taken from the profiles of its calibration angle
+            profiles = np.stack([cal_idxs[cal_idx][:length] for cal_idx in mc.CAL_IDX_RANGE[:mc.NUM_CAL_CHANNELS]],
+                                axis=1)
+
+            values = self.scc_values(signals, profiles, cal_idxs[0][:length], cal_idxs[1][:length])
+            values['channel_string_ID'] = mc.CAL_CHANNEL_SCC_ID_STR[:mc.NUM_CAL_CHANNELS]
+            values['Pol_Calib_Range_Min'] = mc.CALIB_RANGE_MIN
+            values['Pol_Calib_Range_Max'] = mc.CALIB_RANGE_MAX
+
             nc_file = Dataset(filename, "w", format="NETCDF4")
+            try:
+                write_scc_file(nc_file, self.scc_dimensions(mc.NUM_CAL_CHANNELS, length),
+                               self.scc_attributes(cal_idxs[0][0], cal_idxs[1][-1]), SCC_DEPOLCAL_SCHEMA, values,
+                               compress=True)
+            finally:
+                nc_file.close()
 
-            self.mask[np.where(self.shots.data <= 0)] = 0
+    def scc_raw_filename(self):
+        datestr = to_datetime(self.time_axis.start[self.mask][0]).strftime('%Y%m%d')
+        startstr = to_datetime(self.time_axis.start[self.mask][0]).strftime('%H%M%S')
+        stopstr = to_datetime(self.time_axis.stop[self.mask][-1]).strftime('%H%M%S')
 
-            # create dimensions
-            dim = nc_file.createDimension('points', self.header.points)
-            dim = nc_file.createDimension('channels', mc.NUM_CAL_CHANNELS)
-            dim = nc_file.createDimension('time', length)
-            dim = nc_file.createDimension(
-                'nb_of_time_scales', self.header.nb_of_time_scales)
-            dim = nc_file.createDimension(
-                'scan_angles', self.header.nb_of_scan_angles)
+        filename = self.header.measurement_id  # + '_'
+        filename = '_'.join([filename, startstr])
+        filename = '_'.join([filename, stopstr])
+        filename = '.'.join([filename, 'nc'])
+        return filename
+
+    def scc_depolcal_filename(self, cal_idxs):
+        datestr = to_datetime(self.time_axis.start[cal_idxs[0][0]]).strftime('%Y%m%d')
+        startstr = to_datetime(self.time_axis.start[cal_idxs[0][0]]).strftime('%H%M%S')
+        stopstr = to_datetime(self.time_axis.stop[cal_idxs[1][-1]]).strftime('%H%M%S')
 
-            # 'write_attributes'
-            nc_file.Measurement_ID = self.header.measurement_id
-            nc_file.RawData_Start_Date = self.time_axis.start[cal_idxs[0][0]].strftime(
-                '%Y%m%d')
-            nc_file.RawData_Start_Time_UT = self.time_axis.start[cal_idxs[0][0]].strftime(
-                '%H%M%S')
-            nc_file.RawData_Stop_Time_UT = self.time_axis.stop[cal_idxs[1][-1]].strftime(
-                '%H%M%S')
-            if self.sounding:
-                nc_file.Sounding_File_Name = self.sounding.header.filename
-                self.sounding.write_scc_sonde_file()
-            if 'comment' in self.header.attrs:
-                nc_file.Comment = self.header.comment
+        filename = mc.SCC_RAW_FILENAME_BODY + '_depolcal_'
+        filename = '_'.join([filename, datestr])
+        filename = '_'.join([filename, startstr])
+        filename = '_'.join([filename, stopstr])
+        filename = '.'.join([filename, 'nc'])
+        return filename
 
-            # 'create variables'
 
-            bg_height_last_var = nc_file.createVariable('Background_High',
-                                                        'f8', ('channels',))
+def sonde_fields(text, columns, widths=None, separator=None):
+    """
+    (level, column) bytes array of the first columns of the lines of the table text of a sounding. The columns have
+    fixed widths or are separated by separator (default: whitespace). Lines with less columns are skipped.
+    The fields are not stripped.
+
+    >>> sonde_fields(' 933.0    492    0.4\\n 1000.0    -75\\n', 3, widths=[7, 7, 7]).tolist()
+    [[b' 933.0 ', b'   492 ', b'   0.4'], [b' 1000.0', b'    -75', b'']]
+    >>> sonde_fields('925;0.775;8.7\\n953;0.528\\n957;;x\\n', 3, separator=';').tolist()
+    [[b'925', b'0.775', b'8.7'], [b'957', b'', b'x']]
+    """
+    # numpy converts bytes much faster than str
+    data = text.encode('ascii', 'replace')
+    if widths is not None:
+        lines = data.splitlines()
+        offsets = np.cumsum([0] + list(widths[:columns]))
+        chars = np.array(lines, dtype='S%d' % offsets[-1]).view('S1').reshape(len(lines), offsets[-1])
+        fields = np.column_stack([np.ascontiguousarray(chars[:, first: last]).view('S%d' % (last - first)).ravel()
+                                  for first, last in zip(offsets[:-1], offsets[1:])])
+    elif separator is not None:
+        # split all lines at once, the fields of each line are found from the positions of the separators
+        separator = separator.encode('ascii')
+        if not data.endswith(b'\n'):
+            data += b'\n'
+        chars = np.frombuffer(data, dtype=np.uint8)
+        line_ends = np.flatnonzero(chars == ord('\n'))
+        counts = np.diff(np.concatenate(([0], np.searchsorted(np.flatnonzero(chars == ord(separator)), line_ends)))) + 1
+        first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        tokens = np.array(data.replace(b'\n', separator).split(separator), dtype='S32')
+        fields = tokens[first[counts >= columns, np.newaxis] + np.arange(columns)]
+    else:
+        rows = [row[:columns] for row in [line.split() for line in data.splitlines()] if len(row) >= columns]
+        fields = np.array(rows, dtype='S32').reshape(-1, columns)
+    return fields
+
+
+def sonde_values(fields):
+    """
+    float array of the bytes array fields of sonde_fields, converted in one call. Empty or invalid values are nan.
+
+    >>> sonde_values(np.array([[b' 933.0', b'   '], [b'1.5', b'x']])).tolist()
+    [[933.0, nan], [1.5, nan]]
+    """
+    fields = np.where((fields == b'') | np.char.isspace(fields), b'nan', fields)
+    try:
+        return fields.astype(np.float64)
+    except ValueError:
+        # invalid values, convert one by one
+        return np.array([to_float(value) for value in fields.ravel()], dtype=np.float64).reshape(fields.shape)
+
+
+def to_float(value):
+    """float of a string or bytes, nan if it is not a number"""
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def create_channel_info(ch, first_valid_bin):
+    """
+    header information of channel ch (index in CHANNEL_NAMES)
+    """
+    channel_info = ChannelInfo()
+    # todo: user defined parameter  via GUI?
+    channel_info['bg_first'] = mc.BG_FIRST[ch]
+    channel_info['bg_last'] = mc.BG_LAST[ch]
+    channel_info['bg_estimator'] = mc.BG_ESTIMATOR[ch]
+    channel_info['dead_time'] = mc.DEAD_TIME[ch]
+    channel_info['overlap_file'] = mc.OVL_FILE[ch]
+    channel_info['channel_id'] = mc.CHANNEL_ID[ch]
+    channel_info['channel_name'] = mc.CHANNEL_ID_STR[ch]
+    channel_info['range_id'] = mc.RANGE_ID[ch]
+    channel_info['first_valid_bin'] = first_valid_bin
+    return channel_info
+
+
+def cropped_points(z_axis, max_altitude):
+    """
+    number of height bins up to max_altitude (m above lidar). The background windows are always included.
+    """
+    if max_altitude is None:
+        return z_axis.header.points
+    points = z_axis.header.first_valid_bin + int(np.ceil(max_altitude / z_axis.header.vert_res)) + 1
+    return min(max(points, max(mc.BG_LAST)), z_axis.header.points)
+
 
-            bg_height_first_var = nc_file.createVariable('Background_Low',
-                                                         'f8', ('channels',))
+def pre_process_block(raw_data, bg_first, bg_last, range_square, out, background, bg_estimator=None,
+                      corrections=None):
+    """
+    background subtraction and range correction of all channels of a (time, channel, height) raw signal array,
+    together with the instrumental corrections (see corrections.py).
+    bg_first, bg_last: background bins of each channel
+    bg_estimator: background estimator of each channel (default: mean)
+    corrections: Corrections of the channels (default: none)
+    The results are written into out (same shape as raw_data) and background (time, channel), which may be views
+    into larger arrays. For estimators with a slope, background holds the offset.
+    The profiles are processed in chunks of about PREPROCESS_CHUNK_SIZE kB, so a chunk stays in the CPU cache while
+    it passes all steps.
+    """
+    if bg_estimator is None:
+        bg_estimator = ['mean'] * len(bg_first)
+    if corrections is None:
+        corrections = Corrections()
+    groups = background_window_groups(bg_first, bg_last, bg_estimator)
+    height_factor = corrections.height_factor(range_square).astype(out.dtype, copy=False)[np.newaxis]
+    if corrections.dark is not None:
+        dark = corrections.dark.astype(out.dtype, copy=False)[np.newaxis]
+
+    chunk = max(1, mc.PREPROCESS_CHUNK_SIZE * 1024 // max(out[:1].nbytes, 1))
+    if corrections.dead_time is not None:
+        tmp = np.empty((min(chunk, len(out)),) + out.shape[1:], dtype=out.dtype)
+
+    for first in range(0, len(out), chunk):
+        last = min(first + chunk, len(out))
+        chunk_out = out[first: last]
+        if corrections.dead_time is None:
+            counts = raw_data[first: last]
+        else:
+            # the background is estimated on the dead-time corrected counts
+            np.copyto(chunk_out, raw_data[first: last], casting='unsafe')
+            apply_dead_time(chunk_out, corrections.dead_time[first: last], tmp[:last - first])
+            counts = chunk_out
+
+        slopes = []
+        for (window_first, window_last, estimator), chs in groups:
+            # all profiles and channels of a group are estimated at once, the estimators accumulate in double
+            # precision and the background is stored in the dtype of background
+            offset, slope = estimate_background(counts[:, chs, window_first: window_last], window_first, estimator)
+            background[first: last, chs] = offset
+            if slope is not None:
+                slopes.append((chs, slope))
+
+        np.subtract(counts, background[first: last, :, np.newaxis], out=chunk_out, casting='unsafe')
+        for chs, slope in slopes:
+            # channel by channel, chunk_out[:, chs] would be a copy for a list of channels
+            for i, c in enumerate(np.arange(out.shape[1])[chs]):
+                subtract_background_slope(chunk_out[:, c], slope[:, i])
+        if corrections.dark is not None:
+            np.subtract(chunk_out, dark, out=chunk_out)
+        np.multiply(chunk_out, height_factor, out=chunk_out)
+
+
+def dark_signal(raw_data, bg_first, bg_last, bg_estimator, dead_time, dark_region):
+    """
+    mean background corrected signal of the profiles dark_region (first, last) of a (time, channel, height) raw
+    signal array, which have been recorded with closed shutter.
+    dead_time: (time, channel) dead-time factors of the profiles of raw_data or None
+    """
+    first, last = dark_region
+    dark_raw = raw_data[first: last]
+    if dead_time is not None:
+        dead_time = dead_time[first: last]
+    data = np.empty(dark_raw.shape, dtype=np.float64)
+    background = np.empty(dark_raw.shape[:2], dtype=np.float64)
+    pre_process_block(dark_raw, bg_first, bg_last, np.ones(dark_raw.shape[2]), data, background, bg_estimator,
+                      Corrections(dead_time=dead_time))
+    return data.mean(axis=0)
+
+
+def consecutive_runs(values):
+    """
+    >>> consecutive_runs([0, 1, 2, 5, 7, 8])
+    [[0, 1, 2], [5], [7, 8]]
+    """
+    runs = []
+    for value in values:
+        if runs and runs[-1][-1] + 1 == value:
+            runs[-1].append(value)
+        else:
+            runs.append([value])
+    return runs
 
-            bg_mode_var = nc_file.createVariable('Background_Mode',
-                                                 'i4', ('channels',))
 
-            lr_input_var = nc_file.createVariable('LR_Input',
-                                                  'i4', ('channels',))
+def subtract_background_slope(data, slope):
+    """
+    subtracts the height dependent part slope * bin of a linear background in place.
+    data: (time, height), slope: (time)
 
-            angle_var = nc_file.createVariable('Laser_Pointing_Angle',
-                                               'f8', ('scan_angles',))
+    >>> data = np.array([[2., 3., 4.]])
+    >>> subtract_background_slope(data, np.array([1.]))
+    >>> np.array_equal(data, [[2., 2., 2.]])
+    True
+    """
+    bins = np.arange(data.shape[-1], dtype=data.dtype)
+    data -= slope[:, np.newaxis].astype(data.dtype) * bins
 
-            angle_id_var = nc_file.createVariable(
-                'Laser_Pointing_Angle_of_Profiles', 'i4', ('time', 'nb_of_time_scales'))
 
-            shots_var = nc_file.createVariable('Laser_Shots',
-                                               'i4', ('time', 'channels'))
+def pre_processing_settings(header):
+    """
+    background window, background estimator, dead time and overlap file of a channel header
+    """
+    return (header.bg_first, header.bg_last, header.get('bg_estimator', 'mean'), header.get('dead_time'),
+            header.get('overlap_file'))
 
-            mol_calc_var = nc_file.createVariable('Molecular_Calc',
-                                                  'i4', ())
 
-            pres_var = nc_file.createVariable('Pressure_at_Lidar_Station',
-                                              'f8', ())
-            temp_var = nc_file.createVariable('Temperature_at_Lidar_Station',
-                                              'f8', ())
+def background_window_groups(bg_first, bg_last, bg_estimator=None):
+    """
+    groups the block channels with the same background window and estimator. The channels of a group are a slice if
+    they are consecutive, so the window can be estimated without copying.
+
+    >>> background_window_groups([0, 0, 0], [250, 250, 250])
+    [((0, 250, 'mean'), slice(0, 3, None))]
+    >>> background_window_groups([0, 10, 0], [250, 250, 250])
+    [((0, 250, 'mean'), [0, 2]), ((10, 250, 'mean'), slice(1, 2, None))]
+    >>> background_window_groups([0, 0, 0], [250, 250, 250], ['mean', 'median', 'median'])
+    [((0, 250, 'mean'), slice(0, 1, None)), ((0, 250, 'median'), slice(1, 3, None))]
+    """
+    if bg_estimator is None:
+        bg_estimator = ['mean'] * len(bg_first)
+    groups = {}
+    for c in range(len(bg_first)):
+        groups.setdefault((bg_first[c], bg_last[c], bg_estimator[c]), []).append(c)
+
+    result = []
+    for window in sorted(groups):
+        chs = groups[window]
+        if chs == list(range(chs[0], chs[-1] + 1)):
+            chs = slice(chs[0], chs[-1] + 1)
+        result.append((window, chs))
+    return result
+
+
+def channel_layout(chs):
+    """
+    channels of the raw data file that are stored in the signal blocks and the block index of each channel
+    chs (indices in CHANNEL_NAMES). Channels that are listed more than once in CHAN_NC_POS share one block channel.
 
-            range_res_var = nc_file.createVariable('Raw_Data_Range_Resolution',
-                                                   'f8', ('channels',))
+    >>> channel_layout([0, 2])
+    ([0, 2], {0: 0, 2: 1})
+    """
+    positions = sorted(set([mc.CHAN_NC_POS[ch] for ch in chs]))
+    block_idx = {ch: positions.index(mc.CHAN_NC_POS[ch]) for ch in chs}
+    return positions, block_idx
 
-            start_var = nc_file.createVariable(
-                'Raw_Data_Start_Time', 'i4', ('time', 'nb_of_time_scales'))
 
-            stop_var = nc_file.createVariable(
-                'Raw_Data_Stop_Time', 'i4', ('time', 'nb_of_time_scales'))
+def block_pre_processing_settings(block_idx):
+    """
+    pre_processing_settings of each block channel. A shared block channel uses the settings of its first channel.
+    """
+    settings = [None] * (max(block_idx.values()) + 1)
+    for ch in sorted(block_idx, reverse=True):
+        settings[block_idx[ch]] = (mc.BG_FIRST[ch], mc.BG_LAST[ch], mc.BG_ESTIMATOR[ch], mc.DEAD_TIME[ch],
+                                   mc.OVL_FILE[ch])
+    return settings
 
-            data_var = nc_file.createVariable(
-                'Raw_Lidar_Data', 'f8', ('time', 'channels', 'points'))
 
-            range_id_var = nc_file.createVariable('ID_Range',
-                                                  'i4', ('channels',))
+def raw_signal_dtype(file_dtype):
+    """
+    dtype of the raw signals in memory (RAW_SIGNAL_DTYPE, default: dtype of the raw data file in native byte order)
+    """
+    if mc.RAW_SIGNAL_DTYPE is None:
+        return np.dtype(file_dtype).newbyteorder('=')
+    return np.dtype(mc.RAW_SIGNAL_DTYPE)
 
-            ch_id_var = nc_file.createVariable('channel_ID',
-                                               'i4', ('channels',))
 
-            ch_name_var = nc_file.createVariable('channel_string_ID',
-                                                 str, ('channels',))
+def copy_raw_signal(out, raw_signal, positions):
+    """
+    copies the channels positions of a (time, height, channel) raw signal into a (time, channel, height) array
+    """
+    if list(positions) == list(range(raw_signal.shape[2])):
+        out[...] = raw_signal.transpose((0, 2, 1))
+    else:
+        for i, pos in enumerate(positions):
+            out[:, i, :] = raw_signal[:, :, pos]
 
-            time_scale_id_var = nc_file.createVariable('id_timescale',
-                                                       'i4', ('channels',))
 
-            calib_range_min_var = nc_file.createVariable('Pol_Calib_Range_Min',
-                                                         'f8', ('channels',))
-            calib_range_max_var = nc_file.createVariable('Pol_Calib_Range_Max',
-                                                         'f8', ('channels',))
-            # write data
+def read_raw_part(sig_filename, use_mmap=False):
+    """
+    opens a raw data file for Measurement.read_signals. The arrays of the returned part are views into the file.
+    """
+    nc_file = open_raw_file(sig_filename, use_mmap)
+    return {'filename': sig_filename,
+            'nc_file': nc_file,
+            'mmap': use_mmap,
+            'header': read_raw_header(nc_file),
+            'measurement_time': nc_file.variables['measurement_time'].data,
+            'time_keys': time_keys(nc_file.variables['measurement_time'].data),
+            'shots': nc_file.variables['measurement_shots'].data[:, 0],
+            'depol_cal_angle': nc_file.variables['depol_cal_angle'].data,
+            'raw_signal': nc_file.variables['raw_signal'].data}
+
+
+def close_raw_part(part):
+    for key in ['measurement_time', 'shots', 'depol_cal_angle', 'raw_signal']:
+        part[key] = None
+    if part['nc_file'] is not None:
+        part['nc_file'].close()
+        part['nc_file'] = None
+
+
+def decode_raw_part(sig_filename):
+    """
+    worker of the parallel ingestion: reads a raw data file completely into memory and preprocesses all channels
+    """
+    part = read_raw_part(sig_filename)
+    for key in ['measurement_time', 'shots', 'depol_cal_angle']:
+        part[key] = np.array(part[key])
 
-            angle_var[0] = self.z_axis.header.zenith_angle
+    header = part['header']
+    z_axis = ZAxis.from_polly_file(
+        {
+            'points': header['points'],
+            'bin_res': header['bin_res'],
+            'zenith_angle': header['zenith_angle'],
+            'altitude': header['altitude']})
 
-            if self.sounding:
-                mol_calc_var.assignValue(1)
-            else:
-                mol_calc_var.assignValue(0)
-
-            pres_var.assignValue(self.header.pressure)
-            temp_var.assignValue(self.header.temperature)
-
-            for ch in range(mc.NUM_CAL_CHANNELS):
-                range_res_var[ch] = self.z_axis.header.range_res
-                bg_height_first_var[ch] = self.signals[mc.CHANNEL_NAMES[mc.CAL_CHANNEL[ch]]].header.bg_first
-                bg_height_last_var[ch] = self.signals[mc.CHANNEL_NAMES[mc.CAL_CHANNEL[ch]]].header.bg_last
-                time_scale_id_var[ch] = 0
-                ch_id_var[ch] = mc.NC_FILL_INT
-                ch_name_var[ch] = mc.CAL_CHANNEL_SCC_ID_STR[ch]
-                lr_input_var[ch] = 1
-                bg_mode_var[ch] = 0
-                range_id_var[ch] = self.signals[mc.CHANNEL_NAMES[mc.CAL_CHANNEL[ch]]
-                                                ].header.range_id
-                calib_range_min_var[ch] = mc.CALIB_RANGE_MIN
-                calib_range_max_var[ch] = mc.CALIB_RANGE_MAX
-
-            for t in range(length):
-                angle_id_var[t, 0] = 0
-                start_var[t, 0] = self.time_axis.secs_of_meas_start[cal_idxs[0]
-                                                                    ][t].seconds - self.time_axis.secs_of_meas_start[cal_idxs[0]][0].seconds
-                stop_var[t, 0] = self.time_axis.secs_of_meas_stop[cal_idxs[1]
-                                                                  ][t].seconds - self.time_axis.secs_of_meas_start[cal_idxs[0]][0].seconds
-                for ch in range(mc.NUM_CAL_CHANNELS):
-                    t_idx = cal_idxs[mc.CAL_IDX_RANGE[ch]][t]
-                    ch_idx = mc.CAL_CHANNEL[ch]
-                    shots_var[t, ch] = self.shots.data[t_idx]
-                    data_var[t, ch, :] = self.signals[mc.CHANNEL_NAMES[ch_idx]
-                                                      ].data[t_idx][:]
+    positions, block_idx = channel_layout(range(header['num_channels']))
+    bg_first, bg_last, bg_estimator, dead_time, overlap_file = zip(*block_pre_processing_settings(block_idx))
 
-            nc_file.close()
+    # the block is a copy, the file is not needed any more
+    raw_block = SignalBlock.from_polly_file(part['raw_signal'], positions)
+    part['raw_signal'] = None
+    part['nc_file'].close()
+    part['nc_file'] = None
 
-    def scc_raw_filename(self):
-        datestr = self.time_axis.start[self.mask][0].strftime('%Y%m%d')
-        startstr = self.time_axis.start[self.mask][0].strftime('%H%M%S')
-        stopstr = self.time_axis.stop[self.mask][-1].strftime('%H%M%S')
+    corrections = create_corrections(dead_time, overlap_file, part['shots'], header['bin_res'], z_axis.range_axis.data)
+    pp_block = SignalBlock.from_raw_block(raw_block, bg_first, bg_last, z_axis, bg_estimator, corrections)
+    part['raw_block'] = raw_block.data
+    part['pre_processed'] = pp_block.data
+    part['background'] = pp_block.background
 
-        filename = self.header.measurement_id  # + '_'
-        filename = '_'.join([filename, startstr])
-        filename = '_'.join([filename, stopstr])
-        filename = '.'.join([filename, 'nc'])
-        return filename
+    return part
 
-    def scc_depolcal_filename(self, cal_idxs):
-        datestr = self.time_axis.start[cal_idxs[0][0]].strftime('%Y%m%d')
-        startstr = self.time_axis.start[cal_idxs[0][0]].strftime('%H%M%S')
-        stopstr = self.time_axis.stop[cal_idxs[1][-1]].strftime('%H%M%S')
 
-        filename = mc.SCC_RAW_FILENAME_BODY + '_depolcal_'
-        filename = '_'.join([filename, datestr])
-        filename = '_'.join([filename, startstr])
-        filename = '_'.join([filename, stopstr])
-        filename = '.'.join([filename, 'nc'])
-        return filename
+def read_raw_parts_parallel(sig_filenames, workers):
+    """
+    reads the raw data files in a pool of worker processes.
+    Returns None if the pool can not be used, the files have to be read one by one then.
+    """
+    try:
+        pool = multiprocessing.Pool(min(workers, len(sig_filenames)))
+    except Exception:
+        logger.warning("Parallel reading is not available, files are read one by one.")
+        logger.warning("Traceback: %s" % tb.format_exc())
+        return None
+
+    try:
+        return pool.map(decode_raw_part, sig_filenames)
+    except error.LidarError:
+        raise
+    except Exception:
+        logger.warning("Parallel reading failed, files are read one by one.")
+        logger.warning("Traceback: %s" % tb.format_exc())
+        return None
+    finally:
+        pool.terminate()
 
 
 if __name__ == "__main__":
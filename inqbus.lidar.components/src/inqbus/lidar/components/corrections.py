@@ -0,0 +1,105 @@
+"""
+instrumental corrections that are applied by the preprocessing (container.pre_process_block) in the same pass as
+background subtraction and range correction:
+
+    dead-time correction of the raw counts -> background subtraction -> dark subtraction
+    -> range and overlap correction
+
+Each correction is optional. The overlap function is folded into the range correction factor, so it costs no
+additional pass over the signals.
+"""
+import os
+
+import numpy as np
+
+from inqbus.lidar.scc_gui.configs import main_config as mc
+
+
+class Corrections(object):
+    """
+    corrections of the channels of a (time, channel, height) signal block. None disables a correction.
+    """
+
+    def __init__(self, dead_time=None, dark=None, overlap=None):
+        # (time, channel): dead time / (laser shots * bin duration) of each profile, 0 for no correction
+        self.dead_time = dead_time
+        # (channel, height): background corrected dark signal of one profile
+        self.dark = dark
+        # (channel, height): overlap function, 1 for no correction
+        self.overlap = overlap
+
+    def height_factor(self, range_square):
+        """
+        (channel or 1, height) factor of the range and overlap correction
+
+        >>> corrections = Corrections(overlap=np.array([[0.5, 1.], [1., 1.]]))
+        >>> np.array_equal(corrections.height_factor(np.array([4., 9.])), [[8., 9.], [4., 9.]])
+        True
+        """
+        if self.overlap is None:
+            return range_square[np.newaxis, :]
+        return range_square[np.newaxis, :] / self.overlap
+
+
+def create_corrections(dead_time, overlap_file, shots, bin_res, range_axis):
+    """
+    dead-time and overlap corrections of the channels of a block.
+    dead_time, overlap_file: settings of each channel (see DEAD_TIME and OVL_FILE)
+    shots: laser shots of each profile, bin_res: bin duration in ns, range_axis: range of the height bins in m
+    """
+    result = Corrections()
+    if any([value is not None for value in dead_time]):
+        result.dead_time = dead_time_factors(dead_time, shots, bin_res)
+    if any([filename is not None for filename in overlap_file]):
+        result.overlap = np.vstack([overlap_function(filename, range_axis) for filename in overlap_file])
+    return result
+
+
+def dead_time_factors(dead_time, shots, bin_res):
+    """
+    (time, channel) fraction of a height bin the detector is dead after one count.
+    A non-paralyzable detector with dead time tau counts N = N_true / (1 + N_true * tau / (shots * bin duration)),
+    so N_true = N / (1 - N * factor)
+
+    >>> np.allclose(dead_time_factors([4., None], np.array([100, 200]), 50.), [[0.0008, 0.], [0.0004, 0.]])
+    True
+    """
+    tau = np.array([0. if value is None else value for value in dead_time], dtype=np.float64)
+    return tau[np.newaxis, :] / (np.maximum(shots, 1).astype(np.float64)[:, np.newaxis] * bin_res)
+
+
+def apply_dead_time(data, factors, tmp):
+    """
+    dead-time correction of the (time, channel, height) counts in data in place. tmp is a buffer like data.
+    """
+    np.multiply(data, factors[:, :, np.newaxis], out=tmp)
+    np.subtract(1., tmp, out=tmp)
+    np.divide(data, tmp, out=data)
+
+
+# overlap files by path -> ((mtime, size), (range, overlap))
+_overlap_files = {}
+
+
+def read_overlap_file(filename):
+    """
+    range (m) and overlap columns of an overlap file in OVL_PATH. A file is read again only if it has been modified.
+    """
+    path = os.path.join(mc.OVL_PATH, filename)
+    stat = os.stat(path)
+    key = (stat.st_mtime, stat.st_size)
+    if path not in _overlap_files or _overlap_files[path][0] != key:
+        data = np.loadtxt(path, comments='#', usecols=(0, 1), ndmin=2)
+        _overlap_files[path] = (key, (data[:, 0], data[:, 1]))
+    return _overlap_files[path][1]
+
+
+def overlap_function(filename, range_axis):
+    """
+    overlap function of an overlap file on range_axis. Beyond the end of the file the overlap is 1, values below
+    OVL_MIN are raised to OVL_MIN to keep the correction finite near the lidar. filename None gives 1 everywhere.
+    """
+    if filename is None:
+        return np.ones(len(range_axis))
+    ovl_range, overlap = read_overlap_file(filename)
+    return np.maximum(np.interp(range_axis, ovl_range, overlap, right=1.), mc.OVL_MIN)
@@ -39,4 +39,9 @@ class PathDoesNotExist(LidarError):
 class FilesAreDifferent(LidarError):
     """
     Raised if a raw signal file shall be appended does not fit to existing file information
-    """
\ No newline at end of file
+    """
+
+class NoProfilesFound(LidarError):
+    """
+    Raised if the raw signal files contain no profiles within the requested time window
+    """
@@ -0,0 +1,73 @@
+"""
+reader of the lidar housekeeping log (LIDAR_LOG_PATH/<yyyymmdd>_temps.txt).
+
+After 3 header lines each line holds
+
+    dd.mm.yyyy HH:MM:SS T1064 T1 T2 pyro Tout RHout status
+
+Lines with missing columns or values below -100 (no measurement) are skipped. The file is parsed by numpy at once,
+not line by line.
+"""
+import warnings
+
+import numpy as np
+
+LOG_HEADER_LINES = 3
+LOG_COLUMNS = ['T1064', 'T1', 'T2', 'pyro', 'Tout', 'RHout', 'status']
+LOG_MISSING_VALUE = -100
+
+# status bits
+STATUS_ROOF_CLOSED = 1
+STATUS_NO_RAIN = 2
+STATUS_RADAR_SHUTTER_CLOSED = 4
+
+
+def parse_log_times(dates, times):
+    """
+    datetime64[s] of arrays of dd.mm.yyyy dates and HH:MM:SS times
+
+    >>> parse_log_times(np.array(['01.05.2015', '31.12.2015']), np.array(['00:00:10', '23:59:59'])).tolist()
+    [datetime.datetime(2015, 5, 1, 0, 0, 10), datetime.datetime(2015, 12, 31, 23, 59, 59)]
+    """
+    # rearrange the characters of the dates to yyyy-mm-dd
+    chars = np.asarray(dates, dtype='S10').view('S1').reshape(-1, 10)[:, [6, 7, 8, 9, 2, 3, 4, 5, 0, 1]]
+    chars[:, [4, 7]] = b'-'
+    days = np.ascontiguousarray(chars).view('S10').ravel().astype('datetime64[D]')
+
+    digits = np.asarray(times, dtype='S8').view(np.uint8).reshape(-1, 8)[:, [0, 1, 3, 4, 6, 7]].astype(np.int64) - 48
+    seconds = (digits[:, 0] * 10 + digits[:, 1]) * 3600 + (digits[:, 2] * 10 + digits[:, 3]) * 60 + \
+        digits[:, 4] * 10 + digits[:, 5]
+
+    return days.astype('datetime64[s]') + seconds.astype('timedelta64[s]')
+
+
+def read_lidar_log(filename):
+    """
+    dict of arrays of the valid lines of a lidar log: 'time' (datetime64[s]), the float columns of LOG_COLUMNS, the
+    integer 'status' and its decoded bits 'roof_closed', 'rain' and 'radar_shutter_close' (bool)
+    """
+    with open(filename, 'r') as log_file:
+        lines = log_file.readlines()[LOG_HEADER_LINES:]
+
+    dtype = [('date', 'U10'), ('time', 'U8')] + [(name, np.float64) for name in LOG_COLUMNS]
+    with warnings.catch_warnings():
+        # lines with missing columns are skipped
+        warnings.simplefilter('ignore')
+        table = np.atleast_1d(np.genfromtxt(lines, dtype=dtype, usecols=range(len(dtype)), invalid_raise=False))
+
+    values = np.vstack([table[name] for name in LOG_COLUMNS]) if len(table) else np.empty((len(LOG_COLUMNS), 0))
+    # unreadable values are nan
+    valid = np.all(values >= LOG_MISSING_VALUE, axis=0)
+    table = table[valid]
+
+    result = {'time': parse_log_times(table['date'], table['time'])}
+    for name in LOG_COLUMNS:
+        result[name] = table[name]
+
+    status = table['status'].astype(np.int64)
+    result['status'] = status
+    result['roof_closed'] = status & STATUS_ROOF_CLOSED != 0
+    result['rain'] = status & STATUS_NO_RAIN == 0
+    result['radar_shutter_close'] = status & STATUS_RADAR_SHUTTER_CLOSED != 0
+
+    return result
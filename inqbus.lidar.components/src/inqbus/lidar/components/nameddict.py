@@ -1,5 +1,5 @@
 import pprint
-from collections import MutableMapping
+from collections.abc import MutableMapping
 
 
 class NamedDict(MutableMapping):
@@ -14,7 +14,7 @@ class NamedDict(MutableMapping):
 
     def __getattr__(self, attr):
         if attr in self.__dict__:
-            return __dict__[attr]
+            return self.__dict__[attr]
         else:
             if attr in self.attrs:
                 return self.attrs[attr]
@@ -47,4 +47,4 @@ class NamedDict(MutableMapping):
         self.attrs.__delitem__(item)
 
     def __len__(self):
-        self.attrs.__len__()
+        return self.attrs.__len__()
@@ -0,0 +1,86 @@
+"""
+multi-resolution pyramid of a (time, height) signal for the display of long measurements.
+
+Level n averages 2**n profiles and 2**n height bins. The profiles are weighted by their laser shots. Each level is
+binned from the previous one, so the full resolution signal is passed only once.
+"""
+import numpy as np
+
+from inqbus.lidar.scc_gui.configs import main_config as mc
+
+
+def pair_sum(data):
+    """
+    sums of pairs of neighbouring rows. An odd last row is kept.
+
+    >>> pair_sum(np.array([[1, 2], [3, 4], [5, 6]])).tolist()
+    [[4, 6], [5, 6]]
+    """
+    half = len(data) // 2
+    result = np.empty((len(data) - half,) + data.shape[1:], dtype=data.dtype)
+    # strided adds are much faster than np.add.reduceat along the first axis
+    np.add(data[0: 2 * half: 2], data[1: 2 * half: 2], out=result[:half])
+    if len(data) % 2:
+        result[half] = data[-1]
+    return result
+
+
+def bin_average(data, weights):
+    """
+    averages bins of 2 profiles x 2 height bins of the (time, height) array data, the profiles are weighted by
+    weights. An incomplete last bin averages the remaining values. Bins without weight are 0.
+    Returns the binned array and the weights of its profiles.
+
+    >>> data = np.array([[1., 2., 3.], [3., 4., 5.], [10., 10., 10.]])
+    >>> level, level_weights = bin_average(data, np.array([1., 3., 2.]))
+    >>> np.array_equal(level, [[3., 4.5], [10., 10.]]), np.array_equal(level_weights, [4., 2.])
+    (True, True)
+    """
+    height_counts = pair_sum(np.ones(data.shape[1]))
+    level_weights = pair_sum(weights)
+    divisor = np.where(level_weights > 0, level_weights, 1.)[:, np.newaxis] * height_counts[np.newaxis, :]
+    divisor = divisor.astype(data.dtype)
+    level = np.empty(divisor.shape, dtype=data.dtype)
+
+    # chunks of an even number of profiles keep the weighted temporary small
+    chunk = max(2, mc.PREPROCESS_CHUNK_SIZE * 1024 // max(data[:1].nbytes, 1) // 2 * 2)
+    for first in range(0, len(data), chunk):
+        weighted = data[first: first + chunk] * weights[first: first + chunk, np.newaxis].astype(data.dtype)
+        summed = pair_sum(pair_sum(weighted).T).T
+        level_first = first // 2
+        level_last = level_first + len(summed)
+        np.divide(summed, divisor[level_first: level_last], out=level[level_first: level_last])
+
+    return level, level_weights
+
+
+class SignalPyramid(object):
+    """
+    levels of a (time, height) signal: levels[0] is the signal, levels[n] averages 2**n profiles and 2**n height bins.
+    Levels are added until both axes are not longer than min_size (default: PYRAMID_MIN_SIZE).
+    """
+
+    def __init__(self, data, shots, min_size=None):
+        if min_size is None:
+            min_size = mc.PYRAMID_MIN_SIZE
+        weights = np.maximum(shots, 0).astype(np.float64)
+        self.levels = [data]
+        while max(data.shape) > min_size and min(data.shape) > 1:
+            data, weights = bin_average(data, weights)
+            self.levels.append(data)
+
+    def select(self, time_factor, height_factor):
+        """
+        the coarsest level that averages not more than time_factor profiles and height_factor height bins.
+        Returns the level and its binning factor.
+
+        >>> pyramid = SignalPyramid(np.ones((16, 8)), np.ones(16), min_size=2)
+        >>> [level.shape for level in pyramid.levels]
+        [(16, 8), (8, 4), (4, 2), (2, 1)]
+        >>> level, factor = pyramid.select(5, 20)
+        >>> level.shape, factor
+        ((4, 2), 4)
+        """
+        n = int(np.log2(max(1, min(time_factor, height_factor))))
+        n = min(n, len(self.levels) - 1)
+        return self.levels[n], 2 ** n
@@ -0,0 +1,142 @@
+import io
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+from scipy.io import netcdf
+
+from inqbus.lidar.components.error import WrongFileFormat, FilesAreDifferent
+from inqbus.lidar.scc_gui.configs import main_config as mc
+
+
+class ZipMemberCache(object):
+    """
+    in memory cache of decompressed members of zip archives.
+
+    The members are identified by their name, size and CRC32 checksum from the zip directory. Reopening an archive
+    therefore only needs to read its directory. If the cache exceeds max_size bytes, the least recently used members
+    are evicted.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self._members = OrderedDict()
+
+    def __len__(self):
+        return len(self._members)
+
+    @staticmethod
+    def key(zinfo):
+        return zinfo.filename, zinfo.file_size, zinfo.CRC
+
+    def read(self, zip_filename, member_name=None):
+        """
+        returns the decompressed content of a member of the zip archive (default: the first member)
+        """
+        with zipfile.ZipFile(zip_filename) as zfile:
+            if member_name is None:
+                zinfo = zfile.infolist()[0]
+            else:
+                zinfo = zfile.getinfo(member_name)
+
+            key = self.key(zinfo)
+            if key in self._members:
+                self._members.move_to_end(key)
+                return self._members[key]
+
+            content = zfile.read(zinfo)
+
+        self.add(key, content)
+        return content
+
+    def add(self, key, content):
+        if len(content) > self.max_size:
+            # would evict everything else
+            return
+        self._members[key] = content
+        self.size += len(content)
+        while self.size > self.max_size:
+            old_key, old_content = self._members.popitem(last=False)
+            self.size -= len(old_content)
+
+    def clear(self):
+        self._members.clear()
+        self.size = 0
+
+
+zip_cache = ZipMemberCache(mc.ZIP_CACHE_SIZE * 1024 ** 2)
+
+
+def open_raw_file(sig_filename, mmap=False, use_cache=True):
+    """
+    opens a raw data file (*.nc or zipped *.nc) for reading.
+    Zip archives are decompressed in memory, mmap is only used for plain nc files.
+    use_cache: keep the decompressed zip archive in the zip_cache
+    """
+    if sig_filename.endswith('.zip'):
+        if use_cache:
+            content = zip_cache.read(sig_filename)
+        else:
+            with zipfile.ZipFile(sig_filename) as zfile:
+                content = zfile.read(zfile.infolist()[0])
+        nc_file = netcdf.netcdf_file(io.BytesIO(content), 'r', False, 1)
+        nc_file.filename = sig_filename
+        return nc_file
+    elif sig_filename.endswith('.nc'):
+        return netcdf.netcdf_file(sig_filename, 'r', mmap, 1)
+    else:
+        raise WrongFileFormat
+
+
+# header entries that must be equal if raw data files shall be combined
+COMPATIBLE_HEADER_KEYS = ['latitude', 'longitude', 'altitude', 'points', 'num_channels', 'bin_res', 'zenith_angle']
+
+
+def read_raw_header(nc_file):
+    """
+    reads the header information of an opened raw data file. The signals are not touched.
+    """
+    header = {}
+    header['latitude'] = nc_file.variables['location_coordinates'].data[0]
+    header['longitude'] = nc_file.variables['location_coordinates'].data[1]
+    header['altitude'] = nc_file.variables['location_height'].getValue()
+    header['points'] = nc_file.dimensions['height']
+    header['time_len'] = len(nc_file.variables['measurement_time'].data)
+    header['num_channels'] = nc_file.dimensions['channel'] + mc.NUM_DOUBLE_CHANNELS
+    # in ns
+    header['bin_res'] = nc_file.variables['measurement_height_resolution'].getValue()
+    header['zenith_angle'] = nc_file.variables['zenithangle'].getValue()
+    return header
+
+
+def check_compatible(header, other_header):
+    """
+    raises FilesAreDifferent if the data of two raw data files can not be combined
+    """
+    for key in COMPATIBLE_HEADER_KEYS:
+        if header[key] != other_header[key]:
+            raise FilesAreDifferent
+
+
+def time_keys(measurement_time):
+    """
+    sortable integer representation of the polly time stamps (date, seconds of day)
+
+    >>> time_keys(np.array([[20150501, 60], [20150502, 30]]))
+    array([2015050100060, 2015050200030])
+    """
+    measurement_time = np.asarray(measurement_time)
+    return measurement_time[:, 0].astype(np.int64) * 100000 + measurement_time[:, 1]
+
+
+def datetime_key(value):
+    """
+    time key (see time_keys) of a datetime
+
+    >>> import datetime
+    >>> datetime_key(datetime.datetime(2015, 5, 1, 0, 1))
+    2015050100060
+    """
+    date = value.year * 10000 + value.month * 100 + value.day
+    return date * 100000 + value.hour * 3600 + value.minute * 60 + value.second
@@ -1,8 +1,13 @@
 import datetime
+import functools
+import multiprocessing
 import os
+import traceback as tb
 
 from scipy.io import netcdf
 
+from inqbus.lidar.scc_gui.log import logger
+
 BG_FIRST = 0
 BG_LAST = 251
 LIGHT_SPEED = 3E8
@@ -138,28 +143,56 @@ def read(
         SCAT_TYPES,
         RANGE_ID,
         GROUND_PRES,
-        GROUND_TEMP):
+        GROUND_TEMP,
+        workers=1):
     zfilenames.sort()
-    meas_parts = []
-    for zfilename in zfilenames:
-        print(zfilename)
-        meas_parts.append(
-            read_one_file(
-                os.path.join(
-                    INPATH,
-                    zfilename),
-                CHANNEL_IDs,
-                WAVELENGTHS,
-                SCAT_TYPES,
-                RANGE_ID,
-                GROUND_PRES,
-                GROUND_TEMP))
+    read_file = functools.partial(
+        read_one_file,
+        CHANNEL_IDs=CHANNEL_IDs,
+        WAVELENGTHS=WAVELENGTHS,
+        SCAT_TYPES=SCAT_TYPES,
+        RANGE_ID=RANGE_ID,
+        GROUND_PRES=GROUND_PRES,
+        GROUND_TEMP=GROUND_TEMP)
+    paths = [os.path.join(INPATH, zfilename) for zfilename in zfilenames]
+
+    meas_parts = None
+    if workers > 1 and len(paths) > 1:
+        meas_parts = read_parallel(read_file, paths, workers)
+    if meas_parts is None:
+        meas_parts = []
+        for path in paths:
+            print(path)
+            meas_parts.append(read_file(path))
+
     if len(meas_parts) > 1:
         return combine(meas_parts)
     else:
         return meas_parts[0]
 
 
+def read_parallel(read_file, paths, workers):
+    """
+    reads the files in a pool of worker processes. The results are in the order of paths.
+    Returns None if the pool can not be used or the workers fail, the files have to be read one by one then.
+    """
+    try:
+        pool = multiprocessing.Pool(min(workers, len(paths)))
+    except Exception:
+        logger.warning("Parallel reading is not available, files are read one by one.")
+        logger.warning("Traceback: %s" % tb.format_exc())
+        return None
+
+    try:
+        return pool.map(read_file, paths)
+    except Exception:
+        logger.warning("Parallel reading failed, files are read one by one.")
+        logger.warning("Traceback: %s" % tb.format_exc())
+        return None
+    finally:
+        pool.terminate()
+
+
 def read_one_file(
         zfilename,
         CHANNEL_IDs,
@@ -0,0 +1,119 @@
+"""
+typed header records of channels, z axes and measurements.
+
+A NamedDict header resolves every attribute in Python code (__getattr__ -> attrs dict). The fields of a record are
+__slots__, so reading them is a plain attribute access. This matters in the preprocessing and export loops, which read
+the channel headers for every channel and every cache lookup.
+
+Records can replace the NamedDict headers: they are mutable mappings of their set fields, unset fields are missing
+keys, and attrs is a dict of the set fields. Keys that are not fields are kept in an extra dict.
+"""
+import pprint
+from collections.abc import MutableMapping
+
+# marks unset fields
+_UNSET = object()
+
+
+class HeaderRecord(MutableMapping):
+    """
+    base of the header records. Subclasses list their fields in __slots__.
+
+    >>> info = ChannelInfo({'bg_first': 0, 'bg_last': 250, 'wl': 355})
+    >>> info.bg_last, info['wl'], 'range_id' in info, info == {'bg_first': 0, 'bg_last': 250, 'wl': 355}
+    (250, 355, False, True)
+    """
+    __slots__ = ('_extra',)
+
+    def __init__(self, values=None):
+        object.__setattr__(self, '_extra', {})
+        if values is not None:
+            self.update(values)
+
+    def __str__(self):
+        return pprint.pformat(self.attrs)
+
+    def __getattr__(self, attr):
+        # only called for unset fields and keys that are not fields
+        if attr != '_extra' and attr in self._extra:
+            return self._extra[attr]
+        raise AttributeError("Attribute %s not found" % attr)
+
+    def __setattr__(self, attr, val):
+        try:
+            object.__setattr__(self, attr, val)
+        except AttributeError:
+            # not a field
+            self._extra[attr] = val
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, val):
+        setattr(self, key, val)
+
+    def __delitem__(self, key):
+        if key in self._extra:
+            del self._extra[key]
+        else:
+            try:
+                object.__delattr__(self, key)
+            except AttributeError:
+                raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __iter__(self):
+        for name in type(self).__slots__:
+            try:
+                getattr(self, name)
+            except AttributeError:
+                continue
+            yield name
+        for key in self._extra:
+            yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self):
+        result = type(self).__new__(type(self))
+        object.__setattr__(result, '_extra', self._extra.copy())
+        for name in type(self).__slots__:
+            value = getattr(self, name, _UNSET)
+            if value is not _UNSET:
+                object.__setattr__(result, name, value)
+        return result
+
+    @property
+    def attrs(self):
+        """dict of the set fields and extra keys"""
+        return dict(self.items())
+
+    @attrs.setter
+    def attrs(self, values):
+        for key in list(self):
+            del self[key]
+        self.update(values)
+
+
+class ChannelInfo(HeaderRecord):
+    """header of a channel signal, see container.create_channel_info"""
+    __slots__ = ('bg_first', 'bg_last', 'bg_estimator', 'dead_time', 'overlap_file', 'channel_id', 'channel_name',
+                 'range_id', 'first_valid_bin')
+
+
+class ZAxisInfo(HeaderRecord):
+    """header of a ZAxis"""
+    __slots__ = ('points', 'bin_res', 'zenith_angle', 'altitude', 'range_res', 'vert_res', 'first_valid_bin')
+
+
+class MeasurementInfo(HeaderRecord):
+    """header of a Measurement"""
+    __slots__ = ('latitude', 'longitude', 'altitude', 'raw_points', 'points', 'time_len', 'nb_of_time_scales',
+                 'nb_of_scan_angles', 'num_channels', 'bin_res', 'zenith_angle', 'measurement_id', 'comment',
+                 'pressure', 'temperature', 'cloud_mask_type')
@@ -0,0 +1,125 @@
+"""
+writer of SCC raw data files.
+
+The layout of a file is described by a schema: the variables with their NetCDF type and dimensions. The values of each
+variable are given as one array (or a value that is broadcast to the shape of the variable), so every variable is
+written with a single call instead of element by element.
+"""
+import numpy as np
+
+from inqbus.lidar.scc_gui.configs import main_config as mc
+
+# (name, NetCDF type, dimensions) of the variables of an SCC raw data file.
+# The type None is SCC_RAW_DATA_DTYPE.
+SCC_RAW_SCHEMA = [
+    ('Background_High', 'f8', ('channels',)),
+    ('Background_Low', 'f8', ('channels',)),
+    ('Background_Mode', 'i4', ('channels',)),
+    ('LR_Input', 'i4', ('channels',)),
+    ('Laser_Pointing_Angle', 'f8', ('scan_angles',)),
+    ('Laser_Pointing_Angle_of_Profiles', 'i4', ('time', 'nb_of_time_scales')),
+    ('Laser_Shots', 'i4', ('time', 'channels')),
+    ('Molecular_Calc', 'i4', ()),
+    ('Pressure_at_Lidar_Station', 'f8', ()),
+    ('Temperature_at_Lidar_Station', 'f8', ()),
+    ('Raw_Data_Range_Resolution', 'f8', ('channels',)),
+    ('Raw_Data_Start_Time', 'i4', ('time', 'nb_of_time_scales')),
+    ('Raw_Data_Stop_Time', 'i4', ('time', 'nb_of_time_scales')),
+    ('Raw_Lidar_Data', None, ('time', 'channels', 'points')),
+    ('ID_Range', 'i4', ('channels',)),
+    ('channel_ID', 'i4', ('channels',)),
+    ('channel_string_ID', str, ('channels',)),
+    ('id_timescale', 'i4', ('channels',)),
+]
+
+# manual cloud mask of the profiles
+SCC_CLOUD_MASK_SCHEMA = [
+    ('cloud_mask', 'i1', ('time', 'points')),
+    ('cloud_mask_channel_idx', 'i4', ()),
+]
+
+# SCC depolarization calibration file
+SCC_DEPOLCAL_SCHEMA = SCC_RAW_SCHEMA + [
+    ('Pol_Calib_Range_Min', 'f8', ('channels',)),
+    ('Pol_Calib_Range_Max', 'f8', ('channels',)),
+]
+
+# NetCDF3 files of write_scc_raw_netcdf, without string variables
+SCC_RAW_NC3_SCHEMA = [variable for variable in SCC_RAW_SCHEMA if variable[1] is not str]
+
+
+def nc4_variable_options(shape, chunk_axis=None, level=None, min_values=None, chunk_profiles=None, shuffle=None):
+    """
+    keyword arguments of the netCDF4 createVariable for a variable of shape: zlib compression with level (default:
+    NC_COMPRESSION_LEVEL) and shuffle (default: NC_SHUFFLE) of variables with at least min_values (default:
+    NC_COMPRESSION_MIN_VALUES) values, in chunks of chunk_profiles (default: NC_CHUNK_PROFILES) along chunk_axis or
+    in one chunk. Small variables are stored uncompressed.
+
+    >>> sorted(nc4_variable_options((2880, 9, 4000), 0, level=1, min_values=1024, chunk_profiles=16,
+    ...                             shuffle=True).items())
+    [('chunksizes', [16, 9, 4000]), ('complevel', 1), ('shuffle', True), ('zlib', True)]
+    >>> nc4_variable_options((9,), level=1, min_values=1024)
+    {}
+    """
+    if level is None:
+        level = mc.NC_COMPRESSION_LEVEL
+    if min_values is None:
+        min_values = mc.NC_COMPRESSION_MIN_VALUES
+    if chunk_profiles is None:
+        chunk_profiles = mc.NC_CHUNK_PROFILES
+    if shuffle is None:
+        shuffle = mc.NC_SHUFFLE
+    if level <= 0 or int(np.prod(shape)) < min_values:
+        return {}
+
+    chunks = list(shape)
+    if chunk_axis is not None:
+        chunks[chunk_axis] = min(chunk_profiles, shape[chunk_axis])
+    return {'zlib': True, 'complevel': level, 'shuffle': shuffle, 'chunksizes': chunks}
+
+
+def write_scc_file(nc_file, dimensions, attributes, schema, values, compress=False):
+    """
+    writes an SCC raw data file into the open NetCDF file nc_file (netCDF4 Dataset or scipy netcdf_file).
+
+    dimensions: (name, size) of the dimensions
+    attributes: (name, value) of the global attributes, None values are not written
+    schema: (name, NetCDF type, dimensions) of the variables
+    values: variable name -> values of the whole variable
+    compress: if True, the variables are compressed and chunked along the time (see nc4_variable_options).
+    Only for netCDF4 files.
+    """
+    sizes = dict(dimensions)
+    for name, size in dimensions:
+        nc_file.createDimension(name, size)
+
+    for name, value in attributes:
+        if value is not None:
+            setattr(nc_file, name, value)
+
+    variables = []
+    for name, nc_type, var_dimensions in schema:
+        if nc_type is None:
+            nc_type = mc.SCC_RAW_DATA_DTYPE
+        options = {}
+        if compress and nc_type is not str:
+            options = nc4_variable_options(tuple(sizes[dimension] for dimension in var_dimensions),
+                                           var_dimensions.index('time') if 'time' in var_dimensions else None)
+        variables.append((nc_file.createVariable(name, nc_type, var_dimensions, **options), nc_type, values[name]))
+
+    for var, nc_type, value in variables:
+        if nc_type is str:
+            value = np.asarray(value, dtype=object)
+        var[...] = np.broadcast_to(value, var.shape)
+
+
+def gather_signals(signals, profiles):
+    """
+    (time, channel, height) array of the signals at the profiles, a (time, channel) array of profile indices.
+    Signals that are views into the same SignalBlock are gathered with one fancy index into the block.
+    """
+    block = signals[0]._block
+    if block is not None and all(signal._block is block for signal in signals):
+        block_idxs = np.array([signal._block_idx for signal in signals])
+        return block.data[profiles, block_idxs[np.newaxis, :]]
+    return np.stack([signal.data[profiles[:, ch]] for ch, signal in enumerate(signals)], axis=1)
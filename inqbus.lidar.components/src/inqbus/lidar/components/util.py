@@ -1,5 +1,23 @@
+import datetime
 import ntpath
 
+import numpy as np
+
 
 def get_file_from_path(file_path):
     return ntpath.basename(file_path)
+
+
+def to_datetime(value):
+    """
+    datetime.datetime of a numpy datetime64 value, or an object array of datetimes for an array of datetime64.
+    Times are kept as datetime64 and only converted for the GUI and for formatting.
+
+    >>> to_datetime(np.datetime64('2015-05-01T00:01:00'))
+    datetime.datetime(2015, 5, 1, 0, 1)
+    >>> to_datetime(np.array(['2015-05-01T00:01:00'], dtype='datetime64[s]')).tolist()
+    [datetime.datetime(2015, 5, 1, 0, 1)]
+    """
+    if np.ndim(value) == 0:
+        return np.datetime64(value, 'us').astype(datetime.datetime)
+    return np.asarray(value).astype('datetime64[us]').astype(datetime.datetime)
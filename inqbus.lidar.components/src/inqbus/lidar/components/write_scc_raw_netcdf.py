@@ -5,6 +5,8 @@ import string
 import numpy
 from scipy.io import netcdf
 
+from inqbus.lidar.components.scc_writer import SCC_RAW_NC3_SCHEMA, write_scc_file
+from inqbus.lidar.scc_gui.configs import main_config as mc
 from inqbus.lidar.scc_gui.log import logger
 
 NC_FILL_INT = -2147483647
@@ -58,109 +60,48 @@ def write_attributes(nc_file, measurement):
 def write_variables(nc_file, measurement):
     print('create variables')
 
-    bg_height_last_var = nc_file.createVariable('Background_High',
-                                                numpy.float64,
-                                                ('channels',))
+    num_channels = measurement['header']['num_channels']
+    bins = measurement['header']['bins']
+    profiles = measurement['data']
 
-    bg_height_first_var = nc_file.createVariable('Background_Low',
-                                                 numpy.float64,
-                                                 ('channels',))
-
-    bg_mode_var = nc_file.createVariable('Background_Mode',
-                                         numpy.int,
-                                         ('channels',))
-
-    lr_input_var = nc_file.createVariable('LR_Input',
-                                          numpy.int,
-                                          ('channels',))
-
-    angle_var = nc_file.createVariable('Laser_Pointing_Angle',
-                                       numpy.float64,
-                                       ('scan_angles',))
-
-    angle_id_var = nc_file.createVariable('Laser_Pointing_Angle_of_Profiles',
-                                          numpy.int,
-                                          ('time', 'nb_of_time_scales'))
-
-    shots_var = nc_file.createVariable('Laser_Shots',
-                                       numpy.int,
-                                       ('time', 'channels'))
-
-    mol_calc_var = nc_file.createVariable('Molecular_Calc',
-                                          numpy.int,
-                                          ())
-    pres_var = nc_file.createVariable('Pressure_at_Lidar_Station',
-                                      numpy.float64,
-                                      ())
-    temp_var = nc_file.createVariable('Temperature_at_Lidar_Station',
-                                      numpy.float64,
-                                      ())
-
-    range_res_var = nc_file.createVariable('Raw_Data_Range_Resolution',
-                                           numpy.float64,
-                                           ('channels',))
-
-    start_var = nc_file.createVariable('Raw_Data_Start_Time',
-                                       numpy.int,
-                                       ('time', 'nb_of_time_scales'))
-
-    stop_var = nc_file.createVariable('Raw_Data_Stop_Time',
-                                      numpy.int,
-                                      ('time', 'nb_of_time_scales'))
-
-    data_var = nc_file.createVariable('Raw_Lidar_Data',
-                                      numpy.float64,
-                                      ('time', 'channels', 'points'))
-
-    range_id_var = nc_file.createVariable('ID_Range',
-                                          numpy.int,
-                                          ('channels',))
-
-    ch_id_var = nc_file.createVariable('channel_ID',
-                                       numpy.int,
-                                       ('channels',))
-
-    time_scale_id_var = nc_file.createVariable('id_timescale',
-                                               numpy.int,
-                                               ('channels',))
-
-    print('write data')
-
-    for ch in range(0, measurement['header']['num_channels']):
-        range_res_var[ch] = measurement['header']['range_res'][ch]
-        bg_height_first_var[ch] = measurement['header']['bg_first']
-        bg_height_last_var[ch] = measurement['header']['bg_last']
-        time_scale_id_var[ch] = measurement['header']['time_scale'][ch]
-        ch_id_var[ch] = measurement['header']['channel_id'][ch]
-        lr_input_var[ch] = 1
-        bg_mode_var[ch] = 0
-        range_id_var[ch] = measurement['header']['range_id'][ch]
-
-    angle_var[0] = measurement['header']['angle']
+    # profiles shorter than bins are filled up
+    if numpy.dtype(mc.SCC_RAW_DATA_DTYPE).kind == 'i':
+        raw_data = numpy.full((len(profiles), num_channels, bins), NC_FILL_INT)
+    else:
+        raw_data = numpy.full((len(profiles), num_channels, bins), NC_FILL_DOUBLE)
+    for t, profile in enumerate(profiles):
+        for ch in range(num_channels):
+            signal = profile['data'][ch]
+            raw_data[t, ch, :len(signal)] = signal
 
     if 'sounding' in measurement and (measurement['sounding'] != ''):
-        mol_calc_var.assignValue(1)
-        pres_var.assignValue(measurement['pressure'])
-        temp_var.assignValue(measurement['temperature'])
+        mol_calc = 1
     else:
-        mol_calc_var.assignValue(0)
-        pres_var.assignValue(measurement['pressure'])
-        temp_var.assignValue(measurement['temperature'])
+        mol_calc = 0
+
+    values = {
+        'Background_High': measurement['header']['bg_last'],
+        'Background_Low': measurement['header']['bg_first'],
+        'Background_Mode': 0,
+        'LR_Input': 1,
+        'Laser_Pointing_Angle': measurement['header']['angle'],
+        'Laser_Pointing_Angle_of_Profiles': 0,
+        'Laser_Shots': numpy.array([profile['header']['shots'][:num_channels] for profile in profiles]),
+        'Molecular_Calc': mol_calc,
+        'Pressure_at_Lidar_Station': measurement['pressure'],
+        'Temperature_at_Lidar_Station': measurement['temperature'],
+        'Raw_Data_Range_Resolution': measurement['header']['range_res'][:num_channels],
+        'Raw_Data_Start_Time': numpy.array([profile['start'] for profile in profiles])[:, numpy.newaxis],
+        'Raw_Data_Stop_Time': numpy.array([profile['stop'] for profile in profiles])[:, numpy.newaxis],
+        'Raw_Lidar_Data': raw_data,
+        'ID_Range': measurement['header']['range_id'][:num_channels],
+        'channel_ID': measurement['header']['channel_id'][:num_channels],
+        'id_timescale': measurement['header']['time_scale'][:num_channels],
+    }
 
-    for t in range(0, len(measurement['data'])):
-        angle_id_var[t, 0] = 0
-        start_var[t, 0] = measurement['data'][t]['start']
-        stop_var[t, 0] = measurement['data'][t]['stop']
-
-        for ch in range(0, measurement['header']['num_channels']):
-            shots_var[t, ch] = measurement['data'][t]['header']['shots'][ch]
-
-            lastbin = len(measurement['data'][t]['data'][ch])
-
-            data_var[t, ch] = measurement['data'][t]['data'][ch]
+    print('write data')
 
-            data_var[t, ch, lastbin:measurement['header']
-                     ['bins']] = NC_FILL_DOUBLE
+    write_scc_file(nc_file, [], [], SCC_RAW_NC3_SCHEMA, values)
 
 
 def extract_session_time(measurement, sched_start, sched_stop):
@@ -196,7 +137,7 @@ def extract_session_time(measurement, sched_start, sched_stop):
 
 def write(path, measurement, sched_start, sched_stop):
     extract_session_time(measurement, sched_start, sched_stop)
-    logger.info('write file', ncname(measurement))
+    logger.info('write file %s' % ncname(measurement))
     outfile = netcdf.netcdf_file(
         os.path.join(
             path,
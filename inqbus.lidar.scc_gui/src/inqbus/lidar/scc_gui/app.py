@@ -1,16 +1,22 @@
+import datetime
+import multiprocessing
 import os
+import sqlite3
 import sys
 import traceback
 import traceback as tb
 
 from PyQt5 import QtCore, QtWidgets, uic, QtGui
 
+from inqbus.lidar.components.catalog import RawFileCatalog
 from inqbus.lidar.components.container import Measurement
+from inqbus.lidar.components.error import NoProfilesFound
 from inqbus.lidar.scc_gui import PROJECT_PATH
 from inqbus.lidar.scc_gui.log import logger
 from inqbus.lidar.scc_gui.configs import main_config as mc
 from inqbus.lidar.scc_gui.configs.base_config import resource_path, app_name
 from inqbus.lidar.scc_gui.quicklook import LIDARPlot
+from inqbus.lidar.scc_gui.region import PeriodDialog
 from inqbus.lidar.scc_gui.res_plot import ResultData, ResultPlot
 from inqbus.lidar.scc_gui.util import qt2pythonStr
 
@@ -42,6 +48,7 @@ class Ui_MainWindow(QtWidgets.QMainWindow):
         self.menuNew.actions()[0].triggered.connect(self.newQuicklookPlot)
         self.menuNew.actions()[1].triggered.connect(self.new321Plot)
         self.menuNew.actions()[2].triggered.connect(self.new321PlotFromZip)
+        self.menuNew.actions()[3].triggered.connect(self.newQuicklookPlotOfPeriod)
 
         # menu
         self.setup_menu()
@@ -95,16 +102,52 @@ class Ui_MainWindow(QtWidgets.QMainWindow):
             # Cancel button pressed
             return
 
+        self.openQuicklookPlot(file_paths)
+
+    def newQuicklookPlotOfPeriod(self):
+        now = QtCore.QDateTime.currentDateTimeUtc().toPyDateTime()
+        dialog = PeriodDialog(now - datetime.timedelta(hours=2), now)
+        if not dialog.exec_():
+            return
+        start, stop = dialog.period
+
+        self.setBusy()
+        try:
+            catalog = RawFileCatalog()
+            try:
+                catalog.scan()
+                file_paths = catalog.overlapping(start, stop)
+            finally:
+                catalog.close()
+        except sqlite3.Error as e:
+            logger.warning("Raw file catalog can not be used: %s" % e)
+            QtWidgets.QMessageBox.about(self, "Quicklook", "the raw file catalog can not be used: %s" % e)
+            return
+        finally:
+            self.endBusy()
+
+        if not file_paths:
+            QtWidgets.QMessageBox.about(self, "Quicklook", "no raw data files found for this period")
+            return
+
+        try:
+            self.openQuicklookPlot(file_paths, start, stop)
+        except NoProfilesFound:
+            QtWidgets.QMessageBox.about(self, "Quicklook", "no profiles found in this period")
+
+    def openQuicklookPlot(self, file_paths, start=None, stop=None):
         first_file_name = os.path.basename(file_paths[0])
         log_file = os.path.join(mc.LIDAR_LOG_PATH, first_file_name.replace('_','')[:8] + '_temps.txt')
 
         if not os.path.exists(mc.LIDAR_LOG_PATH):
             logger.warning("%s can not be found. Check if paths are configured correctly and all directories exist." % mc.LIDAR_LOG_PATH)
 
-        measurement = Measurement.from_nc_file(file_paths[0], log_file)
-        #if more than 1 filename was selcted -> append second file (more than 2 files are not allowed for now)
-        if len(file_paths) > 1:
-            measurement.append_nc_file(file_paths[1])
+        if mc.LOAD_QUICKLOOK_CHANNEL_FIRST:
+            channels = [mc.QUICKLOOK_CHANNEL]
+        else:
+            channels = None
+        measurement = Measurement.from_nc_files(file_paths, log_file, channels=channels, crop=True,
+                                                start=start, stop=stop)
 
         MDI_win = QtWidgets.QMdiSubWindow(self)
 
@@ -198,16 +241,21 @@ class Ui_MainWindow(QtWidgets.QMainWindow):
             'Zip_files (*.zip)')[0]
         return qt2pythonStr(file_path)
 
-sys.excepthook = except_hook
+if __name__ == '__main__':
+    # worker processes for parallel reading of raw data files import this module, too.
+    # They must not start the GUI.
+    multiprocessing.freeze_support()
+
+    sys.excepthook = except_hook
 
-app = QtWidgets.QApplication(sys.argv)
-app.setWindowIcon(QtGui.QIcon(resource_path('aesir.ico')))
+    app = QtWidgets.QApplication(sys.argv)
+    app.setWindowIcon(QtGui.QIcon(resource_path('aesir.ico')))
 
-app.main_window = Ui_MainWindow()
-app.main_window.resize(mc.PLOT_WINDOW_SIZE[0], mc.PLOT_WINDOW_SIZE[1])
-app.main_window.construct()
-app.main_window.setWindowTitle(app_name)
+    app.main_window = Ui_MainWindow()
+    app.main_window.resize(mc.PLOT_WINDOW_SIZE[0], mc.PLOT_WINDOW_SIZE[1])
+    app.main_window.construct()
+    app.main_window.setWindowTitle(app_name)
 
-app.main_window.show()
+    app.main_window.show()
 
-sys.exit(app.exec_())
+    sys.exit(app.exec_())
@@ -18,6 +18,7 @@ a.datas += [('UI/app_design.ui', '.\\UI\\app_design.ui', 'DATA'),
             ('UI/plotConfigTemplate.ui', '.\\UI\\plotConfigTemplate.ui', 'DATA'),
             ('UI/design.ui', '.\\UI\\design.ui', 'DATA'),
             ('UI/region_dialog.ui', '.\\UI\\region_dialog.ui', 'DATA'),
+            ('UI/period_dialog.ui', '.\\UI\\period_dialog.ui', 'DATA'),
             ('UI/save_as_scc_dialog.ui', '.\\UI\\save_as_scc_dialog.ui', 'DATA'),
             ('UI/save_as_sccDPcal_dialog.ui', '.\\UI\\save_as_sccDPcal_dialog.ui', 'DATA'),
             ]
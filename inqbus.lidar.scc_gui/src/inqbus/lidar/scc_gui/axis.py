@@ -4,6 +4,7 @@ import datetime
 import sys
 import traceback as tb
 
+from inqbus.lidar.components.util import to_datetime
 from inqbus.lidar.scc_gui.log import logger
 
 ONE_DAY = datetime.timedelta(1)
@@ -106,19 +107,19 @@ class HeightAxis(DataAxis):
 
 class DateAxis(DataAxis):
     """
-    Axis with datetimes as tics
+    Axis with datetimes as tics. axis_data are numpy datetime64, only the tick values are converted to datetimes.
     """
 
     def tickStrings(self, values, scale, spacing):
         strns = []
         try:
-            min_time = self.axis_data[min(values)]
+            min_time = to_datetime(self.axis_data[min(values)])
         except BaseException:
-            min_time = self.axis_data[0]
+            min_time = to_datetime(self.axis_data[0])
         try:
-            max_time = self.axis_data[max(values)]
+            max_time = to_datetime(self.axis_data[max(values)])
         except BaseException:
-            max_time = self.axis_data[-1]
+            max_time = to_datetime(self.axis_data[-1])
 
         rng = max_time - min_time
 
@@ -140,7 +141,7 @@ class DateAxis(DataAxis):
             label2 = ''
         for x in values:
             try:
-                strns.append(self.axis_data[int(x)].strftime(string))
+                strns.append(to_datetime(self.axis_data[int(x)]).strftime(string))
             except ValueError:  # Windows can't handle dates before 1970
                 strns.append('')
             except IndexError:
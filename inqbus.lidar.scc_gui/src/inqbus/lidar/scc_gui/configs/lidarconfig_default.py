@@ -71,12 +71,41 @@ RANGE_ID = [1,    1,    1,    1,    1,    1,     0,    0,  1]
 BG_FIRST = [0,    0,    0,    0,    0,    0,    0,    0,   0]
 BG_LAST = [249,  249,  249,  249,  249,  249,  249,  249, 249]
 
+# provide for each channel the estimator of the signal background:
+# 'mean', 'median', 'trimmed_mean' (mean without the BG_TRIM_FRACTION smallest and largest values)
+# or 'linear_fit' (straight line, for a sloped background)
+# The order in this array refers to CHANNEL_ID_STR
+BG_ESTIMATOR = ['mean', 'mean', 'mean', 'mean', 'mean', 'mean', 'mean', 'mean', 'mean']
+BG_TRIM_FRACTION = 0.1
+
+# corrections of the raw signals, applied by the preprocessing together with background subtraction and range
+# correction. The order in these arrays refers to CHANNEL_ID_STR
+# dead time of the photon counting detectors in ns (non-paralyzable). None: no dead-time correction
+DEAD_TIME = [None, None, None, None, None, None, None, None, None]
+# name of the overlap file of each channel in OVL_PATH, with the columns range (m) and overlap. None: no overlap
+# correction
+OVL_FILE = [None, None, None, None, None, None, None, None, None]
+# overlap values below OVL_MIN are raised to OVL_MIN, so the correction stays finite close to the lidar
+OVL_MIN = 0.05
+
 # which altitude bin coresponds to 0m height above lidar?
 FIRST_VALID_BIN = 251
 
 # provide here, at which position in your raw data file the scc signals are located.
 CHAN_NC_POS = [0, 1, 2, 3, 4, 5, 6, 7, 2]
 
+# numerical precision of the signals in memory.
+# dtype of the raw signals. None keeps the dtype of the raw data file (integer counts)
+RAW_SIGNAL_DTYPE = None
+# dtype of the background and range corrected signals. Use 'float64' for full precision
+SIGNAL_DTYPE = 'float32'
+# dtype of the cloud mask (the cloud types are small integers)
+CLOUD_MASK_DTYPE = 'int8'
+# dtype of Raw_Lidar_Data in the SCC raw data files. 'f8' as expected by SCC, 'f4' halves the file size.
+# 'i4' stores the photon counts as integers, which compress best (see NC_COMPRESSION_LEVEL); only for raw signals
+# with integer counts (RAW_SIGNAL_DTYPE None).
+SCC_RAW_DATA_DTYPE = 'f8'
+
 # -------------------------------------------------------------------
 # configurations for depolarization calibration measurements
 # -------------------------------------------------------------------
@@ -152,6 +181,12 @@ QUICKLOOK_CHANNEL = 'chan_5'
 # what is the (initial) maximum altitude of the plots?
 MAX_PLOT_ALTITUDE = 15000 #m
 
+# up to which height above the lidar shall the signals be read for the quicklook?
+# Higher bins are only read for the SCC export and the telecover analysis. The background windows
+# (BG_FIRST ... BG_LAST) are always read, so this saves nothing if they are at the far end of the profile.
+# None = read all bins. Must not be lower than MAX_PLOT_ALTITUDE.
+READ_MAX_ALTITUDE = 20000 #m
+
 # which colors shall be used to plot the signal profiles?
 # there must be one entry for each of the CHANNEL_NAMES
 PLOT_PROFILE_COLOR = {'chan_0': (0, 0, 255, 255),
@@ -202,6 +237,12 @@ SONDE_STATIONS = {'10954': {'name': 'Altenstadt', 'lat': 47.50, 'lon': 10.52, 'a
                   '10739': {'name': 'Stuttgart', 'lat': 48.83, 'lon': 9.2, 'alt': 314},
                   }
 
+# the sounding of this station (WMO id of SONDE_STATIONS, or 'gdas') which is nearest in time to a measurement is
+# proposed for the export of scc raw data files. None = no proposal.
+SONDE_STATION = None
+# soundings launched more than this number of hours before or after the measurement are not proposed
+SONDE_MAX_TIME_DIFFERENCE = 12
+
 # -------------------------------------------------------------------
 # configurations for telecover measurements
 # -------------------------------------------------------------------
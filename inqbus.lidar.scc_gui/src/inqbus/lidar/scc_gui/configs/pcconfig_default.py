@@ -8,16 +8,20 @@ BASE_PATH = 'C:\\inqbus.lidar\\test_data'
 
 # This is the directory, where your raw lidar data are located
 DATA_PATH = os.path.join(BASE_PATH, 'data')
+# the headers of the raw lidar data files in DATA_PATH are indexed in this SQLite database
+CATALOG_FILE = os.path.join(BASE_PATH, 'raw_file_catalog.sqlite')
 
-# If your raw lidar data are zip files, the are temporarily unpacked into this directory.
+# directory for temporary files.
+# Zipped raw lidar data and zipped result data are decompressed in memory and not unpacked into this directory.
 TEMP_PATH = 'c:\\temp'
 
 # the created scc raw data files and the corresponding ancillary files are written into this directory
 OUT_PATH = os.path.join(BASE_PATH, 'scc_raw')
 # This is the directory, where radio sonde files are located.
 SONDE_PATH = os.path.join(BASE_PATH, 'sondes')
-# this is the directory, where overlap files are located
-# not yet implemented
+# The parsed sonde files are kept as numpy arrays in this directory, so each file is parsed only once.
+SONDE_CACHE_PATH = os.path.join(BASE_PATH, 'sonde_cache')
+# this is the directory, where overlap files (see OVL_FILE) are located
 OVL_PATH = os.path.join(BASE_PATH, 'overlaps')
 
 # this is the directory where lidar-log-files are located
@@ -38,3 +42,43 @@ SYS_LOG_PATH = os.path.join(BASE_PATH, 'gui_log')
 SYS_LOG_FILE = os.path.join(SYS_LOG_PATH, 'scc-gui.log')
 # log level
 SYS_LOG_LEVEL = INFO
+
+# If True, raw lidar data files (*.nc) are memory mapped instead of being read completely into memory.
+# The signals then refer directly to the data on disk and are only loaded when they are really needed.
+# Zipped raw data files are always read into memory.
+READ_MMAP = True
+
+# Maximum size (in MB) of the in-memory cache of decompressed zip files.
+# Reopening a zip file that is still in the cache does not need to decompress it again.
+ZIP_CACHE_SIZE = 1024
+
+# Number of parsed sonde files that are kept in memory.
+SONDE_CACHE_ENTRIES = 64
+
+# Number of worker processes used to read and preprocess several raw data files in parallel.
+# 1 = read the files one by one in the application process.
+READ_WORKERS = 1
+
+# The preprocessing works on chunks of profiles of about this size (in kB), which fit into the CPU cache.
+PREPROCESS_CHUNK_SIZE = 512
+
+# Compression of the NetCDF4 files that are written: SCC raw data and depolarization calibration files, and the
+# CF export of results. 0 = no compression, 1 ... 9 = zlib level (higher levels are slower and only slightly smaller).
+# Only variables with at least NC_COMPRESSION_MIN_VALUES values are compressed.
+NC_COMPRESSION_LEVEL = 1
+NC_COMPRESSION_MIN_VALUES = 1024
+# If True, the bytes of the values are reordered before the compression (shuffle filter), which makes numerical data
+# compress much better.
+NC_SHUFFLE = True
+# Variables along the time dimension of SCC raw data files are stored in chunks of this number of profiles
+# (with all channels and points), so reading a time period only decompresses the chunks of its profiles.
+NC_CHUNK_PROFILES = 16
+
+# The quicklook keeps the signal at 1/2, 1/4, 1/8 ... of the resolution in time and height, until the
+# number of profiles and height bins is not larger than PYRAMID_MIN_SIZE.
+# A zoomed out view is drawn from the smallest sufficient level instead of the full resolution signal.
+PYRAMID_MIN_SIZE = 256
+
+# If True, only the QUICKLOOK_CHANNEL is read and preprocessed when raw lidar data are opened.
+# The other channels are loaded after the first image is shown, or when they are needed (export, telecover analysis).
+LOAD_QUICKLOOK_CHANNEL_FIRST = True
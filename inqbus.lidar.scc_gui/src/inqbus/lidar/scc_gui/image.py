@@ -155,6 +155,15 @@ def makeARGB(data, lut=None, levels=None, scale=None, useRGBA=False):
 
 class Image(ImageItem):
 
+    # SignalPyramid of the image. If set, a downsampled image is computed from the smallest sufficient level
+    pyramid = None
+
+    def setImage(self, image=None, pyramid=None, **kargs):
+        # a new image replaces the pyramid of the previous one
+        if image is not None:
+            self.pyramid = pyramid
+        super(Image, self).setImage(image, **kargs)
+
     def render(self):
         # Convert data to QImage for display.
 
@@ -175,7 +184,12 @@ class Image(ImageItem):
             h = Point(y - o).length()
             xds = max(1, int(1 / w))
             yds = max(1, int(1 / h))
-            image = fn.downsample(self.image, xds, axis=0)
+            image = self.image
+            if self.pyramid is not None:
+                image, factor = self.pyramid.select(xds, yds)
+                xds = max(1, xds // factor)
+                yds = max(1, yds // factor)
+            image = fn.downsample(image, xds, axis=0)
             image = fn.downsample(image, yds, axis=1)
         else:
             image = self.image
@@ -1,4 +1,3 @@
-import datetime as dt
 import os
 
 import numpy as np
@@ -47,6 +46,19 @@ class LIDARPlot(pg.GraphicsLayoutWidget):
 
         self.create_menu()
 
+        if self.measurement.pending_channels:
+            # load the other channels as soon as the first image is shown
+            QtCore.QTimer.singleShot(0, self.load_pending_channels)
+
+    def load_pending_channels(self):
+        self.measurement.load_channels()
+        self.plot_profile(self.profile_region)
+
+    def closeEvent(self, event):
+        # release the memory mapped raw data files of the measurement
+        self.measurement.close()
+        super(LIDARPlot, self).closeEvent(event)
+
     # Actions for the menu
     def create_actions(self):
         """
@@ -148,16 +160,20 @@ class LIDARPlot(pg.GraphicsLayoutWidget):
 
         self.contour_plot.setMinimumWidth(700)
 
-        # Display contour as image
-        self.img = Image()
+        # Display contour as image. When zoomed out, the image is drawn from the signal pyramid
+        self.img = Image(autoDownsample=True)
         self.contour_plot.addItem(self.img)
 
+        self.show_contour_data()
+
+    def show_contour_data(self):
         # preprocess the data
         self.data_of_contour_plot()
 
         # shove the contour data into the image
         self.img.setImage(
             self.contour_data,
+            pyramid=self.measurement.signal_pyramid(mc.QUICKLOOK_CHANNEL),
             levels=(
                 self.contour_data.min(),
                 self.contour_max_count),
@@ -216,6 +232,16 @@ class LIDARPlot(pg.GraphicsLayoutWidget):
         region_stop = min([region_stop, self.measurement.mask.size - 1])
         self.measurement.set_telecover_region((region_start, region_stop), sector_name)
 
+    def set_dark_region(self, a_region):
+        region_start, region_stop = self.clear_region_borders(a_region)
+        region_start = max([region_start, 0])
+        region_stop = min([region_stop, self.measurement.mask.size - 1])
+        self.measurement.set_dark_region((region_start, region_stop))
+
+        # the dark signal is subtracted from all profiles
+        self.show_contour_data()
+        self.plot_profile(self.profile_region)
+
     def set_cloud_region(self, alt_region, cloud_type):
         self.measurement.set_cloud_region(self.clear_region_borders(alt_region), cloud_type)
 
@@ -235,50 +261,25 @@ class LIDARPlot(pg.GraphicsLayoutWidget):
                 self.measurement.mask[round(rgn[0]):round(rgn[1])] = 0
 
     def get_region_from_time(self, start, end):
-        time_axis_start = self.measurement.time_axis.stop[0]
-        time_axis_end = self.measurement.time_axis.start[-1]
+        """
+        (first, last) profile index of the period between the times of day start and end, None if the period is
+        outside of the measurement
+        """
+        time_axis = self.measurement.time_axis
+        dt_start, dt_end = time_axis.period_of_day_times(start, end)
+        profiles = time_axis.slice_between(dt_start, dt_end)
 
-        # if begin and end of time_axis are on the same day
-        if time_axis_start.date() == time_axis_end.date():
-            dt_start = dt.datetime.combine(time_axis_start, start)
-            dt_end = dt.datetime.combine(time_axis_start, end)
-        else:
-            # if period extends over midnight -> use date of day1 for dt_start and date of day2 for dt_end
-            if end < start:
-                dt_start = dt.datetime.combine(time_axis_start, start)
-                dt_end = dt.datetime.combine(time_axis_end, end)
-            # else decide to which day the period belongs
-            else:
-                # if period does not start within day1-part of timeaxis
-                if start < time_axis_start.time():
-                    # if period starts within day2 part of timeaxis
-                    if start < time_axis_end.time():
-                        date = time_axis_end.date()
-                    else: # assume period starts before timeaxis
-                        date = time_axis_start.date()
-                else:
-                    date = time_axis_start.date()
-
-                dt_start = dt.datetime.combine(date, start)
-                dt_end = dt.datetime.combine(date, end)
-
-        lt_start = np.where(self.measurement.time_axis.stop > dt_start)[0]
-        if len(lt_start) > 0:
-            start_idx = lt_start[0]
-        else:
+        if profiles.start >= len(time_axis):
             QtGui.QMessageBox.about(
-                self, "%s is outside of measurement time axis" %
-                      (start.strftime('%H:%M:%S')))
-#        else:
-#            pass
-        lt_end = np.where(self.measurement.time_axis.stop > dt_end)[0]
-        if len(lt_end) > 0:
-            end_idx = lt_end[0]
-        else:
+                self, "select time period", "%s is outside of measurement time axis" %
+                (start.strftime('%H:%M:%S')))
+            return None
+        if profiles.stop <= profiles.start:
             QtGui.QMessageBox.about(
-                self, "%s is outside of measurement time axis" %
+                self, "select time period", "%s is outside of measurement time axis" %
                 (end.strftime('%H:%M:%S')))
-        return(start_idx, end_idx)
+            return None
+        return (profiles.start, profiles.stop - 1)
 
     def region_selector(self, position):
         region = MenuLinearRegionItem(
@@ -346,6 +347,7 @@ class LIDARPlot(pg.GraphicsLayoutWidget):
         # set the data content for the profile
         # min_time, max_time = self.region.getRegion()
 
+        self.profile_region = a_region
         self.profile.setXRange(0, 1E8)
         min_time = round(a_region[0])
         max_time = round(a_region[1])
@@ -1,4 +1,5 @@
 import os
+import sqlite3
 from PyQt5 import QtWidgets
 
 from pyqtgraph import LinearRegionItem
@@ -6,9 +7,11 @@ from pyqtgraph.Qt import QtGui, QtCore, uic
 
 from inqbus.lidar.components.error import NoCalIdxFound, WrongFileFormat, WrongFileStorage
 from inqbus.lidar.components.constants import NO_CLOUD, UNKNOWN_CLOUD, CIRRUS, WATER_CLOUD
+from inqbus.lidar.components.util import to_datetime
 from inqbus.lidar.scc_gui import PROJECT_PATH
 from inqbus.lidar.scc_gui.configs import main_config as mc
 from inqbus.lidar.scc_gui.configs.base_config import resource_path
+from inqbus.lidar.scc_gui.log import logger
 from inqbus.lidar.scc_gui.util import qt2pythonStr
 
 
@@ -85,8 +88,8 @@ class QLRegionMenu(RegionMenu):
         self.set_as_rayleigh = self.quality_menu.addAction('set as Rayleigh')
         self.set_as_rayleigh.triggered.connect(self.view.set_as_rayleigh)
 
-#        self.set_as_dark = self.quality_menu.addAction('set as dark')
-#        self.set_as_dark.triggered.connect(self.view.set_as_dark)
+        self.set_as_dark = self.quality_menu.addAction('set as dark')
+        self.set_as_dark.triggered.connect(self.view.set_as_dark)
 
         # self.analyse_telecover = self.addAction('telecover - analyse')
         # self.analyse_telecover.triggered.connect(self.view.analyse_telecover)
@@ -126,10 +129,10 @@ class RegionDialog(QtGui.QDialog):
             self)
         self.plot = a_plot
         self.parent_region = a_parent_region
-        FromTime = self.plot.measurement.time_axis.start[int(
-            round(a_parent_region.getRegion()[0]))]
-        ToTime = self.plot.measurement.time_axis.start[int(
-            round(a_parent_region.getRegion()[1]))]
+        FromTime = to_datetime(self.plot.measurement.time_axis.start[int(
+            round(a_parent_region.getRegion()[0]))])
+        ToTime = to_datetime(self.plot.measurement.time_axis.start[int(
+            round(a_parent_region.getRegion()[1]))])
         self.TimeEditFrom.setTime(
             QtCore.QTime(
                 FromTime.hour,
@@ -150,6 +153,8 @@ class RegionDialog(QtGui.QDialog):
         from_time = self.TimeEditFrom.time().toPyTime()
         to_time = self.TimeEditTo.time().toPyTime()
         new_rgn = self.plot.get_region_from_time(from_time, to_time)
+        if new_rgn is None:
+            return
 
         self.parent_region.setRegion(new_rgn)
         self.parent_region.update()
@@ -162,6 +167,34 @@ class RegionDialog(QtGui.QDialog):
         super(RegionDialog, self).reject()
 
 
+class PeriodDialog(QtGui.QDialog):
+    """
+    selection of the period of a quicklook. The selected datetimes are in self.period after the dialog was accepted.
+    """
+
+    def __init__(self, from_time, to_time):
+        super(PeriodDialog, self).__init__()
+        uic.loadUi(
+            resource_path(
+                os.path.join(
+                    PROJECT_PATH,
+                    'UI/period_dialog.ui')),
+            self)
+        self.period = None
+        self.DateTimeEditFrom.setDateTime(QtCore.QDateTime(from_time))
+        self.DateTimeEditFrom.setDisplayFormat('yyyy-MM-dd HH:mm:ss')
+        self.DateTimeEditTo.setDateTime(QtCore.QDateTime(to_time))
+        self.DateTimeEditTo.setDisplayFormat('yyyy-MM-dd HH:mm:ss')
+
+    def accept(self):
+        """
+        This is called if you click on the OK button
+        """
+        self.period = (self.DateTimeEditFrom.dateTime().toPyDateTime(),
+                       self.DateTimeEditTo.dateTime().toPyDateTime())
+        super(PeriodDialog, self).accept()
+
+
 class SCC_raw_Params_Dialog(QtGui.QDialog):
 
     def __init__(self, a_parent_region, a_plot):
@@ -178,7 +211,7 @@ class SCC_raw_Params_Dialog(QtGui.QDialog):
         self.ui.openFile.clicked.connect(self.openFileDialog)
 
         if not self.plot.measurement.header.measurement_id:
-            start_time = self.plot.measurement.time_axis.start[int(round(a_parent_region.getRegion()[0]))]
+            start_time = to_datetime(self.plot.measurement.time_axis.start[int(round(a_parent_region.getRegion()[0]))])
             new_measurement_id = start_time.strftime('%Y%m%d') + mc.STATION_ID + start_time.strftime('%H%M')
 #            self.MeasurementID_Edit.setText(self.plot.measurement.time_axis.start[int(
 #                round(a_parent_region.getRegion()[0]))].strftime('%Y%m%d') + mc.STATION_ID + '__')
@@ -186,6 +219,15 @@ class SCC_raw_Params_Dialog(QtGui.QDialog):
         else:
             self.MeasurementID_Edit.text = self.plot.measurement.header.measurement_id
 
+        # propose the sounding of SONDE_STATION that is nearest to the start of the region
+        try:
+            sonde_name = self.plot.measurement.find_sonde(
+                to_datetime(self.plot.measurement.time_axis.start[int(round(a_parent_region.getRegion()[0]))]))
+        except sqlite3.Error as e:
+            logger.warning("Sonde catalog can not be used: %s" % e)
+            sonde_name = ''
+        self.SondeFile_Edit.setText(sonde_name)
+
     def accept(self):
         """
         This is called if you click on the OK button
@@ -252,7 +294,7 @@ class SCC_DPcal_Params_Dialog(QtGui.QDialog):
         self.plot = a_plot
         self.parent_region = a_parent_region
         if not self.plot.measurement.header.measurement_id :
-            start_time = self.plot.measurement.time_axis.start[int(round(a_parent_region.getRegion()[0]))]
+            start_time = to_datetime(self.plot.measurement.time_axis.start[int(round(a_parent_region.getRegion()[0]))])
             new_measurement_id = start_time.strftime('%Y%m%d') + mc.STATION_ID + start_time.strftime('%H') + 'dp'
 #            self.MeasurementID_Edit.setText(self.plot.measurement.time_axis.start[int(
 #                round(a_parent_region.getRegion()[0]))].strftime('%Y%m%d') + mc.STATION_ID + '__')
@@ -388,7 +430,7 @@ class MenuLinearRegionItem(LinearRegionItem):
 
     def set_as_dark(self):
         self.update()
-        self.plot.set_telecover_region(self.getRegion(), 'dark')
+        self.plot.set_dark_region(self.getRegion())
 
 
 class ProfileMenuLinearRegionItem(MenuLinearRegionItem):
@@ -1,7 +1,10 @@
 import copy
 import functools
+import io
 import os
+import shutil
 import sys
+import tempfile
 import traceback as tb
 import zipfile
 from datetime import datetime, timedelta
@@ -13,10 +16,13 @@ import pyqtgraph as pg
 from PyQt5 import uic
 from PyQt5.QtWidgets import QAction, QMenu, QWidgetAction
 from inqbus.lidar.components.constants import NC_FILL_BYTE, CIRRUS, NO_CLOUD
+from inqbus.lidar.components.raw_file import zip_cache
+from inqbus.lidar.components.scc_writer import nc4_variable_options
 from pyqtgraph.graphicsItems.LegendItem import ItemSample
 from qtpy import QtGui
 from pyqtgraph.Qt import QtCore
 from scipy.io import netcdf
+import netCDF4
 from netCDF4 import Dataset
 
 from inqbus.lidar.scc_gui import util, PROJECT_PATH
@@ -24,6 +30,9 @@ from inqbus.lidar.scc_gui.axis import HeightAxis, DataAxis
 from inqbus.lidar.scc_gui.configs import main_config as mc
 from inqbus.lidar.scc_gui.configs.base_config import resource_path
 from inqbus.lidar.scc_gui.log import logger
+
+# Dataset(memory=...) needs netCDF4-python 1.2.8 or later
+NC4_OPENS_MEMORY = tuple(int(part) for part in netCDF4.__version__.split('.')[:3] if part.isdigit()) >= (1, 2, 8)
 #from inqbus.lidar.scc_gui.app import app
 
 
@@ -175,16 +184,28 @@ class DataExport(object):
     def write_global_variables_cf(self, nc_file):
         self.write_variables_cf(nc_file, self.data.data['global_vars'])
 
+    @staticmethod
+    def variable_options_cf(nc_file, dtype, dims):
+        """
+        compression and chunking of a numerical variable of the CF export, see nc4_variable_options
+        """
+        if dtype is str or np.dtype(dtype).kind not in 'biuf':
+            return {}
+        if isinstance(dims, str):
+            dims = (dims,)
+        return nc4_variable_options(tuple(len(nc_file.dimensions[dim]) for dim in dims))
+
     def write_variables_cf(self, nc_file, vars):
         for v in vars:
             if not v in nc_file.variables:
                 orig_v = vars[v]
 
                 #create variable
+                options = self.variable_options_cf(nc_file, orig_v['dtype'], orig_v['dims'])
                 if '_FillValue' in orig_v['attrs']:
-                    var = nc_file.createVariable(v, orig_v['dtype'], orig_v['dims'], fill_value=orig_v['attrs']['_FillValue'])
+                    var = nc_file.createVariable(v, orig_v['dtype'], orig_v['dims'], fill_value=orig_v['attrs']['_FillValue'], **options)
                 else:
-                    var = nc_file.createVariable(v, orig_v['dtype'], orig_v['dims'])
+                    var = nc_file.createVariable(v, orig_v['dtype'], orig_v['dims'], **options)
 
                 #create variable attributes
                 for v_att in orig_v['attrs']:
@@ -316,11 +337,12 @@ class DataExport(object):
                 else:
                     fill_value = None
 
+                options = self.variable_options_cf(file, data.dtype, mc.VARIABLE_ATTRIBUTES[col]['dims'])
                 if fill_value is None:
-                    var = file.createVariable(col, data.dtype.type, mc.VARIABLE_ATTRIBUTES[col]['dims'])
+                    var = file.createVariable(col, data.dtype.type, mc.VARIABLE_ATTRIBUTES[col]['dims'], **options)
                 else:
                     var = file.createVariable(col, data.dtype.type, mc.VARIABLE_ATTRIBUTES[col]['dims'],
-                                          fill_value=fill_value)
+                                          fill_value=fill_value, **options)
 
                 # create variable attributes
                 for v_att in mc.VARIABLE_ATTRIBUTES[col]['attrs']:
@@ -334,51 +356,68 @@ class ResultData(object):
 
     @classmethod
     def from_zip(cls, filepath):
-        zfile = zipfile.ZipFile(filepath)
-        zfile.extractall(mc.TEMP_PATH)
+        """
+        the files are read directly from the (cached) decompressed zip members without unpacking the archive
+        """
         file_name = os.path.split(filepath)[-1]
-        file_name = file_name.split('.')[0]
-        unziped_path = os.path.join(mc.TEMP_PATH, file_name)
-        return ResultData.from_directory(unziped_path)
+        obj = cls()
+        obj.init_data(file_name.split('.')[0], filepath)
+
+        zfile = zipfile.ZipFile(filepath)
+        member_names = [zinfo.filename for zinfo in zfile.infolist() if not zinfo.filename.endswith('/')]
+        zfile.close()
+
+        for member_name in member_names:
+            obj.read_nc_file(os.path.split(member_name)[-1],
+                             memory=zip_cache.read(filepath, member_name))
+
+        obj.process_data()
+
+        return obj
 
     @classmethod
     def from_directory(cls, filepath):
         obj = cls()
-        obj.data = {}
-        obj.data = copy.deepcopy(mc.RES_DATA_SETTINGS)
-        obj.axis_limits = {}
-        obj.axis_limits.update(mc.RES_AXES_LIMITS)
-        meas_id = os.path.split(filepath)[-1]
-        obj.meas_id = meas_id
+        obj.init_data(os.path.split(filepath)[-1], filepath)
+
+        for filename in os.listdir(filepath):
+            obj.read_nc_file(os.path.join(filepath, filename))
+
+        obj.process_data()
+
+        return obj
+
+    def init_data(self, meas_id, filepath):
+        self.data = {}
+        self.data = copy.deepcopy(mc.RES_DATA_SETTINGS)
+        self.axis_limits = {}
+        self.axis_limits.update(mc.RES_AXES_LIMITS)
+        self.meas_id = meas_id
         if len(meas_id) == 12:
-            obj.station_id = meas_id[8:10]
+            self.station_id = meas_id[8:10]
         elif len(meas_id) == 15:
-            obj.station_id = meas_id[8:11]
+            self.station_id = meas_id[8:11]
         else:
             raise Exception('unknown format of measurement id')
 
-        obj.filepath = filepath
-
-        for filename in os.listdir(filepath):
-            obj.read_nc_file(os.path.join(filepath, filename))
+        self.filepath = filepath
 
-        obj.get_mean_profile()
+    def process_data(self):
+        self.get_mean_profile()
 
-        obj.set_depol()
+        self.set_depol()
 
-        obj.set_lr_type()
+        self.set_lr_type()
 
-        obj.set_angestroem_profile()
+        self.set_angestroem_profile()
 
-        obj.set_axes_limits()
+        self.set_axes_limits()
 
-        obj.set_zero_line_data()
+        self.set_zero_line_data()
 
-        obj.set_title()
+        self.set_title()
 
-        obj.set_original_data()
-
-        return obj
+        self.set_original_data()
 
     def time_from_nc(self, nc_timestamp):
         return datetime(1970,1,1) + timedelta(seconds=int(nc_timestamp))
@@ -639,17 +678,38 @@ class ResultData(object):
 
         f.close()
 
-    def read_nc_file(self, file_name):
+    def read_nc_file(self, file_name, memory=None):
+        """
+        memory: content of the file if it is not read from disk (e.g. decompressed zip member). Older netCDF4 versions
+        can not open NetCDF4 files from memory, the content is written to a temporary directory in TEMP_PATH then,
+        under its own file name.
+        """
         nc_version = 0
+        temp_dir = None
         try:
-            f = netcdf.netcdf_file(file_name, 'r', False, 1)
+            if memory is None:
+                f = netcdf.netcdf_file(file_name, 'r', False, 1)
+            else:
+                f = netcdf.netcdf_file(io.BytesIO(memory), 'r', False, 1)
+                f.filename = file_name
             nc_version = 3
         except TypeError:
             try:
-                f = Dataset(file_name, 'r', format="NETCDF4")
+                if memory is None:
+                    f = Dataset(file_name, 'r', format="NETCDF4")
+                elif NC4_OPENS_MEMORY:
+                    f = Dataset(file_name, 'r', format="NETCDF4", memory=memory)
+                else:
+                    temp_dir = tempfile.mkdtemp(dir=mc.TEMP_PATH if os.path.isdir(mc.TEMP_PATH) else None)
+                    temp_filename = os.path.join(temp_dir, os.path.basename(file_name))
+                    with open(temp_filename, 'wb') as out_file:
+                        out_file.write(memory)
+                    f = Dataset(temp_filename, 'r', format="NETCDF4")
                 nc_version = 4
             except:
                 logger.error('%s is no valid file.' % file_name)
+                if temp_dir is not None:
+                    shutil.rmtree(temp_dir)
                 return
         except IsADirectoryError:
             logger.error('%s is no valid file.' % file_name)
@@ -660,7 +720,11 @@ class ResultData(object):
 
         if nc_version == 4:
             #self.read_nc4_file(f)
-            self.read_nc4_file_complete(f)
+            try:
+                self.read_nc4_file_complete(f)
+            finally:
+                if temp_dir is not None:
+                    shutil.rmtree(temp_dir)
 
     def calc_mean_data(self, single_profiles):
         min_start = 15000
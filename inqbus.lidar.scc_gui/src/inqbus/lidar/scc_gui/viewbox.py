@@ -223,24 +223,16 @@ class LimitsViewBoxMenu(ViewBoxMenu):
 
 
     def bin_2_m(self, bin):
-        view = self.view()
-        data = view.plot.height_axis.axis_data
-        size = data.size
-        bin = int(bin)
-        if bin > size:
-            return data[-1]
-        else:
-            return data[bin]
+        z_axis = self.view().plot.measurement.z_axis
+        bin = min(int(bin), z_axis.header.points - 1)
+        return z_axis.bin_2_height(bin)
 
     def m_2_bin(self, altitude_m):
         try:
-            view = self.view()
-            data = view.plot.height_axis.axis_data
-            res =  np.where(data > altitude_m)
-            if res[0].size == 0:
+            z_axis = self.view().plot.measurement.z_axis
+            res = z_axis.m_2_bin(altitude_m)
+            if res >= z_axis.header.points:
                 res = None
-            else:
-                res = res[0][0]
             return res
 
         except BaseException as e: